@@ -0,0 +1,119 @@
+"""
+CompactGraph vs DependencyGraph: graph memory and traversal speed.
+
+Builds a synthetic call graph and measures the memory held by the
+dict-of-sets structures (nodes, edges, reverse_edges) against the CSR
+arrays. FunctionSymbol objects are shared and not counted. Then it
+times upstream/downstream queries from a sample of start nodes.
+
+Usage:
+    python benchmarks/bench_compact.py [--nodes 50000] [--fanout 4]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from pyimpact.core.compact import CompactGraph
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import CodeLocation, DependencyGraph, FunctionSymbol
+from pyimpact.query.engine import ImpactAnalyzer
+
+
+def make_functions(n_nodes: int) -> list[FunctionSymbol]:
+    functions = []
+    for i in range(n_nodes):
+        module = f"pkg.mod{i // 50}"
+        sid = SymbolId("python", module, f"func_{i}")
+        functions.append(
+            FunctionSymbol(
+                id=sid,
+                name=sid.qualname,
+                module=module,
+                location=CodeLocation(Path(f"{module}.py"), i % 50, 0),
+            )
+        )
+    return functions
+
+
+def make_edges(n_nodes: int, fanout: int, seed: int = 0) -> list[tuple[int, int]]:
+    rng = random.Random(seed)
+    edges = []
+    for src in range(n_nodes):
+        for _ in range(fanout):
+            # Mostly "downward" calls with some back edges, like real code
+            if rng.random() < 0.9:
+                dst = min(n_nodes - 1, src + 1 + int(rng.expovariate(1 / 200)))
+            else:
+                dst = rng.randrange(n_nodes)
+            edges.append((src, dst))
+    return edges
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def time_queries(analyzer: ImpactAnalyzer, starts: list[SymbolId]) -> float:
+    begin = time.perf_counter()
+    for sid in starts:
+        analyzer.upstream(sid)
+        analyzer.downstream(sid)
+    return (time.perf_counter() - begin) / (2 * len(starts))
+
+
+def run(n_nodes: int, fanout: int, n_queries: int) -> None:
+    functions = make_functions(n_nodes)
+    edges = make_edges(n_nodes, fanout)
+
+    def build_dict_graph() -> DependencyGraph:
+        graph = DependencyGraph()
+        for fn in functions:
+            graph.add_node(fn)
+        for src, dst in edges:
+            graph.add_edge(functions[src].id, functions[dst].id)
+        return graph
+
+    graph, dict_bytes = measure(build_dict_graph)
+
+    def build_compact() -> CompactGraph:
+        compact = CompactGraph.from_graph(graph)
+        compact._index = None  # lookup table is lazy; measure the arrays
+        return compact
+
+    compact, compact_bytes = measure(build_compact)
+
+    rng = random.Random(1)
+    starts = [functions[rng.randrange(n_nodes)].id for _ in range(n_queries)]
+
+    dict_time = time_queries(ImpactAnalyzer(graph), starts)
+    _ = compact.index  # build the lookup table outside the timed region
+    compact_time = time_queries(ImpactAnalyzer(compact), starts)
+
+    print(f"nodes={n_nodes} edges={compact.edge_count}")
+    print(f"{'':<16} {'structure MB':>13} {'ms/query':>9}")
+    print(f"{'dict-of-sets':<16} {dict_bytes / 2**20:>13.1f} {dict_time * 1e3:>9.2f}")
+    print(f"{'CSR':<16} {compact_bytes / 2**20:>13.1f} {compact_time * 1e3:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=10)
+    args = parser.parse_args()
+
+    run(args.nodes, args.fanout, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Incremental update benchmark.
+
+Builds an in-memory project of N modules, resolves it once, then times
+replacing a single module with Resolver.replace_module against a full
+re-resolve of the whole graph.
+
+Usage:
+    python benchmarks/bench_incremental.py [--modules 1000,5000,20000]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from pyimpact.analyzer.graph_builder import GraphBuilder
+from pyimpact.analyzer.parser import CallSiteInfo, FunctionDefInfo, ImportInfo
+from pyimpact.analyzer.resolver import Resolver
+from pyimpact.core.model import DependencyGraph
+
+FUNCTIONS_PER_MODULE = 10
+
+
+def make_module(builder: GraphBuilder, index: int, n_modules: int, version: int = 0):
+    module = f"m{index}"
+    target = f"m{(index * 7 + 1) % n_modules}"
+
+    functions = [
+        FunctionDefInfo(name=f"f{j}_{version}", lineno=j * 3 + 1, col_offset=0)
+        for j in range(FUNCTIONS_PER_MODULE)
+    ]
+    calls = [
+        CallSiteInfo(caller=fn.name, callee=f"f{j}_0", lineno=fn.lineno + 1,
+                     col_offset=4, qualifier="dep")
+        for j, fn in enumerate(functions)
+    ]
+    imports = [ImportInfo(module=target, name=None, alias="dep")]
+
+    return module, builder.build(
+        file_path=Path(f"{module}.py"),
+        module_name=module,
+        functions=functions,
+        calls=calls,
+        imports=imports,
+    )
+
+
+def run(sizes: list[int]) -> None:
+    print(f"{'modules':>8} {'full resolve ms':>16} {'replace ms':>11}")
+
+    for n_modules in sizes:
+        builder = GraphBuilder()
+        graph = DependencyGraph()
+        for i in range(n_modules):
+            graph.merge(make_module(builder, i, n_modules)[1])
+
+        resolver = Resolver()
+        start = time.perf_counter()
+        resolver.resolve(graph)
+        full = time.perf_counter() - start
+
+        # First replace pays for nothing extra: resolve() left its index behind
+        module, fragment = make_module(builder, n_modules // 2, n_modules, version=1)
+        start = time.perf_counter()
+        resolver.replace_module(graph, module, fragment)
+        incremental = time.perf_counter() - start
+
+        print(f"{n_modules:>8} {full * 1e3:>16.2f} {incremental * 1e3:>11.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", default="1000,5000,20000")
+    args = parser.parse_args()
+
+    run([int(s) for s in args.modules.split(",")])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Parser extraction benchmark.
+
+Parses large real-world files (by default the biggest modules of the
+running interpreter's standard library), then times the reference
+FunctionCallVisitor against the iterative extract_from_tree on the same
+trees, after checking that both produce identical results. ast.parse is
+timed separately, since it is common to both paths.
+
+A second section times parse_python_source, which pre-filters files that
+cannot contain call sites, against the full parse on a generated corpus
+of the kinds of files it targets (constant tables, migrations, re-export
+shims) mixed with ordinary modules.
+
+Usage:
+    python benchmarks/bench_parser.py [--top 20] [--repeat 3] [--generated 400] [FILE ...]
+"""
+
+import argparse
+import ast
+import sysconfig
+import time
+from pathlib import Path
+
+from pyimpact.analyzer.parser import (
+    FunctionCallVisitor,
+    extract_from_tree,
+    parse_python_source,
+)
+
+
+def largest_stdlib_files(top: int) -> list[Path]:
+    stdlib = Path(sysconfig.get_paths()["stdlib"])
+    files = [p for p in stdlib.glob("*.py") if p.is_file()]
+    files.sort(key=lambda p: p.stat().st_size, reverse=True)
+    return files[:top]
+
+
+def visit(tree: ast.AST) -> tuple:
+    visitor = FunctionCallVisitor()
+    visitor.visit(tree)
+    return visitor.functions, visitor.calls, visitor.imports
+
+
+def best_of(repeat: int, func, items: list) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def constants_module(i: int) -> str:
+    rows = ",\n".join(f"    {j}: ({j * 7 % 101}, 'code-{j}', {j / 3:.4f})" for j in range(2000))
+    return f"from enum import IntEnum\n\nTABLE_{i} = {{\n{rows},\n}}\n"
+
+
+def migration_module(i: int) -> str:
+    fields = "\n".join(
+        f"        migrations.AddField('model{i}', 'field{j}', models.IntegerField(default={j})),"
+        for j in range(40)
+    )
+    return (
+        "from django.db import migrations, models\n\n\n"
+        f"class Migration(migrations.Migration):\n"
+        f"    dependencies = [('app', '{i:04d}_previous')]\n"
+        f"    operations = [\n{fields}\n    ]\n"
+    )
+
+
+def shim_module(i: int) -> str:
+    names = ", ".join(f"name{j}" for j in range(30))
+    return f"from .impl{i} import (\n    {names},\n)\nfrom . import sub{i}\n"
+
+
+def ordinary_module(i: int) -> str:
+    body = "\n\n".join(
+        f"def f{j}(x):\n    return helper{j}(x) + other.g{j}(x)" for j in range(60)
+    )
+    return f"import other\n\n{body}\n"
+
+
+def generated_corpus(n_files: int) -> list[str]:
+    kinds = [constants_module, migration_module, shim_module, ordinary_module]
+    return [kinds[i % len(kinds)](i) for i in range(n_files)]
+
+
+def run_prefilter(n_files: int, repeat: int) -> None:
+    sources = generated_corpus(n_files)
+
+    def full(source: str) -> tuple:
+        return extract_from_tree(ast.parse(source))
+
+    for source in sources:
+        if parse_python_source(source) != full(source):
+            raise SystemExit("pre-filtered result differs from the full parse")
+
+    full_time = best_of(repeat, full, sources)
+    filtered_time = best_of(repeat, parse_python_source, sources)
+
+    size = sum(map(len, sources))
+    print(f"\n{len(sources)} generated files, {size / 1e6:.1f} MB (results identical)")
+    print(f"{'full parse':<18} {full_time * 1e3:>10.1f} ms")
+    print(f"{'pre-filtered':<18} {filtered_time * 1e3:>10.1f} ms")
+    print(f"{'speedup':<18} {full_time / filtered_time:>10.2f} x")
+
+
+def run(files: list[Path], repeat: int) -> None:
+    sources = [path.read_bytes() for path in files]
+
+    start = time.perf_counter()
+    trees = [ast.parse(source) for source in sources]
+    parse_time = time.perf_counter() - start
+
+    for path, tree in zip(files, trees):
+        if visit(tree) != extract_from_tree(tree):
+            raise SystemExit(f"results differ for {path}")
+
+    visitor_time = best_of(repeat, visit, trees)
+    fast_time = best_of(repeat, extract_from_tree, trees)
+
+    n_nodes = sum(1 for tree in trees for _ in ast.walk(tree))
+    size = sum(map(len, sources))
+    print(f"{len(files)} files, {size / 1e6:.1f} MB, {n_nodes} nodes (results identical)")
+    print(f"{'ast.parse':<18} {parse_time * 1e3:>10.1f} ms")
+    print(f"{'visitor':<18} {visitor_time * 1e3:>10.1f} ms")
+    print(f"{'extract_from_tree':<18} {fast_time * 1e3:>10.1f} ms")
+    print(f"{'speedup':<18} {visitor_time / fast_time:>10.2f} x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--generated", type=int, default=400)
+    args = parser.parse_args()
+
+    run(args.files or largest_stdlib_files(args.top), args.repeat)
+    run_prefilter(args.generated, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
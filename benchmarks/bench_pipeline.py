@@ -0,0 +1,299 @@
+"""
+End-to-end pipeline benchmark on a synthetic repository, with regression checks.
+
+Generates a repository with synthetic_repo.py, builds its graph while
+recording the pipeline's metrics (scan, read, ast.parse, extract,
+GraphBuilder.build, merge, Resolver.resolve, ...), writes and loads the
+binary snapshot, and times impact queries: name lookup, single targets
+with their subgraph (on the in-memory graph and on the snapshot), DOT
+rendering and one batch query. Peak memory of the build and of the
+queries is measured in a separate pass, since tracemalloc slows down
+everything it traces.
+
+Timings are also stored divided by a fixed pure-Python calibration
+loop, so a baseline recorded on one machine can be checked on another.
+With --baseline, the run fails (exit status 1) when a stage got slower
+or peak memory grew by more than the tolerance, or when the graph
+counts changed.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--files 400] [--repeat 3] [--json OUT]
+        [--baseline benchmarks/baseline.json [--update-baseline]]
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import fields
+from pathlib import Path
+
+from synthetic_repo import RepoSpec, generate_repo
+
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.colors import impact_colors
+from pyimpact.app.impact import analyze_impact, batch_impact
+from pyimpact.core import metrics
+from pyimpact.core.snapshot import load_snapshot, write_snapshot
+from pyimpact.query.lookup import SymbolLookup
+from pyimpact.reporting.graphviz import RenderOptions, render_dot
+
+# Stages faster than this in the baseline are reported but not checked:
+# their run-to-run noise (mostly I/O) is larger than any sensible
+# tolerance. They are still covered by the stages that contain them.
+NOISE_FLOOR = 0.05
+
+COUNTERS = ["files.scanned", "bytes.read", "graph.nodes", "graph.edges", "calls.unresolved"]
+
+
+def calibrate(repeat: int = 15) -> float:
+    """
+    Best time of a fixed workload of the kind the pipeline does (string
+    formatting, dict building, sorting). Called between the measured
+    runs, so the minimum reflects the machine at its least loaded, like
+    the best-of-N stage timings it scales.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        with no_gc():
+            start = time.perf_counter()
+            names = [f"pkg.mod{i % 500}.func_{i}" for i in range(20_000)]
+            index = {name: name.rpartition(".")[2] for name in names}
+            sorted(index, key=lambda name: (index[name], name))
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+@contextmanager
+def no_gc():
+    """
+    Like timeit: collect, then keep the cyclic GC off while measuring,
+    so garbage left by an earlier run does not land in a later one.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+# One measured run: the calibration taken just before it, and the
+# seconds spent in each stage
+Run = tuple[float, dict[str, float]]
+
+
+def best_stages(runs: list[Run]) -> tuple[dict[str, float], dict[str, float]]:
+    """
+    Best seconds of each stage, and best seconds relative to the
+    calibration of the same run (which follows the machine's speed
+    when other load comes and goes).
+    """
+    stages = runs[0][1]
+    seconds = {stage: min(run[stage] for _, run in runs) for stage in stages}
+    relative = {stage: min(run[stage] / cal for cal, run in runs) for stage in stages}
+    return seconds, relative
+
+
+def time_build(root: Path, repeat: int) -> tuple[list[Run], dict[str, int], object]:
+    runs = []
+    for _ in range(repeat):
+        calibration = calibrate()
+        with no_gc(), metrics.recording(publish=False) as recorded:
+            start = time.perf_counter()
+            graph = build_project_graph(root)
+            wall = time.perf_counter() - start
+        stages = {"build": wall}
+        stages.update({name: seconds for name, (seconds, _) in recorded.totals().items()})
+        runs.append((calibration, stages))
+
+    counts = {name: recorded.counters[name] for name in COUNTERS}
+    return runs, counts, graph
+
+
+def run_queries(graph, snapshot_path: Path, n_targets: int) -> dict[str, float]:
+    stages: dict[str, float] = {}
+
+    def timed(stage: str, func):
+        start = time.perf_counter()
+        result = func()
+        stages[stage] = time.perf_counter() - start
+        return result
+
+    rng = random.Random(0)
+    targets = rng.sample(sorted(graph.nodes, key=lambda s: s.full_name), n_targets)
+    names = [target.full_name for target in targets]
+
+    timed("snapshot.write", lambda: write_snapshot(graph, snapshot_path))
+    mapped = timed("snapshot.load", lambda: load_snapshot(snapshot_path))
+
+    lookup = timed("query.lookup_index", lambda: SymbolLookup.for_graph(graph))
+    timed("query.find", lambda: [lookup.find(name) for name in names])
+    results = timed("query.impact", lambda: [analyze_impact(graph, t) for t in targets])
+    timed("query.impact_snapshot", lambda: [analyze_impact(mapped, t) for t in targets])
+
+    def render() -> None:
+        for r in results:
+            roles = impact_colors(r.target, r.upstream, r.downstream)
+            render_dot(r.nodes, r.edges, roles, RenderOptions.for_size(len(r.nodes)))
+
+    timed("query.render_dot", render)
+    timed("query.batch", lambda: batch_impact(graph, names))
+    return stages
+
+
+def peak_memory(root: Path, snapshot_path: Path, n_targets: int) -> dict[str, float]:
+    """
+    Peak traced allocations in MB of the build, then of the queries.
+    """
+    tracemalloc.start()
+    graph = build_project_graph(root)
+    build_peak = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    run_queries(graph, snapshot_path, n_targets)
+    query_peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return {"build": build_peak / 2**20, "queries": query_peak / 2**20}
+
+
+def run(spec: RepoSpec, repeat: int, n_targets: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate_repo(root, spec)
+        snapshot_path = root / "index.bin"
+
+        build_runs, counts, graph = time_build(root, repeat)
+        query_runs = []
+        for _ in range(repeat):
+            calibration = calibrate()
+            with no_gc():
+                query_runs.append((calibration, run_queries(graph, snapshot_path, n_targets)))
+        memory = peak_memory(root, snapshot_path, n_targets)
+
+    seconds, relative = best_stages(build_runs)
+    query_seconds, query_relative = best_stages(query_runs)
+    seconds.update(query_seconds)
+    relative.update(query_relative)
+
+    return {
+        "spec": spec.to_json(),
+        "python": ".".join(map(str, sys.version_info[:2])),
+        "targets": n_targets,
+        "calibration": min(cal for cal, _ in build_runs + query_runs),
+        "seconds": seconds,
+        "relative": relative,
+        "peak_mb": memory,
+        "counts": counts,
+    }
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    """
+    Regressions of `results` against `baseline`, as messages.
+    """
+    if (results["spec"], results["targets"]) != (baseline["spec"], baseline["targets"]):
+        return ["baseline was recorded for a different repository spec or target count"]
+
+    problems = []
+    for name, count in baseline["counts"].items():
+        if results["counts"].get(name) != count:
+            problems.append(f"{name}: {results['counts'].get(name)} (baseline {count})")
+
+    for stage, relative in baseline["relative"].items():
+        if stage not in results["relative"]:
+            problems.append(f"{stage}: no longer measured")
+        elif baseline["seconds"][stage] >= NOISE_FLOOR:
+            ratio = results["relative"][stage] / relative
+            if ratio > 1 + tolerance:
+                problems.append(f"{stage}: {ratio:.2f}x the baseline time")
+
+    for phase, mb in baseline["peak_mb"].items():
+        ratio = results["peak_mb"][phase] / mb if mb else 1.0
+        if ratio > 1 + memory_tolerance:
+            problems.append(f"peak memory ({phase}): {ratio:.2f}x the baseline")
+
+    return problems
+
+
+def report(results: dict, baseline: dict | None) -> None:
+    calibration = results["calibration"]
+    print(f"calibration {calibration * 1e3:.1f} ms, python {results['python']}")
+    print(f"{'stage':<24} {'ms':>10} {'baseline ms':>12} {'change':>8}")
+    for stage, seconds in results["seconds"].items():
+        line = f"{stage:<24} {seconds * 1e3:>10.1f}"
+        if baseline is not None and stage in baseline["relative"]:
+            # Baseline time scaled to this machine's speed
+            expected = baseline["relative"][stage] * calibration
+            change = results["relative"][stage] / baseline["relative"][stage] - 1
+            line += f" {expected * 1e3:>12.1f} {change:>+8.0%}"
+        print(line)
+
+    print()
+    for phase, mb in results["peak_mb"].items():
+        print(f"{'peak MB (' + phase + ')':<24} {mb:>10.1f}")
+    for name, count in results["counts"].items():
+        print(f"{name:<24} {count:>10,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    for field in fields(RepoSpec):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}", type=type(field.default), default=field.default
+        )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--targets", type=int, default=10)
+    parser.add_argument("--json", type=Path, help="Also write the results here.")
+    parser.add_argument("--baseline", type=Path, help="Results to compare against.")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Write the results to --baseline."
+    )
+    # Shared CI machines vary by ±40% between runs; 2x slowdowns are caught
+    parser.add_argument("--tolerance", type=float, default=0.75)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    spec = RepoSpec(**{f.name: getattr(args, f.name) for f in fields(RepoSpec)})
+    results = run(spec, args.repeat, args.targets)
+
+    baseline = None
+    if args.baseline is not None and not args.update_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+
+    report(results, baseline)
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        if args.baseline is None:
+            parser.error("--update-baseline needs --baseline")
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nWrote baseline {args.baseline}")
+
+    if baseline is not None:
+        if baseline["python"] != results["python"]:
+            print(f"\nnote: baseline was recorded with Python {baseline['python']}")
+        problems = compare(results, baseline, args.tolerance, args.memory_tolerance)
+        if problems:
+            print("\nRegressions against the baseline:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
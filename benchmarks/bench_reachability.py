@@ -0,0 +1,82 @@
+"""
+ReachabilityIndex vs BFS: build cost, full impact sets and point queries.
+
+Builds a synthetic call graph (its random back edges form large
+recursive components), then compares upstream/downstream sets and
+"does X affect Y" answered by BFS over the CompactGraph against
+answers read from the precomputed index.
+
+Usage:
+    python benchmarks/bench_reachability.py [--nodes 20000] [--fanout 3]
+"""
+
+import argparse
+import random
+import time
+
+from bench_compact import make_edges, make_functions, measure
+
+from pyimpact.core.compact import CompactGraph
+from pyimpact.core.model import DependencyGraph
+from pyimpact.core.reachability import ReachabilityIndex
+from pyimpact.query.engine import ImpactAnalyzer
+
+
+def per_call(fn, args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def run(n_nodes: int, fanout: int, n_queries: int) -> None:
+    functions = make_functions(n_nodes)
+
+    graph = DependencyGraph()
+    for fn in functions:
+        graph.add_node(fn)
+    for src, dst in make_edges(n_nodes, fanout):
+        graph.add_edge(functions[src].id, functions[dst].id)
+
+    compact = CompactGraph.from_graph(graph)
+
+    start = time.perf_counter()
+    index = ReachabilityIndex.from_graph(compact)
+    build = time.perf_counter() - start
+    _, memory = measure(lambda: ReachabilityIndex.from_graph(compact))
+
+    bfs = ImpactAnalyzer(compact)
+    indexed = ImpactAnalyzer(compact, reachability=index)
+
+    rng = random.Random(1)
+    starts = [(functions[rng.randrange(n_nodes)].id,) for _ in range(n_queries)]
+    pairs = [
+        (functions[rng.randrange(n_nodes)].id, functions[rng.randrange(n_nodes)].id)
+        for _ in range(n_queries)
+    ]
+
+    print(f"nodes={n_nodes} edges={compact.edge_count} components={len(index)}")
+    print(f"index build      {build * 1e3:10.1f} ms")
+    print(f"index memory     {memory / 2**20:10.1f} MB")
+    print(f"{'':<16} {'BFS ms':>10} {'index ms':>10}")
+    for name in ("upstream", "downstream"):
+        plain = per_call(getattr(bfs, name), starts)
+        fast = per_call(getattr(indexed, name), starts)
+        print(f"{name:<16} {plain * 1e3:>10.3f} {fast * 1e3:>10.3f}")
+    plain = per_call(bfs.affects, pairs)
+    fast = per_call(indexed.affects, pairs)
+    print(f"{'affects':<16} {plain * 1e3:>10.3f} {fast * 1e3:>10.4f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=20_000)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    run(args.nodes, args.fanout, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Resolver scaling benchmark.
+
+Builds synthetic graphs where every module calls functions defined in
+other modules, then times `Resolver.resolve`. With indexed lookup the
+time per call should stay flat as the graph grows.
+
+Usage:
+    python benchmarks/bench_resolver.py [--sizes 1000,2000,4000,8000,16000]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from pyimpact.analyzer.resolver import Resolver
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import CallSite, CodeLocation, DependencyGraph, FunctionSymbol
+
+FUNCTIONS_PER_MODULE = 10
+
+
+def make_graph(n_functions: int) -> DependencyGraph:
+    """
+    n_functions nodes and n_functions cross-module unresolved calls.
+    """
+    graph = DependencyGraph()
+    n_modules = max(1, n_functions // FUNCTIONS_PER_MODULE)
+
+    for i in range(n_functions):
+        module = f"m{i % n_modules}"
+        sid = SymbolId("python", module, f"f{i}")
+        graph.add_node(
+            FunctionSymbol(
+                id=sid,
+                name=sid.qualname,
+                module=module,
+                location=CodeLocation(Path(f"{module}.py"), i, 0),
+            )
+        )
+
+    ids = list(graph.nodes)
+    for i, caller in enumerate(ids):
+        callee = ids[(i * 7 + 3) % len(ids)]
+        graph.unresolved_calls.append(
+            CallSite(
+                caller_id=caller,
+                callee_name=callee.qualname,
+                callee_id=None,
+                location=CodeLocation(Path(f"{caller.module}.py"), i, 4),
+            )
+        )
+
+    return graph
+
+
+def run(sizes: list[int]) -> None:
+    print(f"{'calls':>8} {'total ms':>10} {'us/call':>8}")
+
+    for size in sizes:
+        graph = make_graph(size)
+
+        start = time.perf_counter()
+        Resolver().resolve(graph)
+        elapsed = time.perf_counter() - start
+
+        print(f"{size:>8} {elapsed * 1e3:>10.2f} {elapsed / size * 1e6:>8.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,2000,4000,8000,16000,32000")
+    args = parser.parse_args()
+
+    run([int(s) for s in args.sizes.split(",")])
+
+
+if __name__ == "__main__":
+    main()
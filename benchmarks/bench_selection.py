@@ -0,0 +1,103 @@
+"""
+Test selection benchmark: time to answer a query from a saved test index.
+
+Builds a synthetic graph with test functions calling into it, saves the
+TestIndex and times loading it plus selecting the tests for a set of
+changed files. Only the changed files' spans and symbols are decoded,
+so the query time should not grow with the size of the project.
+
+Usage:
+    python benchmarks/bench_selection.py [--nodes 100000] [--tests 5000] [--changed 50]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from bench_compact import make_edges, make_functions
+
+from pyimpact.app.tests_index import TestIndex, load_test_index, write_test_index
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import CodeLocation, DependencyGraph, FunctionSymbol
+
+ROOT = Path("/project")
+
+
+def make_graph(n_nodes: int, n_tests: int, fanout: int, seed: int = 0) -> DependencyGraph:
+    functions = [
+        FunctionSymbol(
+            id=fn.id,
+            name=fn.name,
+            module=fn.module,
+            location=CodeLocation(ROOT / fn.location.file_path, fn.location.line, 0),
+        )
+        for fn in make_functions(n_nodes)
+    ]
+
+    graph = DependencyGraph()
+    for fn in functions:
+        graph.add_node(fn)
+    for src, dst in make_edges(n_nodes, fanout, seed):
+        graph.add_edge(functions[src].id, functions[dst].id)
+
+    rng = random.Random(seed)
+    for i in range(n_tests):
+        module = f"tests.test_mod{i // 20}"
+        test = FunctionSymbol(
+            id=SymbolId("python", module, f"test_{i}"),
+            name=f"test_{i}",
+            module=module,
+            location=CodeLocation(ROOT / "tests" / f"test_mod{i // 20}.py", i % 20 * 5, 0),
+        )
+        graph.add_node(test)
+        for _ in range(3):
+            graph.add_edge(test.id, functions[rng.randrange(n_nodes)].id)
+
+    return graph
+
+
+def run(n_nodes: int, n_tests: int, n_changed: int, fanout: int) -> None:
+    graph = make_graph(n_nodes, n_tests, fanout)
+
+    start = time.perf_counter()
+    index = TestIndex.from_graph(graph, ROOT)
+    build_time = time.perf_counter() - start
+
+    files = sorted(index.locations.files(), key=str)
+    changed = random.Random(1).sample(files, min(n_changed, len(files)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tests.bin"
+
+        start = time.perf_counter()
+        write_test_index(index, path)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mapped = load_test_index(path)
+        symbols = [fn.id for file_path in changed for fn in mapped.locations.in_file(file_path)]
+        selected = [mapped.node_ids[i] for i in mapped.select(symbols)]
+        query_time = time.perf_counter() - start
+
+        print(f"nodes={len(graph.nodes)} tests={len(index.tests)} changed files={len(changed)}")
+        print(f"file size        {path.stat().st_size / 2**20:8.1f} MB")
+        print(f"build            {build_time * 1e3:8.1f} ms")
+        print(f"write            {write_time * 1e3:8.1f} ms")
+        print(f"load + select    {query_time * 1e3:8.3f} ms ({len(selected)} tests)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--tests", type=int, default=5_000)
+    parser.add_argument("--changed", type=int, default=50)
+    parser.add_argument("--fanout", type=int, default=4)
+    args = parser.parse_args()
+
+    run(args.nodes, args.tests, args.changed, args.fanout)
+
+
+if __name__ == "__main__":
+    main()
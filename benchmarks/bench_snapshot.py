@@ -0,0 +1,67 @@
+"""
+Snapshot benchmark: write time, file size, load time and first query.
+
+Loading memory-maps the file, so it should take well under a
+millisecond no matter how large the graph is; a query only decodes
+the nodes it reaches, so its cost scales with the result size.
+
+Usage:
+    python benchmarks/bench_snapshot.py [--nodes 200000] [--fanout 4]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from bench_compact import make_edges, make_functions
+
+from pyimpact.app.impact import find_target
+from pyimpact.core.model import DependencyGraph
+from pyimpact.core.snapshot import load_snapshot, write_snapshot
+from pyimpact.query.engine import ImpactAnalyzer
+
+
+def run(n_nodes: int, fanout: int) -> None:
+    functions = make_functions(n_nodes)
+
+    graph = DependencyGraph()
+    for fn in functions:
+        graph.add_node(fn)
+    for src, dst in make_edges(n_nodes, fanout):
+        graph.add_edge(functions[src].id, functions[dst].id)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.bin"
+
+        start = time.perf_counter()
+        write_snapshot(graph, path)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mapped = load_snapshot(path)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        target = find_target(mapped, functions[n_nodes - 10].id.qualname)
+        reached = ImpactAnalyzer(mapped).downstream(target)
+        query_time = time.perf_counter() - start
+
+        print(f"nodes={n_nodes} edges={mapped.edge_count}")
+        print(f"file size        {path.stat().st_size / 2**20:8.1f} MB")
+        print(f"write            {write_time * 1e3:8.1f} ms")
+        print(f"load (mmap)      {load_time * 1e3:8.3f} ms")
+        print(f"first query      {query_time * 1e3:8.3f} ms ({len(reached)} nodes)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=200_000)
+    parser.add_argument("--fanout", type=int, default=4)
+    args = parser.parse_args()
+
+    run(args.nodes, args.fanout)
+
+
+if __name__ == "__main__":
+    main()
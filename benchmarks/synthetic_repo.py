@@ -0,0 +1,157 @@
+"""
+Deterministic synthetic Python repository generator.
+
+Writes src/synth/pkg<P>/mod<M>.py files whose functions call each other
+with a configurable fan-out. Calls mostly go "down" (to later functions
+and modules), like layered code. Some go to other modules through
+`from ... import` or `import ... as` statements, some to methods of
+nested classes, and some back up the call chain, which makes the
+recursive cycles real code has. The same spec and seed always produce
+the same files, so timings and graph sizes can be compared across runs.
+
+Usage:
+    python benchmarks/synthetic_repo.py OUTPUT_DIR [--files 400] [--functions 20] [--seed 0]
+"""
+
+import argparse
+import random
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+# Modules per generated package
+MODULES_PER_PACKAGE = 25
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    files: int = 400
+    # Top-level functions per file; methods come on top (see class_depth)
+    functions: int = 20
+    # Calls made by each function
+    fanout: int = 4
+    # Share of calls that go to another module through an import
+    import_density: float = 0.3
+    # Depth of the nested classes in each file (0: no classes)
+    class_depth: int = 2
+    # Share of calls that go back to the caller or an earlier function
+    recursion: float = 0.05
+    seed: int = 0
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: dict) -> "RepoSpec":
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+
+
+def module_name(index: int) -> str:
+    return f"synth.pkg{index // MODULES_PER_PACKAGE}.mod{index}"
+
+
+def _module_source(index: int, spec: RepoSpec, rng: random.Random) -> str:
+    imports: dict[str, str] = {}
+    from_imports: dict[str, set[str]] = {}
+
+    def cross_module_call(back: bool = False) -> str:
+        if back:
+            # Back edges stay inside the package, so cycles are local
+            first = index - index % MODULES_PER_PACKAGE
+            other = rng.randrange(first, min(spec.files, first + MODULES_PER_PACKAGE))
+        else:
+            other = min(spec.files - 1, index + 1 + int(rng.expovariate(1 / 20)))
+        target = f"f{rng.randrange(spec.functions)}"
+        if other == index:
+            return f"{target}()"
+        name = module_name(other)
+        alias = f"m{other}"
+        if rng.random() < 0.5:
+            # Aliased, so it cannot clash with this module's own f<N>
+            from_imports.setdefault(name, set()).add(f"{target} as {alias}_{target}")
+            return f"{alias}_{target}()"
+        imports[name] = alias
+        return f"{alias}.{target}()"
+
+    def call(position: int, own: str) -> str:
+        roll = rng.random()
+        if roll < spec.recursion:
+            # Self-recursion or a call back up the chain: cycles
+            if rng.random() < 0.5:
+                return cross_module_call(back=True)
+            return f"{own}()" if position == 0 else f"f{rng.randrange(position + 1)}()"
+        if roll < spec.recursion + spec.import_density:
+            return cross_module_call()
+        if spec.class_depth and roll < spec.recursion + spec.import_density + 0.1:
+            depth = rng.randrange(spec.class_depth)
+            owner = ".".join(f"C{d}" for d in range(depth + 1))
+            return f"{owner}().m{depth}()"
+        if roll > 0.97:
+            # Calls that leave the project stay unresolved
+            return "os.path.join('a', 'b')"
+        later = min(spec.functions - 1, position + 1 + int(rng.expovariate(1 / 3)))
+        return f"f{later}()"
+
+    body: list[str] = []
+    for i in range(spec.functions):
+        calls = [call(i, f"f{i}") for _ in range(spec.fanout)]
+        body.append(f"def f{i}(x=None):\n" + "".join(f"    {c}\n" for c in calls))
+
+    indent = ""
+    for depth in range(spec.class_depth):
+        body.append(f"{indent}class C{depth}:")
+        indent += "    "
+        body.append(
+            f"{indent}def m{depth}(self):\n"
+            f"{indent}    self.m{depth}_helper()\n"
+            f"{indent}    f{rng.randrange(spec.functions)}()\n"
+            f"\n"
+            f"{indent}def m{depth}_helper(self):\n"
+            f"{indent}    {cross_module_call()}\n"
+        )
+
+    header = ["import os"]
+    header += [f"import {name} as {alias}" for name, alias in sorted(imports.items())]
+    header += [
+        f"from {name} import {', '.join(sorted(names))}"
+        for name, names in sorted(from_imports.items())
+    ]
+    return "\n".join(header) + "\n\n\n" + "\n\n".join(body) + "\n"
+
+
+def generate_repo(root: Path, spec: RepoSpec) -> list[Path]:
+    """
+    Write the repository described by `spec` below `root`; returns the
+    files written.
+    """
+    rng = random.Random(spec.seed)
+    package_root = root / "src" / "synth"
+    written = []
+
+    for index in range(spec.files):
+        path = root / "src" / Path(*module_name(index).split(".")).with_suffix(".py")
+        if not path.parent.is_dir():
+            path.parent.mkdir(parents=True)
+            (path.parent / "__init__.py").write_text("")
+        path.write_text(_module_source(index, spec, rng))
+        written.append(path)
+
+    (package_root / "__init__.py").write_text("")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output", type=Path)
+    for field in fields(RepoSpec):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}", type=type(field.default), default=field.default
+        )
+    args = parser.parse_args()
+
+    spec = RepoSpec(**{f.name: getattr(args, f.name) for f in fields(RepoSpec)})
+    files = generate_repo(args.output, spec)
+    print(f"Wrote {len(files)} files below {args.output / 'src'}")
+
+
+if __name__ == "__main__":
+    main()
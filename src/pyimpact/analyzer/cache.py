@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from pyimpact import __version__
+from pyimpact.analyzer.parser import PackedResult, ParseResult, pack_result, unpack_result
+
+# Bump whenever the stored layout, the parser DTOs or the way cached
+# graphs name their symbols change
+CACHE_FORMAT = 7
+
+DEFAULT_CACHE_DIR = Path(".pyimpact") / "cache"
+
+_CACHE_FILE = "parse-cache.json"
+
+
+def _python_tag() -> str:
+    """
+    Identify the interpreter that produced the cached ASTs.
+    """
+    major, minor, micro = sys.version_info[:3]
+    return f"{sys.implementation.name}-{major}.{minor}.{micro}"
+
+
+def cache_header() -> Tuple[int, str, str]:
+    """
+    Stamp stored with every cache file; a mismatch invalidates the file.
+    """
+    return (CACHE_FORMAT, __version__, _python_tag())
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write `data` to `path` via a temporary file, so readers never see a
+    partial write.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def content_digest(data: bytes) -> str:
+    """
+    Hash file contents for cache validation.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def tree_fingerprint(paths: list[Path]) -> str:
+    """
+    Cheap identity of a source tree: path, mtime and size of each file.
+    """
+    entries = []
+    for path in paths:
+        st = path.stat()
+        entries.append(f"{path}\0{st.st_mtime_ns}\0{st.st_size}")
+    return content_digest("\n".join(entries).encode("utf-8", "surrogateescape"))
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """
+    Identity of a file's contents at the time it was parsed.
+    """
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+def read_with_fingerprint(path: Path) -> Tuple[bytes, FileFingerprint]:
+    """
+    Read a file and fingerprint it in one go.
+
+    The stat is taken *before* reading, so a concurrent edit can at worst
+    make the stored stat look stale, which only costs a re-hash later.
+    """
+    st = path.stat()
+    data = path.read_bytes()
+    return data, FileFingerprint(
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+        digest=content_digest(data),
+    )
+
+
+class ParseCache:
+    """
+    Persistent per-file cache of parser results.
+
+    Entries are keyed by file path and validated in two steps:
+    - mtime + size match → hit without touching the file contents
+    - otherwise, same size and same content hash → hit (stat refreshed)
+
+    The whole cache is discarded when the pyimpact version, the Python
+    version or the cache format changes.
+
+    The cache lives inside the analysed checkout, so it is stored as JSON
+    of plain tuples (see pack_result): loading a file planted in an
+    untrusted branch can at worst give wrong results, never run code.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: Dict[str, Tuple[FileFingerprint, PackedResult]] = {}
+        self._dirty = False
+
+    @classmethod
+    def for_project(cls, project_root: Path) -> "ParseCache":
+        """
+        Open (and load) the default cache for a project.
+        """
+        cache = cls(project_root / DEFAULT_CACHE_DIR)
+        cache.load()
+        return cache
+
+    @property
+    def path(self) -> Path:
+        return self.directory / _CACHE_FILE
+
+    # -------- Persistence --------
+
+    def load(self) -> None:
+        """
+        Load entries from disk. A missing, corrupt or outdated cache
+        file simply results in an empty cache.
+        """
+        self._entries = {}
+        self._dirty = False
+
+        try:
+            with self.path.open("rb") as f:
+                header, entries = json.load(f)
+            if header != list(cache_header()):
+                self._dirty = True
+                return
+            self._entries = {
+                path: (FileFingerprint(mtime_ns, size, digest), packed)
+                for path, (mtime_ns, size, digest, packed) in entries.items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError):
+            # Missing file, truncated write, or not a cache of this
+            # layout — start from scratch
+            self._entries = {}
+
+    def save(self) -> None:
+        """
+        Write the cache to disk atomically, if anything changed.
+        """
+        if not self._dirty:
+            return
+
+        entries = {
+            path: (fp.mtime_ns, fp.size, fp.digest, packed)
+            for path, (fp, packed) in self._entries.items()
+        }
+        data = json.dumps((cache_header(), entries), separators=(",", ":"))
+        write_atomic(self.path, data.encode("utf-8"))
+        self._dirty = False
+
+    # -------- Lookup --------
+
+    def get(self, path: Path) -> Optional[ParseResult]:
+        """
+        Return the cached parse result for `path`, or None if the file
+        changed (or was never cached).
+        """
+        entry = self._entries.get(str(path))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        fingerprint, packed = entry
+
+        try:
+            st = path.stat()
+        except OSError:
+            self.misses += 1
+            return None
+
+        if st.st_mtime_ns == fingerprint.mtime_ns and st.st_size == fingerprint.size:
+            return self._hit(packed)
+
+        # Stat changed (touch, fresh checkout, ...) — compare contents
+        if st.st_size == fingerprint.size:
+            try:
+                data = path.read_bytes()
+            except OSError:
+                self.misses += 1
+                return None
+
+            if content_digest(data) == fingerprint.digest:
+                self._entries[str(path)] = (
+                    FileFingerprint(st.st_mtime_ns, st.st_size, fingerprint.digest),
+                    packed,
+                )
+                self._dirty = True
+                return self._hit(packed)
+
+        self.misses += 1
+        return None
+
+    def _hit(self, packed: PackedResult) -> Optional[ParseResult]:
+        try:
+            result = unpack_result(packed)
+        except (TypeError, ValueError):
+            # An entry that does not fit the DTOs
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, path: Path, fingerprint: FileFingerprint, result: ParseResult) -> None:
+        """
+        Store the parse result for `path`.
+        """
+        self._entries[str(path)] = (fingerprint, pack_result(result))
+        self._dirty = True
+
+    def prune(self, live_paths: Iterable[Path]) -> None:
+        """
+        Drop entries for files that are no longer part of the project.
+        """
+        live = {str(p) for p in live_paths}
+        stale = [key for key in self._entries if key not in live]
+
+        for key in stale:
+            del self._entries[key]
+
+        if stale:
+            self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -7,6 +7,7 @@ from pyimpact.core.model import (
     CodeLocation,
     DependencyGraph,
     FunctionSymbol,
+    ModuleImport,
 )
 from pyimpact.analyzer.parser import (
     FunctionDefInfo,
@@ -15,6 +16,75 @@ from pyimpact.analyzer.parser import (
 )
 
 
+# Receivers that refer to the enclosing class/instance rather than an import
+LOCAL_QUALIFIERS = {"self", "cls"}
+
+LOCALS = ".<locals>."
+
+
+def local_callee(
+    symbols: dict[str, SymbolId],
+    caller: str,
+    class_name: str | None,
+    call: CallSiteInfo,
+) -> SymbolId | None:
+    """
+    Find the callee of `call` among the definitions of its own module.
+
+    A bare name is looked up through the caller's function scopes, the
+    innermost first, then at module level (class bodies are not
+    enclosing scopes, as in Python). `self.f()` and `cls.f()` look in
+    the caller's class.
+    """
+    if call.qualifier is None:
+        scope = caller + LOCALS
+        while True:
+            found = symbols.get(scope + call.callee)
+            if found is not None or not scope:
+                return found
+            # Up to the enclosing function's scope, or module level
+            cut = scope.rfind(LOCALS, 0, len(scope) - len(LOCALS))
+            scope = scope[: cut + len(LOCALS)] if cut != -1 else ""
+
+    if call.qualifier in LOCAL_QUALIFIERS and class_name is not None:
+        return symbols.get(f"{class_name}.{call.callee}")
+
+    return None
+
+
+def absolute_import(
+    info: ImportInfo,
+    module_name: str,
+    is_package: bool,
+) -> ModuleImport:
+    """
+    Turn a (possibly relative) import into an absolute ModuleImport.
+
+    `from ..x import y` inside module "a.b.c" refers to "a.x". Inside
+    "a/b/__init__.py" (module "a.b") it refers to "a.x" as well, because
+    a package is its own level-1 anchor.
+    """
+    if info.level == 0:
+        return ModuleImport(module=info.module, name=info.name, alias=info.alias)
+
+    package_parts = module_name.split(".")
+    if not is_package:
+        package_parts = package_parts[:-1]
+
+    # level=1 is the current package, each extra level goes one up
+    drop = info.level - 1
+    base_parts = package_parts[: max(0, len(package_parts) - drop)]
+
+    if info.module:
+        base_parts = [*base_parts, info.module]
+
+    return ModuleImport(
+        module=".".join(part for part in base_parts if part),
+        name=info.name,
+        alias=info.alias,
+    )
+
+
 class GraphBuilder:
     """
     Builds a DependencyGraph from parsed source files.
@@ -48,17 +118,25 @@ class GraphBuilder:
             DependencyGraph containing:
             - nodes for function definitions
             - edges for resolved calls
-            - unresolved_calls for later resolution
+            - unresolved_calls (and call_sites) for later resolution
+            - the module's import table (relative imports made absolute)
         """
         graph = DependencyGraph()
 
+        is_package = file_path.name == "__init__.py"
+        graph.imports[module_name] = [
+            absolute_import(info, module_name, is_package) for info in imports
+        ]
+
         # --------------------------------------------------
         # Step 1: create function symbols (nodes)
         # --------------------------------------------------
-        name_to_symbol: dict[str, SymbolId] = {}
+        qualname_to_symbol: dict[str, SymbolId] = {}
+        class_of: dict[str, str | None] = {}
 
         for fn in functions:
-            symbol_id = SymbolId(language=self.language,module=module_name,qualname=fn.name)
+            qualname = fn.qualname or fn.name
+            symbol_id = SymbolId(language=self.language, module=module_name, qualname=qualname)
 
             symbol = FunctionSymbol(
                 id=symbol_id,
@@ -68,22 +146,27 @@ class GraphBuilder:
                     file_path=file_path,
                     line=fn.lineno,
                     column=fn.col_offset,
+                    end_line=fn.end_lineno,
                 ),
+                is_async=fn.is_async,
+                class_name=fn.class_name,
             )
 
             graph.add_node(symbol)
-            name_to_symbol[fn.name] = symbol_id
+            qualname_to_symbol[qualname] = symbol_id
+            class_of[qualname] = fn.class_name
 
         # --------------------------------------------------
         # Step 2: add edges for call sites
         # --------------------------------------------------
         for call in calls:
-            caller_id = name_to_symbol.get(call.caller)
+            caller_id = qualname_to_symbol.get(call.caller)
             if caller_id is None:
                 # Call outside a known function — ignore
                 continue
 
-            callee_id = name_to_symbol.get(call.callee)
+            # `mod.f()` must go through the import table, not local names
+            callee_id = local_callee(qualname_to_symbol, call.caller, class_of[call.caller], call)
 
             call_site = CallSite(
                 caller_id=caller_id,
@@ -94,6 +177,7 @@ class GraphBuilder:
                     line=call.lineno,
                     column=call.col_offset,
                 ),
+                callee_qualifier=call.qualifier,
             )
 
             if callee_id:
@@ -102,5 +186,6 @@ class GraphBuilder:
             else:
                 # Cross-file or unresolved — resolver will handle it
                 graph.unresolved_calls.append(call_site)
+                graph.call_sites.setdefault(module_name, []).append(call_site)
 
         return graph
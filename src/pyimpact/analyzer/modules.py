@@ -0,0 +1,142 @@
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+# Import root picked up without configuration (src layout)
+SRC_DIR = "src"
+
+
+class ModuleNamer:
+    """
+    Dotted module names from a project's package layout.
+
+    - Below an import root (configured, or `src/` when it is not itself a
+      package) every directory is a package, so namespace packages get
+      their full name: src/ns/pkg/mod.py → ns.pkg.mod
+    - Elsewhere, regular packages are followed up through their
+      __init__.py files: lib/pkg/sub/mod.py → pkg.sub.mod
+    - Modules outside any package are named by their path from the
+      project root: tests/unit/test_x.py → tests.unit.test_x
+
+    The dotted name of each directory is computed once and memoized, so
+    naming N files costs one dict lookup per file plus one step per
+    distinct directory.
+
+    Package directories are read from `packages` when given (e.g. the
+    file list of a git commit), otherwise from disk.
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        roots: Sequence[str | Path] = (),
+        packages: Optional[Iterable[str | Path]] = None,
+    ) -> None:
+        # Directories are handled as plain strings: hashing and splitting
+        # them is several times cheaper than with Path objects
+        self.project_root = project_root
+        self._root = os.fspath(project_root)
+        self._packages = {os.fspath(p) for p in packages} if packages is not None else None
+        self._is_package: dict[str, bool] = {}
+        self._prefixes: dict[str, str] = {}
+
+        if roots:
+            self.roots = {os.fspath(project_root / root) for root in roots}
+        else:
+            src = os.path.join(self._root, SRC_DIR)
+            self.roots = {src} if os.path.isdir(src) and not self._package(src) else set()
+
+    @classmethod
+    def from_files(
+        cls,
+        project_root: Path,
+        files: Iterable[Path],
+        roots: Sequence[str | Path] = (),
+    ) -> "ModuleNamer":
+        """
+        Namer for a known file list; no filesystem access per directory.
+        """
+        init = os.sep + "__init__.py"
+        packages = [path[: -len(init)] for path in map(os.fspath, files) if path.endswith(init)]
+        return cls(project_root, roots, packages)
+
+    def is_package(self, directory: Path) -> bool:
+        return self._package(os.fspath(directory))
+
+    def _package(self, directory: str) -> bool:
+        known = self._is_package.get(directory)
+        if known is None:
+            if self._packages is not None:
+                known = directory in self._packages
+            else:
+                known = os.path.isfile(os.path.join(directory, "__init__.py"))
+            self._is_package[directory] = known
+        return known
+
+    def prefix(self, directory: Path) -> str:
+        """
+        Dotted package name of `directory` ("" for an import root).
+        """
+        return self._prefix(os.fspath(directory))
+
+    def _prefix(self, directory: str) -> str:
+        prefix = self._prefixes.get(directory)
+        if prefix is not None:
+            return prefix
+
+        parent, name = os.path.split(directory)
+        if directory in self.roots:
+            prefix = ""
+        elif any(_is_within(directory, root) for root in self.roots):
+            prefix = _join(self._prefix(parent), name)
+        elif self._package(directory):
+            # The topmost regular package sits right below an import root
+            outer = self._prefix(parent) if self._package(parent) else ""
+            prefix = _join(outer, name)
+        elif _is_within(directory, self._root) and directory != self._root:
+            prefix = _join(self._prefix(parent), name)
+        else:
+            prefix = ""
+
+        self._prefixes[directory] = prefix
+        return prefix
+
+    def module_name(self, file_path: Path) -> str:
+        """
+        Dotted module name of a source file; a package's __init__.py is
+        named after the package.
+        """
+        directory, _, name = os.fspath(file_path).rpartition(os.sep)
+        prefix = self._prefixes.get(directory)
+        if prefix is None:
+            prefix = self._prefix(directory or os.sep)
+
+        if name == "__init__.py":
+            return prefix or os.path.basename(directory)
+        stem = name.rpartition(".")[0] or name
+        return f"{prefix}.{stem}" if prefix else stem
+
+    def is_stale(self, changed: Iterable[Path]) -> bool:
+        """
+        True if adding or removing one of `changed` moves a package
+        boundary this namer has already relied on.
+        """
+        for path in changed:
+            if path.name != "__init__.py":
+                continue
+            directory = os.fspath(path.parent)
+            if self._packages is not None:
+                known: Optional[bool] = directory in self._packages
+            else:
+                known = self._is_package.get(directory)
+            if known is not None and known != path.is_file():
+                return True
+        return False
+
+
+def _is_within(directory: str, root: str) -> bool:
+    return directory.startswith(root) and directory[len(root) : len(root) + 1] in ("", os.sep)
+
+
+def _join(prefix: str, name: str) -> str:
+    return f"{prefix}.{name}" if prefix else name
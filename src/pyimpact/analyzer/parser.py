@@ -1,35 +1,65 @@
 import ast
+import io
+import re
+import signal
+import threading
+import tokenize
+from contextlib import contextmanager
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, fields
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from pyimpact.core import metrics
 
 
 # =========================
 # Data transfer objects
 # =========================
 
-@dataclass
+# The DTOs use __slots__: a large project produces millions of call sites,
+# and slotted instances are smaller and faster to create than dict-backed
+# ones.
+
+@dataclass(slots=True)
 class FunctionDefInfo:
     """
     Lightweight representation of a function definition.
+    `end_lineno` is the last line of its body.
+
+    `qualname` follows Python's __qualname__:
+      def f(): ...                 -> "f"
+      class A: def m(self): ...    -> "A.m"   (class_name="A")
+      def outer(): def inner(): .. -> "outer.<locals>.inner"
     """
     name: str
     lineno: int
     col_offset: int
+    end_lineno: Optional[int] = None
+    qualname: Optional[str] = None
+    class_name: Optional[str] = None
+    is_async: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class CallSiteInfo:
     """
     Lightweight representation of a function call inside another function.
+    `caller` is the qualname of the enclosing function.
+
+    `qualifier` is the receiver of an attribute call:
+      foo()          -> qualifier=None
+      mod.foo()      -> qualifier="mod"
+      a.b.foo()      -> qualifier="a.b"
+      get().foo()    -> qualifier=""  (receiver is not a dotted name)
     """
     caller: str
     callee: str
     lineno: int
     col_offset: int
+    qualifier: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ImportInfo:
     """
     Represents an import statement.
@@ -40,10 +70,53 @@ class ImportInfo:
 
       import a.b as c
         module="a.b", name=None, alias="c"
+
+      from ..x import y
+        module="x", name="y", alias=None, level=2
     """
     module: str
     name: Optional[str]
     alias: Optional[str]
+    level: int = 0
+
+
+ParseResult = Tuple[
+    List[FunctionDefInfo],
+    List[CallSiteInfo],
+    List[ImportInfo],
+]
+"""Per-file parser output: (functions, calls, imports)."""
+
+# The same output as plain tuples of the DTO fields, in field order.
+# Worker processes send results back in this form, and the parse cache
+# stores it: plain tuples pickle far smaller and faster than per-instance
+# dataclass state, and they carry nothing but str, int, bool and None.
+PackedResult = Tuple[tuple, tuple, tuple]
+
+
+def _pack_items(items: Sequence) -> tuple:
+    if not items:
+        return ()
+    names = [f.name for f in fields(items[0])]
+    return tuple(tuple(getattr(item, name) for name in names) for item in items)
+
+
+def pack_result(result: ParseResult) -> PackedResult:
+    functions, calls, imports = result
+    return _pack_items(functions), _pack_items(calls), _pack_items(imports)
+
+
+def unpack_result(packed: PackedResult) -> ParseResult:
+    """
+    Raises:
+        TypeError: if a packed item does not match its DTO's fields
+    """
+    functions, calls, imports = packed
+    return (
+        [FunctionDefInfo(*f) for f in functions],
+        [CallSiteInfo(*c) for c in calls],
+        [ImportInfo(*i) for i in imports],
+    )
 
 
 # =========================
@@ -56,6 +129,9 @@ class FunctionCallVisitor(ast.NodeVisitor):
     - function definitions
     - call sites inside functions
     - import statements
+
+    This is the reference implementation. Parsing goes through
+    extract_from_tree, which must produce the same result.
     """
 
     def __init__(self) -> None:
@@ -64,27 +140,54 @@ class FunctionCallVisitor(ast.NodeVisitor):
         self.imports: List[ImportInfo] = []
 
         self._current_function: Optional[str] = None
+        # Qualname prefix of the current scope ("", "A.", "f.<locals>.")
+        self._prefix = ""
+        # Qualname of the class whose body is being visited, if any
+        self._class: Optional[str] = None
+
+    # -------- Scopes --------
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        previous = self._prefix, self._class
+
+        self._class = self._prefix + node.name
+        self._prefix = self._class + "."
+
+        self.generic_visit(node)
+
+        self._prefix, self._class = previous
 
     # -------- Function definitions --------
 
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        qualname = self._prefix + node.name
+
         self.functions.append(
             FunctionDefInfo(
                 name=node.name,
                 lineno=node.lineno,
                 col_offset=node.col_offset,
+                end_lineno=node.end_lineno,
+                qualname=qualname,
+                class_name=self._class,
+                is_async=isinstance(node, ast.AsyncFunctionDef),
             )
         )
 
-        previous = self._current_function
-        self._current_function = node.name
+        previous = self._current_function, self._prefix, self._class
+        self._current_function = qualname
+        self._prefix = qualname + ".<locals>."
+        self._class = None
 
         self.generic_visit(node)
 
-        self._current_function = previous
+        self._current_function, self._prefix, self._class = previous
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
-        self.visit_FunctionDef(node)
+        self._visit_function(node)
 
     # -------- Function calls --------
 
@@ -98,6 +201,7 @@ class FunctionCallVisitor(ast.NodeVisitor):
                         callee=callee_name,
                         lineno=node.lineno,
                         col_offset=node.col_offset,
+                        qualifier=self._extract_qualifier(node.func),
                     )
                 )
 
@@ -118,6 +222,31 @@ class FunctionCallVisitor(ast.NodeVisitor):
             return node.attr
         return None
 
+    def _extract_qualifier(self, node: ast.AST) -> Optional[str]:
+        """
+        Extract the dotted receiver of an attribute call.
+
+        Examples:
+          foo()        -> None
+          mod.foo()    -> "mod"
+          a.b.foo()    -> "a.b"
+          x[0].foo()   -> ""
+        """
+        if not isinstance(node, ast.Attribute):
+            return None
+
+        parts: List[str] = []
+        value = node.value
+        while isinstance(value, ast.Attribute):
+            parts.append(value.attr)
+            value = value.value
+
+        if not isinstance(value, ast.Name):
+            return ""
+
+        parts.append(value.id)
+        return ".".join(reversed(parts))
+
     # -------- Imports --------
 
     def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
@@ -127,6 +256,7 @@ class FunctionCallVisitor(ast.NodeVisitor):
                     module=node.module or "",
                     name=alias.name,
                     alias=alias.asname,
+                    level=node.level,
                 )
             )
 
@@ -141,17 +271,393 @@ class FunctionCallVisitor(ast.NodeVisitor):
             )
 
 
+# =========================
+# Iterative extraction
+# =========================
+
+# Fields that never hold a subtree worth entering: names, flags, and the
+# context/operator singletons
+_SCALAR_FIELDS = frozenset(
+    {
+        "name", "id", "attr", "arg", "asname", "module", "level", "kind", "tag",
+        "conversion", "is_async", "type_comment", "kwd_attrs", "ctx", "op", "ops",
+    }
+)
+
+# Per node type: fields to descend into, last first (children are pushed
+# on a stack, so the first field is popped first)
+_CHILD_FIELDS: dict[type, tuple[str, ...]] = {}
+
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Field values never pushed on the walk's stack: leaf nodes that cannot
+# contain a call, and the non-node values that sit in node fields
+_SKIPPED = frozenset({ast.Name, ast.Constant, ast.Pass, type(None), str, bool})
+
+
+def _child_fields(kind: type) -> tuple[str, ...]:
+    names = getattr(kind, "_fields", ())
+    fields = tuple(f for f in reversed(names) if f not in _SCALAR_FIELDS)
+    _CHILD_FIELDS[kind] = fields
+    return fields
+
+
+def _qualifier(func: ast.expr) -> Optional[str]:
+    if type(func) is not ast.Attribute:
+        return None
+
+    parts: List[str] = []
+    value = func.value
+    while type(value) is ast.Attribute:
+        parts.append(value.attr)
+        value = value.value
+
+    if type(value) is not ast.Name:
+        return ""
+
+    parts.append(value.id)
+    return ".".join(reversed(parts))
+
+
+def extract_from_tree(tree: ast.AST) -> ParseResult:
+    """
+    Same result as FunctionCallVisitor, in the same order, from a
+    single iterative pre-order walk.
+
+    The visitor pays for a method lookup and a generator per node and
+    recurses through generic_visit. Here, nodes sit on an explicit
+    stack. Each node type maps to a cached tuple of the fields that can
+    hold subtrees. Only calls, definitions and imports get any handling
+    beyond that. Entering a scope pushes a marker holding the outer
+    scope, which restores it once the scope's children are done.
+    """
+    functions: List[FunctionDefInfo] = []
+    calls: List[CallSiteInfo] = []
+    imports: List[ImportInfo] = []
+
+    # Enclosing function's qualname, qualname prefix, enclosing class
+    current: Optional[str] = None
+    prefix = ""
+    klass: Optional[str] = None
+
+    stack: list = [tree]
+    pop = stack.pop
+    push = stack.append
+    child_fields = _CHILD_FIELDS
+    skipped = _SKIPPED
+
+    while stack:
+        node = pop()
+        kind = type(node)
+
+        if kind is tuple:
+            current, prefix, klass = node
+            continue
+
+        if kind is ast.Call:
+            if current is not None:
+                func = node.func
+                func_kind = type(func)
+                if func_kind is ast.Name:
+                    calls.append(
+                        CallSiteInfo(current, func.id, node.lineno, node.col_offset, None)
+                    )
+                elif func_kind is ast.Attribute:
+                    calls.append(
+                        CallSiteInfo(
+                            current, func.attr, node.lineno, node.col_offset, _qualifier(func)
+                        )
+                    )
+
+        elif kind in _FUNCTION_TYPES:
+            qualname = prefix + node.name
+            functions.append(
+                FunctionDefInfo(
+                    node.name,
+                    node.lineno,
+                    node.col_offset,
+                    node.end_lineno,
+                    qualname,
+                    klass,
+                    kind is ast.AsyncFunctionDef,
+                )
+            )
+            push((current, prefix, klass))
+            current, prefix, klass = qualname, qualname + ".<locals>.", None
+
+        elif kind is ast.ClassDef:
+            push((current, prefix, klass))
+            klass = prefix + node.name
+            prefix = klass + "."
+
+        elif kind is ast.ImportFrom:
+            module = node.module or ""
+            for alias in node.names:
+                imports.append(ImportInfo(module, alias.name, alias.asname, node.level))
+            continue
+
+        elif kind is ast.Import:
+            for alias in node.names:
+                imports.append(ImportInfo(alias.name, None, alias.asname))
+            continue
+
+        fields = child_fields.get(kind)
+        if fields is None:
+            fields = _child_fields(kind)
+
+        for field in fields:
+            value = getattr(node, field, None)
+            if type(value) is list:
+                for item in reversed(value):
+                    if type(item) not in skipped:
+                        push(item)
+            elif type(value) not in skipped:
+                push(value)
+
+    return functions, calls, imports
+
+
+# =========================
+# Pre-filter
+# =========================
+
+_DEF_WORD = re.compile(r"\bdef\b")
+_IMPORT_WORD = re.compile(r"\bimport\b")
+# First line of an import statement
+_IMPORT_LINE = re.compile(r"^[ \t]*(?:import|from)\b[^\n]*", re.MULTILINE)
+
+
+def _import_statements(source: str) -> Optional[List[str]]:
+    """
+    Source text of every import statement, or None if a statement may
+    have been missed or misread.
+    """
+    statements = []
+    for match in _IMPORT_LINE.finditer(source):
+        line = match.group().lstrip()
+        code = line.partition("#")[0]
+        if "(" in code and ")" not in code:
+            end = source.find(")", match.end())
+            if end == -1:
+                return None
+            rest = source[match.end() : end + 1]
+            if "#" in rest:
+                return None
+            line = code + rest
+        statements.append(line)
+
+    # Every `import` word must belong to a statement found above, so
+    # none can hide in a compound statement ("if x: import y"), after a
+    # semicolon or in a comment
+    found = sum(len(_IMPORT_WORD.findall(line)) for line in statements)
+    if found != len(_IMPORT_WORD.findall(source)):
+        return None
+    return statements
+
+
+def prefilter_source(source: str) -> Optional[ParseResult]:
+    """
+    Result of parsing `source`, if it can be had without a full parse;
+    None otherwise.
+
+    Calls are only recorded inside functions, so a file without the word
+    `def` has no functions and no calls, and its result is just its
+    import table. That covers generated constants, migrations and
+    re-export shims. With no `import` word either, the result is empty.
+    Otherwise the import statements are located from their first lines
+    and parsed on their own.
+
+    The filter defers to the full parse whenever it cannot be sure:
+    - a triple-quoted string or backslash continuation could fake or
+      hide a statement line;
+    - an `import` word lies outside the statements found;
+    - the statements do not parse.
+    It does not check the rest of the file for syntax errors.
+    """
+    if _DEF_WORD.search(source):
+        return None
+    if not _IMPORT_WORD.search(source):
+        return [], [], []
+    if '"""' in source or "'''" in source or "\\\n" in source:
+        return None
+
+    statements = _import_statements(source)
+    if statements is None:
+        return None
+    try:
+        tree = ast.parse("\n".join(statements))
+    except SyntaxError:
+        return None
+
+    _, _, imports = extract_from_tree(tree)
+    return [], [], imports
+
+
+# =========================
+# Fault tolerance
+# =========================
+
+class ParseBudgetExceeded(Exception):
+    """
+    A file is over the size or time budget of its ParseOptions.
+    """
+
+    def __init__(self, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class ParseOptions:
+    """
+    How a pipeline run treats files it cannot parse.
+
+    Strict runs (the default) raise on the first bad file. Tolerant runs
+    record a ParseFailure for it and carry on with its module left empty.
+    """
+    tolerant: bool = False
+    # Files larger than this many bytes are not parsed (None: no limit)
+    max_bytes: Optional[int] = None
+    # Seconds allowed per file (None: no limit). ast.parse cannot be
+    # interrupted, so an overrun is caught as soon as it returns and the
+    # rest of the file's work is skipped; max_bytes bounds ast.parse.
+    timeout: Optional[float] = None
+
+    def check_size(self, size: int) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            raise ParseBudgetExceeded(
+                "too-large", f"{size} bytes, over the {self.max_bytes} byte limit"
+            )
+
+
+@dataclass(frozen=True)
+class ParseFailure:
+    """
+    A file a tolerant run skipped.
+
+    `reason` is one of "unreadable", "encoding", "syntax", "too-large",
+    "timeout" or "error".
+    """
+    path: Path
+    reason: str
+    message: str
+
+    @classmethod
+    def from_exception(cls, path: Path, exc: BaseException) -> "ParseFailure":
+        if isinstance(exc, ParseBudgetExceeded):
+            return cls(path, exc.reason, str(exc))
+        if isinstance(exc, (UnicodeError, LookupError)):
+            return cls(path, "encoding", str(exc))
+        if isinstance(exc, SyntaxError):
+            where = f" (line {exc.lineno})" if exc.lineno else ""
+            return cls(path, "syntax", f"{exc.msg}{where}")
+        if isinstance(exc, OSError):
+            return cls(path, "unreadable", exc.strerror or str(exc))
+        return cls(path, "error", f"{type(exc).__name__}: {exc}")
+
+    def to_json(self) -> dict:
+        return {"path": str(self.path), "reason": self.reason, "message": self.message}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ParseFailure":
+        return cls(Path(data["path"]), data["reason"], data["message"])
+
+
+@contextmanager
+def _time_budget(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Raise ParseBudgetExceeded in the block once `seconds` have passed.
+
+    Uses SIGALRM, so it only applies on the main thread of platforms
+    that have it (parser worker processes included); elsewhere the
+    block runs unbounded.
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def expire(signum, frame) -> None:
+        raise ParseBudgetExceeded("timeout", f"took longer than {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def decode_source(data: bytes) -> str:
+    """
+    Decode Python source bytes the way the interpreter does: a UTF-8
+    BOM or a PEP 263 coding cookie, UTF-8 otherwise.
+
+    Raises:
+        UnicodeError: if the bytes do not decode, or the first lines
+            are not valid UTF-8 and carry no usable coding cookie
+        LookupError: if the cookie names an unknown codec
+    """
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError as exc:
+        raise UnicodeError(exc.msg) from exc
+    return data.decode(encoding)
+
+
 # =========================
 # Public API
 # =========================
 
-def parse_python_file(
-    path: Path,
-) -> tuple[
-    List[FunctionDefInfo],
-    List[CallSiteInfo],
-    List[ImportInfo],
-]:
+def parse_python_source(source: str, filename: str = "<unknown>") -> ParseResult:
+    """
+    Parse Python source text and extract:
+    - function definitions
+    - call sites
+    - import statements
+
+    Files that cannot contain call sites skip the full parse (see
+    prefilter_source).
+    """
+    with metrics.span("prefilter"):
+        result = prefilter_source(source)
+    if result is not None:
+        metrics.count("files.prefiltered")
+        return result
+    with metrics.span("ast.parse"):
+        tree = ast.parse(source, filename=filename)
+    with metrics.span("extract"):
+        return extract_from_tree(tree)
+
+
+def parse_python_bytes(
+    data: bytes,
+    filename: str = "<unknown>",
+    options: Optional[ParseOptions] = None,
+) -> ParseResult:
+    """
+    Decode (see decode_source) and parse the contents of a source file,
+    within the size and time budgets of `options`.
+
+    Raises:
+        ParseBudgetExceeded: if the file is over budget
+        UnicodeError, LookupError: if it cannot be decoded
+        SyntaxError: if it cannot be parsed
+    """
+    options = options or ParseOptions()
+    options.check_size(len(data))
+
+    with _time_budget(options.timeout):
+        with metrics.span("decode"):
+            source = decode_source(data)
+        return parse_python_source(source, filename=filename)
+
+
+def parse_python_file(path: Path) -> ParseResult:
     """
     Parse a Python file and extract:
     - function definitions
@@ -164,9 +670,6 @@ def parse_python_file(
     if not path.exists():
         raise FileNotFoundError(path)
 
-    source = path.read_text(encoding="utf-8")
-    tree = ast.parse(source, filename=str(path))
-    visitor = FunctionCallVisitor()
-    visitor.visit(tree)
-
-    return visitor.functions, visitor.calls, visitor.imports
+    with tokenize.open(path) as f:
+        source = f.read()
+    return parse_python_source(source, filename=str(path))
@@ -1,32 +1,380 @@
-from pyimpact.core.model import DependencyGraph
-from pyimpact.core.ids import SymbolId
+from collections.abc import Iterable
+
+from pyimpact.core import metrics
+from pyimpact.core.model import CallSite, DependencyGraph, ModuleImport
+from pyimpact.core.ids import SymbolId, short_name
+
+# An import binding target: (module, name); name is None for `import module`
+Binding = tuple[str, str | None]
+
+
+def _fallback_key(symbol_id: SymbolId) -> str | None:
+    # Nested functions cannot be called by name from outside their scope
+    if "<locals>" in symbol_id.qualname:
+        return None
+    return short_name(symbol_id.qualname)
+
+
+def _fallback_names(symbol_ids: Iterable[SymbolId]) -> set[str]:
+    return {key for key in map(_fallback_key, symbol_ids) if key is not None}
+
+
+class SymbolIndex:
+    """
+    Lookup tables over a graph, built once and patched per module.
+
+    - symbols: module → {qualname → symbol}
+    - bindings: module → {local name → imported (module, name)}
+    - star_imports: module → modules pulled in with `from m import *`
+    - importers / imported: module → modules importing it / it imports
+    - by_name: short name → every symbol defining it (for fallback),
+      nested functions excluded
+    - callers: short name → call sites naming it (only with
+      track_calls, for incremental updates)
+    """
+
+    def __init__(self, graph: DependencyGraph, track_calls: bool = False) -> None:
+        self.symbols: dict[str, dict[str, SymbolId]] = {}
+        self.bindings: dict[str, dict[str, Binding]] = {}
+        self.star_imports: dict[str, list[str]] = {}
+        self.importers: dict[str, set[str]] = {}
+        self.imported: dict[str, set[str]] = {}
+        self.by_name: dict[str, set[SymbolId]] = {}
+        self.callers: dict[str, set[CallSite]] = {}
+        self.modules: set[str] = set()
+        self._track_calls = track_calls
+        # The call site lists indexed in `callers`, to un-index them later
+        self._indexed_calls: dict[str, list[CallSite]] = {}
+
+        for symbol_id in graph.nodes:
+            self._add_symbol(symbol_id)
+
+        for module, module_imports in graph.imports.items():
+            self._add_imports(module, module_imports)
+
+        if track_calls:
+            for module, calls in graph.call_sites.items():
+                self._add_calls(module, calls)
+
+        self.modules = set(self.symbols) | set(self.bindings)
+        self._memo: dict[tuple[str, str], SymbolId | None] = {}
+
+    def _add_symbol(self, symbol_id: SymbolId) -> None:
+        self.symbols.setdefault(symbol_id.module, {})[symbol_id.qualname] = symbol_id
+        key = _fallback_key(symbol_id)
+        if key is not None:
+            self.by_name.setdefault(key, set()).add(symbol_id)
+
+    def _add_calls(self, module: str, calls: list[CallSite]) -> None:
+        self._indexed_calls[module] = calls
+        for call in calls:
+            self.callers.setdefault(call.callee_name, set()).add(call)
+
+    def _add_imports(self, module: str, module_imports: list[ModuleImport]) -> None:
+        table = self.bindings.setdefault(module, {})
+        imported = self.imported.setdefault(module, set())
+
+        for imp in module_imports:
+            imported.add(imp.module)
+
+            if imp.name is None:
+                # import a.b.c      → binds "a" (and "a.b.c" for dotted access)
+                # import a.b.c as x → binds "x"
+                if imp.alias:
+                    table[imp.alias] = (imp.module, None)
+                else:
+                    head = imp.module.split(".")[0]
+                    table.setdefault(head, (head, None))
+                    table[imp.module] = (imp.module, None)
+            elif imp.name == "*":
+                self.star_imports.setdefault(module, []).append(imp.module)
+            else:
+                # `from pkg import sub` may import a submodule
+                imported.add(f"{imp.module}.{imp.name}")
+                table[imp.alias or imp.name] = (imp.module, imp.name)
+
+        for target in imported:
+            self.importers.setdefault(target, set()).add(module)
+
+    def update_module(self, graph: DependencyGraph, module: str) -> None:
+        """
+        Re-index a single module after DependencyGraph.replace_module.
+        """
+        for symbol_id in self.symbols.pop(module, {}).values():
+            key = _fallback_key(symbol_id)
+            if key is not None:
+                self.by_name.get(key, set()).discard(symbol_id)
+
+        for symbol_id in graph.module_symbols.get(module, ()):
+            self._add_symbol(symbol_id)
+
+        self.bindings.pop(module, None)
+        self.star_imports.pop(module, None)
+        for target in self.imported.pop(module, ()):
+            self.importers.get(target, set()).discard(module)
+
+        if module in graph.imports:
+            self._add_imports(module, graph.imports[module])
+
+        if self._track_calls:
+            for call in self._indexed_calls.pop(module, ()):
+                self.callers[call.callee_name].discard(call)
+            if module in graph.call_sites:
+                self._add_calls(module, graph.call_sites[module])
+
+        self.modules.discard(module)
+        if module in self.symbols or module in self.bindings:
+            self.modules.add(module)
+
+        # Lookups may have passed through this module (re-exports)
+        self._memo.clear()
+
+    def lookup(self, module: str, name: str) -> SymbolId | None:
+        """
+        Resolve `name` as seen from inside `module`: local definitions,
+        then imports (following re-exports), then star imports.
+        """
+        # Local definitions are the common case and need no memo entry
+        local = self.symbols.get(module, {}).get(name)
+        if local is not None:
+            return local
+
+        key = (module, name)
+        if key in self._memo:
+            return self._memo[key]
+
+        # Guard against import cycles while the lookup is in flight
+        self._memo[key] = None
+        result = self._lookup(module, name)
+        self._memo[key] = result
+        return result
+
+    def _lookup(self, module: str, name: str) -> SymbolId | None:
+        binding = self.bindings.get(module, {}).get(name)
+        if binding is not None:
+            target_module, target_name = binding
+            if target_name is None or f"{target_module}.{target_name}" in self.modules:
+                # Bound to a module, not a function
+                return None
+            return self.lookup(target_module, target_name)
+
+        for star_module in self.star_imports.get(module, ()):
+            found = self.lookup(star_module, name)
+            if found is not None:
+                return found
+
+        return None
+
+    def is_bound(self, module: str, name: str) -> bool:
+        """
+        True if `name` is explicitly imported into `module`.
+        """
+        return name in self.bindings.get(module, {})
+
+    def module_for(self, module: str, qualifier: str) -> str | None:
+        """
+        Resolve a call receiver like "mod" or "a.b" to an imported module.
+
+        Returns None when the receiver is not an import binding.
+        """
+        table = self.bindings.get(module, {})
+
+        binding = table.get(qualifier)
+        head, _, rest = qualifier.partition(".")
+        if binding is None and rest:
+            head_binding = table.get(head)
+            if head_binding is not None:
+                base = ".".join(part for part in head_binding if part)
+                return f"{base}.{rest}"
+
+        if binding is None:
+            return None
+
+        target_module, target_name = binding
+        if target_name is None:
+            return target_module
+        return f"{target_module}.{target_name}"
+
+    def unique(self, name: str) -> SymbolId | None:
+        """
+        The only symbol with this short name, or None if missing/ambiguous.
+        """
+        candidates = self.by_name.get(name)
+        if candidates and len(candidates) == 1:
+            return next(iter(candidates))
+        return None
 
 
 class Resolver:
     """
     Resolves unresolved call sites using import information.
+
+    The symbol index built by `resolve` is kept, so that later
+    `replace_module` calls on the same graph only re-index one module.
     """
 
+    def __init__(self) -> None:
+        self._graph: DependencyGraph | None = None
+        self._index: SymbolIndex | None = None
+
     def resolve(self, graph: DependencyGraph) -> None:
         """
         Mutates the graph by resolving unresolved call sites
         into concrete edges when possible.
+
+        Runs in a single pass over the calls, O(nodes + imports + calls).
         """
-        for call in list(graph.unresolved_calls):
-            resolved_id = self._resolve_call(call, graph)
+        index = SymbolIndex(graph)
+        self._graph, self._index = graph, index
+        still_unresolved: list[CallSite] = []
+
+        targets = graph.call_targets
+
+        for call in graph.unresolved_calls:
+            resolved_id = self._resolve_call(call, index)
             if resolved_id:
                 graph.add_edge(call.caller_id, resolved_id)
-                graph.unresolved_calls.remove(call)
+                targets[call] = resolved_id
+            else:
+                still_unresolved.append(call)
 
-    def _resolve_call(
+        metrics.count("calls.resolved", len(graph.unresolved_calls) - len(still_unresolved))
+        metrics.count("calls.unresolved", len(still_unresolved))
+        graph.unresolved_calls[:] = still_unresolved
+
+    def replace_module(
         self,
-        call,
         graph: DependencyGraph,
+        module: str,
+        fragment: DependencyGraph,
+    ) -> None:
+        """
+        Incrementally swap one module's contribution and re-resolve only
+        the calls it can affect:
+        - calls made by the module itself
+        - calls from modules that had edges into the old version of it
+        - calls from modules that import it
+        - calls naming a function it defined before or defines now, since
+          the project-wide fallback (SymbolIndex.unique) may now pick a
+          different symbol, or none
+
+        A call that now resolves elsewhere, or not at all, loses the edge
+        its previous resolution added. The result is the graph a full
+        build would give. An empty fragment removes the module.
+        """
+        if self._graph is not graph or self._index is None:
+            # First update on this graph: pay for a full index once
+            self._graph, self._index = graph, SymbolIndex(graph, track_calls=True)
+
+        index = self._index
+        names = _fallback_names(graph.module_symbols.get(module, ()))
+        affected = graph.replace_module(module, fragment)
+        index.update_module(graph, module)
+        names |= _fallback_names(graph.module_symbols.get(module, ()))
+
+        affected.add(module)
+        affected |= index.importers.get(module, set())
+
+        candidates: set[CallSite] = set()
+        for caller_module in affected:
+            candidates.update(graph.call_sites.get(caller_module, ()))
+        for name in names:
+            candidates |= index.callers.get(name, set())
+
+        targets = graph.call_targets
+        resolved: set[CallSite] = set()
+        newly_pending: list[CallSite] = []
+        retracted: set[tuple[SymbolId, SymbolId]] = set()
+
+        for call in candidates:
+            previous = targets.get(call)
+            resolved_id = self._resolve_call(call, index)
+            if previous is not None and previous != resolved_id:
+                retracted.add((call.caller_id, previous))
+
+            if resolved_id:
+                # Also restores edges into a module that was replaced
+                graph.add_edge(call.caller_id, resolved_id)
+                targets[call] = resolved_id
+                if previous is None:
+                    resolved.add(call)
+            elif previous is not None:
+                # Was resolved, now dangling
+                del targets[call]
+                newly_pending.append(call)
+
+        for caller, callee in retracted:
+            if caller.module == callee.module:
+                # Same-module edges come from the builder and only change
+                # with the module itself
+                continue
+            if any(
+                targets.get(call) == callee
+                for call in graph.call_sites.get(caller.module, ())
+                if call.caller_id == caller
+            ):
+                # Another call from the same function still needs the edge
+                continue
+            graph.remove_edge(caller, callee)
+
+        pending = graph.unresolved_calls
+        if resolved:
+            pending[:] = [call for call in pending if call not in resolved]
+        pending.extend(newly_pending)
+
+    def _resolve_call(
+        self,
+        call: CallSite,
+        index: SymbolIndex,
     ) -> SymbolId | None:
         """
-        Attempt to resolve a call to a known symbol.
+        Attempt to resolve a call to a known symbol, through the scope
+        of the calling module.
+
+        Order:
+          f()         → local definition, then imports / re-exports
+          mod.f()     → f inside the module bound to `mod`
+          Cls.f()     → method of an imported or same-module class
+          self.f()    → same-module definition
+          obj.f()     → same-module definition
+
+        The builder already links same-module calls; the local step here
+        only matters for graphs assembled by hand.
+
+        Calls that no import explains fall back to a project-wide match,
+        but only when exactly one symbol has that name.
         """
-        for symbol_id in graph.nodes:
-            if symbol_id.qualname == call.callee_name:
-                return symbol_id
-        return None
+        module = call.caller_id.module
+        name = call.callee_name
+        qualifier = call.callee_qualifier
+
+        if qualifier is None:
+            found = index.lookup(module, name)
+            if found is not None or index.is_bound(module, name):
+                # An explicit import that leads outside the project is final
+                return found
+            return index.unique(name)
+
+        local_symbols = index.symbols.get(module, {})
+
+        if qualifier:
+            target_module = index.module_for(module, qualifier)
+            if target_module is not None:
+                if target_module not in index.modules:
+                    # `from m import Cls` then `Cls.f()`
+                    owner, _, cls = target_module.rpartition(".")
+                    method = index.symbols.get(owner, {}).get(f"{cls}.{name}")
+                    if method is not None:
+                        return method
+                # Receiver is an imported module: resolve there or nowhere
+                return index.lookup(target_module, name)
+
+            method = local_symbols.get(f"{qualifier}.{name}")
+            if method is not None:
+                return method
+
+        local = local_symbols.get(name)
+        if local is not None:
+            return local
+
+        return index.unique(name)
@@ -1,6 +1,11 @@
 # src/pyimpact/analyzer/scanner.py
 
+import os
+import re
+import subprocess
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator, Optional
 
 # Directories we never want to scan
 IGNORED_DIRS = {
@@ -12,19 +17,234 @@ IGNORED_DIRS = {
     "dist",
     "build",
     ".eggs",
+    ".pyimpact",
 }
 
 
-def scan_python_files(root: Path) -> list[Path]:
+@dataclass(frozen=True)
+class ScanOptions:
     """
-    Recursively scan a directory and return all Python (.py) files,
-    excluding common ignored directories.
+    Which files a scan picks up.
+
+    Glob patterns follow .gitignore syntax and are matched against paths
+    relative to the scan root: a pattern without a slash matches a name
+    at any depth, `**` spans directories. Excluded directories are never
+    entered.
+    """
+    include: tuple[str, ...] = ("*.py",)
+    exclude: tuple[str, ...] = ()
+    # Honour .gitignore files (those above the root too, up to the repo root)
+    gitignore: bool = True
+    # Take the file list from `git ls-files` when the root is in a work tree
+    git_files: bool = False
+    # Import roots below the project root that module names start from
+    roots: tuple[str, ...] = ()
+
+
+def _glob_to_regex(pattern: str) -> str:
+    out: list[str] = []
+    i = 0
+
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+
+    return "".join(out)
+
+
+@dataclass(frozen=True)
+class GlobPattern:
+    """
+    One .gitignore-style pattern.
+    """
+    regex: re.Pattern
+    negate: bool = False
+    dir_only: bool = False
+
+    @classmethod
+    def parse(cls, line: str) -> Optional["GlobPattern"]:
+        """
+        Compile a pattern line; None for blank lines and comments.
+        """
+        line = line.rstrip("\n\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            return None
+
+        # A leading backslash escapes a literal "!" or "#"
+        negate = line.startswith("!")
+        if negate or line.startswith("\\"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        # A slash anywhere but at the end anchors the pattern to its base
+        if "/" in line:
+            regex = _glob_to_regex(line.lstrip("/"))
+        else:
+            regex = "(?:.*/)?" + _glob_to_regex(line)
+
+        return cls(re.compile(regex + r"\Z", re.DOTALL), negate, dir_only)
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        return self.regex.match(path) is not None
+
+
+class IgnoreFile:
+    """
+    Patterns of one .gitignore, which apply below `base` (a path relative
+    to the scan anchor, "" or ending with "/"). Later patterns win.
+    """
+
+    def __init__(self, base: str, patterns: list[GlobPattern]) -> None:
+        self.base = base
+        self.patterns = patterns
+
+    @classmethod
+    def load(cls, directory: str, base: str) -> Optional["IgnoreFile"]:
+        try:
+            with open(os.path.join(directory, ".gitignore"), encoding="utf-8") as f:
+                lines = f.readlines()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        patterns = [p for p in map(GlobPattern.parse, lines) if p is not None]
+        return cls(base, patterns) if patterns else None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """
+        True if ignored, False if re-included with `!`, None if no
+        pattern applies.
+        """
+        if not path.startswith(self.base):
+            return None
+        path = path[len(self.base) :]
+
+        for pattern in reversed(self.patterns):
+            if pattern.matches(path, is_dir):
+                return not pattern.negate
+        return None
+
+
+def _is_ignored(rules: tuple[IgnoreFile, ...], path: str, is_dir: bool) -> bool:
+    # Deeper .gitignore files override shallower ones
+    for rule in reversed(rules):
+        verdict = rule.match(path, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+def _parent_ignore_files(root: Path) -> tuple[tuple[IgnoreFile, ...], str]:
+    """
+    .gitignore files between the enclosing repository's root and `root`
+    (exclusive), and the prefix of `root` relative to that repository.
+    """
+    if (root / ".git").exists():
+        return (), ""
+
+    chain = [root]
+    for parent in root.parents:
+        chain.append(parent)
+        if (parent / ".git").exists():
+            break
+    else:
+        return (), ""
+
+    anchor = chain[-1]
+    rules: list[IgnoreFile] = []
+    for directory in reversed(chain[1:]):
+        base = directory.relative_to(anchor).as_posix()
+        base = "" if base == "." else base + "/"
+        rule = IgnoreFile.load(str(directory), base)
+        if rule is not None:
+            rules.append(rule)
+
+    return tuple(rules), root.relative_to(anchor).as_posix() + "/"
+
+
+def _sorted_entries(directory: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(directory) as it:
+            return sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+
+def git_python_files(root: Path) -> Optional[list[str]]:
+    """
+    Root-relative paths of the tracked and untracked-but-not-ignored .py
+    files below `root`, or None when git cannot list them.
+    """
+    try:
+        out = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(root),
+                "ls-files",
+                "-z",
+                "--cached",
+                "--others",
+                "--exclude-standard",
+                "--",
+                "*.py",
+            ],
+            capture_output=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    paths = out.decode("utf-8", "surrogateescape").split("\0")
+    return sorted({path for path in paths if path})
+
+
+def iter_python_files(root: Path, options: Optional[ScanOptions] = None) -> Iterator[Path]:
+    """
+    Yield Python files below `root` as they are found.
+
+    The walk uses os.scandir and decides on each directory before
+    entering it, so ignored trees (virtualenvs, node_modules, anything
+    in .gitignore or `options.exclude`) cost one directory entry each.
+    Entries are visited in name order, which yields paths in sorted
+    order (symlinked files excepted: they are yielded resolved).
 
     Args:
         root: Path to the project root
+        options: Include/exclude rules (default: every .py file)
 
-    Returns:
-        List of absolute Paths to Python files
+    Yields:
+        Absolute Paths to Python files
     """
     if not root.exists():
         raise FileNotFoundError(f"Path does not exist: {root}")
@@ -32,13 +252,90 @@ def scan_python_files(root: Path) -> list[Path]:
     if not root.is_dir():
         raise NotADirectoryError(f"Path is not a directory: {root}")
 
-    python_files: list[Path] = []
+    options = options or ScanOptions()
+    root = root.resolve()
+
+    include = [p for p in map(GlobPattern.parse, options.include) if p is not None]
+    exclude = [p for p in map(GlobPattern.parse, options.exclude) if p is not None]
+
+    def excluded(path: str, is_dir: bool) -> bool:
+        return any(p.matches(path, is_dir) for p in exclude)
+
+    def wanted(path: str) -> bool:
+        return any(p.matches(path, False) for p in include) and not excluded(path, False)
 
-    for path in root.rglob("*.py"):
-        # Skip files inside ignored directories
-        if any(part in IGNORED_DIRS for part in path.parts):
+    if options.git_files:
+        listed = git_python_files(root)
+        if listed is not None:
+            for rel in listed:
+                parts = rel.split("/")
+                if any(part in IGNORED_DIRS for part in parts[:-1]):
+                    continue
+                if any(excluded("/".join(parts[:i]), True) for i in range(1, len(parts))):
+                    continue
+                path = root / rel
+                if wanted(rel) and path.is_file():
+                    yield path.resolve() if path.is_symlink() else path
+            return
+
+    rules: tuple[IgnoreFile, ...] = ()
+    prefix = ""
+    if options.gitignore:
+        rules, prefix = _parent_ignore_files(root)
+        own = IgnoreFile.load(str(root), prefix)
+        if own is not None:
+            rules += (own,)
+
+    # (path prefix relative to root, active .gitignore files, pending entries)
+    stack = [("", rules, iter(_sorted_entries(str(root))))]
+
+    while stack:
+        base, rules, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
             continue
 
-        python_files.append(path.resolve())
+        rel = base + entry.name
+
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in IGNORED_DIRS or excluded(rel, True):
+                    continue
+                if options.gitignore and _is_ignored(rules, prefix + rel, True):
+                    continue
 
-    return python_files
+                child_rules = rules
+                if options.gitignore:
+                    own = IgnoreFile.load(entry.path, prefix + rel + "/")
+                    if own is not None:
+                        child_rules = rules + (own,)
+
+                stack.append((rel + "/", child_rules, iter(_sorted_entries(entry.path))))
+                continue
+
+            if not wanted(rel) or not entry.is_file():
+                continue
+        except OSError:
+            continue
+
+        if options.gitignore and _is_ignored(rules, prefix + rel, False):
+            continue
+
+        path = Path(entry.path)
+        yield path.resolve() if entry.is_symlink() else path
+
+
+def scan_python_files(root: Path, options: Optional[ScanOptions] = None) -> list[Path]:
+    """
+    Recursively scan a directory and return all Python (.py) files,
+    excluding common ignored directories.
+
+    Args:
+        root: Path to the project root
+        options: Include/exclude rules (default: every .py file)
+
+    Returns:
+        List of absolute Paths to Python files
+    """
+    return list(iter_python_files(root, options))
@@ -0,0 +1,333 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from pyimpact.analyzer.cache import FileFingerprint, ParseCache, read_with_fingerprint
+from pyimpact.analyzer.graph_builder import GraphBuilder
+from pyimpact.analyzer.modules import ModuleNamer
+from pyimpact.analyzer.parser import (
+    PackedResult,
+    ParseFailure,
+    ParseOptions,
+    ParseResult,
+    pack_result,
+    parse_python_bytes,
+    unpack_result,
+)
+from pyimpact.analyzer.resolver import Resolver
+from pyimpact.analyzer.scanner import ScanOptions, iter_python_files
+from pyimpact.core import metrics
+from pyimpact.core.model import DependencyGraph
+
+# Outcome of parsing one file: a result and its fingerprint, or (in a
+# tolerant run) an empty result and the reason the file was skipped
+ParseOutcome = tuple[Optional[FileFingerprint], ParseResult, Optional[ParseFailure]]
+
+
+def _parse_file(path: Path, options: Optional[ParseOptions] = None) -> ParseOutcome:
+    """
+    Read, fingerprint and parse a single file (one read per file).
+    """
+    options = options or ParseOptions()
+    try:
+        if options.max_bytes is not None:
+            # Oversized files are turned down before they are read
+            options.check_size(path.stat().st_size)
+        with metrics.span("read"):
+            data, fingerprint = read_with_fingerprint(path)
+        metrics.count("bytes.read", len(data))
+        result = parse_python_bytes(data, filename=str(path), options=options)
+    except Exception as exc:
+        if not options.tolerant:
+            raise
+        metrics.count("parse.failures")
+        return None, ([], [], []), ParseFailure.from_exception(path, exc)
+    return fingerprint, result, None
+
+
+def _parse_file_packed(
+    path: Path,
+    options: Optional[ParseOptions] = None,
+) -> tuple[Optional[FileFingerprint], PackedResult, Optional[ParseFailure]]:
+    """
+    Worker entry point for the process pool.
+    """
+    fingerprint, result, failure = _parse_file(path, options)
+    return fingerprint, pack_result(result), failure
+
+
+def _parse_batch_packed(
+    paths: list[Path],
+    options: Optional[ParseOptions] = None,
+    profile: bool = False,
+) -> tuple[
+    list[tuple[Optional[FileFingerprint], PackedResult, Optional[ParseFailure]]],
+    Optional[metrics.Metrics],
+]:
+    """
+    Worker entry point for a batch of files. When the parent is being
+    profiled, the worker's spans and counters are sent back with the
+    results.
+    """
+    if not profile:
+        return [_parse_file_packed(path, options) for path in paths], None
+
+    with metrics.recording(publish=False) as recorded:
+        results = [_parse_file_packed(path, options) for path in paths]
+    return results, recorded
+
+
+# Files handed to a worker at a time when paths arrive from a scan
+PARSE_BATCH_SIZE = 16
+
+
+def _parse_files(
+    paths: Iterable[Path],
+    jobs: int,
+    options: Optional[ParseOptions] = None,
+) -> Iterator[tuple[Path, Optional[FileFingerprint], ParseResult, Optional[ParseFailure]]]:
+    """
+    Parse files, in parallel when `jobs > 1`.
+
+    `paths` may be a generator: files are parsed (or sent to the pool in
+    small batches) while it is still producing them, so parsing overlaps
+    the directory scan. Results are yielded in the order of `paths`.
+    """
+    paths = iter(paths)
+
+    if jobs > 1:
+        # Not worth starting a pool for fewer than two files
+        first = list(islice(paths, 2))
+        paths = chain(first, paths)
+        if len(first) < 2:
+            jobs = 1
+
+    if jobs <= 1:
+        for path in paths:
+            yield (path, *_parse_file(path, options))
+        return
+
+    recording = metrics.active()
+    profile = recording is not None
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: deque[tuple[list[Path], Future]] = deque()
+
+        while True:
+            batch = list(islice(paths, PARSE_BATCH_SIZE))
+            if batch:
+                future = pool.submit(_parse_batch_packed, batch, options, profile)
+                pending.append((batch, future))
+
+            # Drain finished batches without stalling the scan
+            while pending and (not batch or pending[0][1].done()):
+                done, future = pending.popleft()
+                results, worker_metrics = future.result()
+                if recording is not None and worker_metrics is not None:
+                    recording.absorb(worker_metrics)
+                for path, (fingerprint, packed, failure) in zip(done, results):
+                    yield path, fingerprint, unpack_result(packed), failure
+
+            if not batch:
+                return
+
+
+def resolve_jobs(jobs: int) -> int:
+    """
+    Normalize a --jobs value: 0 (or less) means one worker per CPU.
+    """
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def project_namer(
+    project_root: Path,
+    files: Iterable[Path],
+    scan: Optional[ScanOptions] = None,
+) -> ModuleNamer:
+    """
+    Module namer for the project's files, with the import roots of `scan`.
+    """
+    roots = scan.roots if scan is not None else ()
+    return ModuleNamer.from_files(project_root.resolve(), files, roots=roots)
+
+
+def parse_with_cache(
+    path: Path,
+    cache: Optional[ParseCache] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> ParseResult:
+    """
+    Parse a single file, going through the cache when one is given.
+
+    In a tolerant run a file that cannot be parsed yields an empty
+    result; its ParseFailure is appended to `failures`.
+    """
+    result = cache.get(path) if cache is not None else None
+    if result is None:
+        fingerprint, result, failure = _parse_file(path, parse)
+        _record(path, fingerprint, result, failure, cache, failures)
+    return result
+
+
+def _record(
+    path: Path,
+    fingerprint: Optional[FileFingerprint],
+    result: ParseResult,
+    failure: Optional[ParseFailure],
+    cache: Optional[ParseCache],
+    failures: Optional[list[ParseFailure]],
+) -> None:
+    # Failures are never cached, so they are retried and reported again
+    # on every run until the file is fixed
+    if failure is not None:
+        if failures is not None:
+            failures.append(failure)
+    elif cache is not None and fingerprint is not None:
+        cache.put(path, fingerprint, result)
+
+
+def build_module_graph(
+    file_path: Path,
+    module_name: str,
+    result: ParseResult,
+    builder: Optional[GraphBuilder] = None,
+) -> DependencyGraph:
+    """
+    Build the single-module graph for one parsed file.
+    """
+    functions, calls, imports = result
+
+    return (builder or GraphBuilder()).build(
+        file_path=file_path,
+        module_name=module_name,
+        functions=functions,
+        calls=calls,
+        imports=imports,
+    )
+
+
+def update_project_graph(
+    graph: DependencyGraph,
+    changed: Iterable[Path],
+    resolver: Resolver,
+    namer: ModuleNamer,
+    cache: Optional[ParseCache] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> None:
+    """
+    Apply file edits to an already resolved graph, one module at a time.
+
+    Deleted files remove their module; new and modified files replace it.
+    Only the changed files are parsed and only the calls they can affect
+    are re-resolved.
+    """
+    builder = GraphBuilder()
+
+    for path in sorted(changed):
+        module = namer.module_name(path)
+        if path.exists():
+            result = parse_with_cache(path, cache, parse, failures)
+            fragment = build_module_graph(path, module, result, builder)
+        else:
+            fragment = DependencyGraph()
+
+        resolver.replace_module(graph, module, fragment)
+
+    if cache is not None:
+        cache.save()
+
+
+def build_project_graph(
+    project_root: Path,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    scan: Optional[ScanOptions] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> DependencyGraph:
+    """
+    Scan → Parse → Build → Resolve a whole project.
+
+    Args:
+        project_root: Directory to scan
+        cache: Optional parse cache; only files whose contents changed
+            since the cached run are re-parsed
+        jobs: Number of parser processes (0 = one per CPU)
+        scan: Which files to pick up (default: every .py file)
+        parse: Error handling and per-file budgets (default: strict)
+        failures: Receives the files a tolerant run skipped, in path order
+
+    Returns:
+        Resolved DependencyGraph for the project
+    """
+    builder = GraphBuilder()
+    full_graph = DependencyGraph()
+
+    file_paths: list[Path] = []
+    results: dict[Path, ParseResult] = {}
+    seen: set[Path] = set()
+
+    # Step 1: scan and cache lookup, streaming the misses to the parser
+    def misses() -> Iterator[Path]:
+        for path in metrics.timed("scan", iter_python_files(project_root, scan)):
+            # A symlink and its target resolve to the same file
+            if path in seen:
+                continue
+            seen.add(path)
+            file_paths.append(path)
+            metrics.count("files.scanned")
+            if cache is None:
+                yield path
+                continue
+            with metrics.span("cache.get"):
+                result = cache.get(path)
+            if result is None:
+                metrics.count("cache.misses")
+                yield path
+            else:
+                metrics.count("cache.hits")
+                results[path] = result
+
+    # Step 2: parse changed files (possibly in parallel) as they are found
+    with metrics.span("scan+parse"):
+        for path, fingerprint, result, failure in _parse_files(
+            misses(), resolve_jobs(jobs), parse
+        ):
+            results[path] = result
+            _record(path, fingerprint, result, failure, cache, failures)
+
+    # Sorted so that node order (and thus resolution) never depends on
+    # filesystem iteration order or on the number of workers
+    file_paths.sort()
+
+    # Step 3: build and merge, in file order
+    namer = project_namer(project_root, file_paths, scan)
+    for file_path in file_paths:
+        module = namer.module_name(file_path)
+        with metrics.span("GraphBuilder.build"):
+            fragment = build_module_graph(file_path, module, results[file_path], builder)
+        with metrics.span("merge"):
+            full_graph.merge(fragment)
+
+    if cache is not None:
+        with metrics.span("cache.save"):
+            cache.prune(file_paths)
+            cache.save()
+
+    # Step 4: resolve cross-module calls
+    with metrics.span("Resolver.resolve"):
+        Resolver().resolve(full_graph)
+
+    recording = metrics.active()
+    if recording is not None:
+        recording.count("graph.nodes", len(full_graph.nodes))
+        recording.count("graph.edges", sum(map(len, full_graph.edges.values())))
+
+    return full_graph
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import socket
+import urllib.parse
+from pathlib import Path
+from typing import Any, Optional
+
+from pyimpact.app.result import ImpactResult
+
+# Written by `pyimpact serve`, read by CLI commands to find the daemon
+DAEMON_STATE_FILE = Path(".pyimpact") / "daemon.json"
+
+# Queries must never hang the CLI: a dead daemon means "fall back to local"
+CONNECT_TIMEOUT = 0.5
+# A live daemon answers in milliseconds; one this slow is stuck
+QUERY_TIMEOUT = 30.0
+
+# Carries the token from daemon.json; the daemon refuses requests without it
+TOKEN_HEADER = "X-Pyimpact-Token"
+
+
+def options_key(scan: Any, parse: Any) -> str:
+    """
+    Digest of the ScanOptions and ParseOptions a graph is built with.
+
+    A query that sends one is only answered by a daemon serving a graph
+    built with the same options.
+    """
+    return hashlib.sha256(repr((scan, parse)).encode("utf-8")).hexdigest()[:16]
+
+
+class DaemonClient:
+    """
+    Talks to a running `pyimpact serve` over local HTTP.
+
+    Requests are plain HTTP/1.0 over a socket rather than urllib: the
+    daemon answers one JSON body per connection, and urllib.request
+    (http.client, email, ssl) costs more to import than the query takes.
+    """
+
+    def __init__(self, port: int, token: str, host: str = "127.0.0.1") -> None:
+        self.host = host
+        self.port = port
+        self.token = token
+
+    def _request(self, path: str, method: str = "GET", timeout: float = CONNECT_TIMEOUT) -> Any:
+        """
+        Raises:
+            OSError: if the daemon cannot be reached, times out, sends
+                something that is not a response or serves a graph built
+                with other options
+            ValueError: with the daemon's error message if it refuses
+                the request
+        """
+        request = (
+            f"{method} {path} HTTP/1.0\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            f"{TOKEN_HEADER}: {self.token}\r\n\r\n"
+        )
+        chunks = []
+        with socket.create_connection((self.host, self.port), timeout=timeout) as sock:
+            sock.sendall(request.encode("ascii"))
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+
+        head, _, body = b"".join(chunks).partition(b"\r\n\r\n")
+        status_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        try:
+            status = int(status_line.split()[1])
+            payload = json.loads(body or b"{}")
+        except (IndexError, ValueError):
+            raise ConnectionError(f"malformed response from daemon: {status_line!r}") from None
+
+        if status == 409:
+            raise ConnectionRefusedError(payload.get("error", status_line))
+        if status != 200:
+            raise ValueError(payload.get("error", status_line))
+        return payload
+
+    def status(self) -> dict[str, Any]:
+        return self._request("/status")
+
+    def impact(
+        self,
+        function: str,
+        upstream: bool = True,
+        downstream: bool = True,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        subgraph: bool = True,
+        options: Optional[str] = None,
+    ) -> ImpactResult:
+        """
+        Args:
+            options: options_key() of the scan and parse options the
+                answer must be built with; None accepts any
+
+        Raises:
+            OSError: if the daemon does not answer within QUERY_TIMEOUT,
+                or was started with options other than `options`
+            ValueError: if the daemon cannot find (a unique) `function`
+        """
+        params: dict[str, Any] = {
+            "function": function,
+            "upstream": int(upstream),
+            "downstream": int(downstream),
+            "subgraph": int(subgraph),
+        }
+        if max_depth is not None:
+            params["max_depth"] = max_depth
+        if max_nodes is not None:
+            params["max_nodes"] = max_nodes
+        if options is not None:
+            params["options"] = options
+
+        query = urllib.parse.urlencode(params)
+        return ImpactResult.from_json(self._request(f"/impact?{query}", timeout=QUERY_TIMEOUT))
+
+    def shutdown(self) -> None:
+        self._request("/shutdown", method="POST")
+
+
+def find_daemon(project_root: Path) -> Optional[DaemonClient]:
+    """
+    Return a client for the daemon serving `project_root`, if one is alive.
+    """
+    state_file = project_root / DAEMON_STATE_FILE
+
+    try:
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if state["root"] != os.fspath(project_root.resolve()):
+            return None
+        client = DaemonClient(port=int(state["port"]), token=str(state["token"]))
+    except (KeyError, TypeError, ValueError):
+        # Written by another version, or not by the daemon at all
+        return None
+
+    try:
+        client.status()
+    except (OSError, ValueError):
+        # Stale state file from a daemon that died without cleaning up
+        return None
+
+    return client
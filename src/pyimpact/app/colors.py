@@ -1,10 +1,12 @@
+from collections.abc import Iterable
+
 from pyimpact.core.ids import SymbolId
 
 
 def impact_colors(
     target: SymbolId,
-    upstream: set[SymbolId],
-    downstream: set[SymbolId],
+    upstream: Iterable[SymbolId],
+    downstream: Iterable[SymbolId],
 ) -> dict[SymbolId, str]:
     """
     Decide node colors for impact visualization.
@@ -0,0 +1,384 @@
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from pyimpact.analyzer.cache import ParseCache
+from pyimpact.analyzer.modules import ModuleNamer
+from pyimpact.analyzer.parser import ParseFailure, ParseOptions
+from pyimpact.analyzer.resolver import Resolver
+from pyimpact.analyzer.scanner import ScanOptions, scan_python_files
+from pyimpact.app.build import build_project_graph, project_namer, update_project_graph
+from pyimpact.app.client import DAEMON_STATE_FILE, TOKEN_HEADER, options_key
+from pyimpact.app.impact import analyze_impact, find_target
+from pyimpact.app.result import ImpactResult
+from pyimpact.core.model import DependencyGraph
+from pyimpact.query.lookup import SymbolLookup
+
+logger = logging.getLogger(__name__)
+
+
+class GraphService:
+    """
+    Keeps a resolved DependencyGraph warm in memory and answers queries.
+
+    The first refresh builds the whole graph (through the parse cache).
+    After that, changed files are patched in module by module with
+    Resolver.replace_module, so an edit costs milliseconds. Queries and
+    patches are serialized by a lock.
+
+    With tolerant `parse` options, `failures` lists the files currently
+    left out of the graph because they could not be parsed. An update
+    that fails partway leaves the graph half-patched, so the next
+    refresh rebuilds it from scratch.
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        cache: Optional[ParseCache] = None,
+        jobs: int = 1,
+        scan: Optional[ScanOptions] = None,
+        parse: Optional[ParseOptions] = None,
+    ) -> None:
+        self.project_root = project_root
+        self.cache = cache
+        self.jobs = jobs
+        self.scan = scan
+        self.parse = parse
+        self.generation = 0
+        self.failures: list[ParseFailure] = []
+
+        self._graph: Optional[DependencyGraph] = None
+        self._namer: Optional[ModuleNamer] = None
+        self._dirty = False
+        self._resolver = Resolver()
+        self._lock = threading.Lock()
+
+        # Name index of the current generation, built on the first query
+        self._lookup: Optional[SymbolLookup] = None
+        self._lookup_generation = -1
+
+    @property
+    def graph(self) -> DependencyGraph:
+        with self._lock:
+            return self._graph if self._graph is not None else DependencyGraph()
+
+    def refresh(self, changed: Optional[set[Path]] = None) -> None:
+        """
+        Bring the graph up to date with the files on disk.
+
+        Adding or removing an __init__.py renames the modules around it,
+        which also forces a full build.
+
+        Args:
+            changed: Files known to have changed; None forces a full build
+        """
+        if (
+            changed is None
+            or self._graph is None
+            or self._namer is None
+            or self._dirty
+            or self._namer.is_stale(changed)
+        ):
+            failures: list[ParseFailure] = []
+            graph = build_project_graph(
+                self.project_root,
+                cache=self.cache,
+                jobs=self.jobs,
+                scan=self.scan,
+                parse=self.parse,
+                failures=failures,
+            )
+            files = scan_python_files(self.project_root, self.scan)
+            with self._lock:
+                self._graph = graph
+                self.failures = failures
+                self._namer = project_namer(self.project_root, files, self.scan)
+                self._resolver = Resolver()
+                self._dirty = False
+                self.generation += 1
+            return
+
+        with self._lock:
+            # Changed files are re-parsed, so their old failures no longer hold
+            failures = [f for f in self.failures if f.path not in changed]
+            try:
+                update_project_graph(
+                    self._graph,
+                    changed,
+                    self._resolver,
+                    self._namer,
+                    cache=self.cache,
+                    parse=self.parse,
+                    failures=failures,
+                )
+            except BaseException:
+                self._dirty = True
+                self._lookup = None
+                self.generation += 1
+                raise
+            self.failures = sorted(failures, key=lambda f: f.path)
+            self.generation += 1
+
+    def impact(
+        self,
+        function: str,
+        upstream: bool = True,
+        downstream: bool = True,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        subgraph: bool = True,
+    ) -> ImpactResult:
+        """
+        Raises:
+            ValueError: if `function` is not found or is ambiguous
+        """
+        with self._lock:
+            graph = self._graph if self._graph is not None else DependencyGraph()
+            if self._lookup is None or self._lookup_generation != self.generation:
+                self._lookup = SymbolLookup.for_graph(graph)
+                self._lookup_generation = self.generation
+            return analyze_impact(
+                graph,
+                find_target(graph, function, self._lookup),
+                upstream=upstream,
+                downstream=downstream,
+                max_depth=max_depth,
+                max_nodes=max_nodes,
+                subgraph=subgraph,
+            )
+
+
+class PollingWatcher:
+    """
+    Detects changed, added and removed Python files by polling their stat.
+
+    Polling keeps the daemon dependency-free and works the same on every
+    platform and filesystem (including network mounts where inotify
+    events are not delivered).
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        on_change: Callable[[set[Path]], None],
+        interval: float = 1.0,
+        scan: Optional[ScanOptions] = None,
+    ) -> None:
+        self.project_root = project_root
+        self.on_change = on_change
+        self.interval = interval
+        self.scan = scan
+
+        self._snapshot = self._take_snapshot()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _take_snapshot(self) -> dict[Path, tuple[int, int]]:
+        snapshot: dict[Path, tuple[int, int]] = {}
+
+        for path in scan_python_files(self.project_root, self.scan):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+
+        return snapshot
+
+    def poll(self) -> set[Path]:
+        """
+        Return the files that changed since the previous poll.
+        """
+        current = self._take_snapshot()
+        previous = self._snapshot
+        self._snapshot = current
+
+        changed = {path for path, stat in current.items() if previous.get(path) != stat}
+        changed |= previous.keys() - current.keys()
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                changed = self.poll()
+                if changed:
+                    self.on_change(changed)
+            except Exception:
+                # Keep watching: a later edit may fix whatever failed
+                logger.exception("pyimpact: failed to update the graph")
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="pyimpact-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "DaemonServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep the daemon's stderr quiet; callers poll it constantly
+        pass
+
+    def _send(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        token = self.headers.get(TOKEN_HEADER, "")
+        if hmac.compare_digest(token.encode("utf-8"), self.server.token.encode("utf-8")):
+            return True
+        self._send(403, {"error": "missing or wrong daemon token"})
+        return False
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        service = self.server.service
+
+        if url.path == "/status":
+            self._send(
+                200,
+                {
+                    "root": os.fspath(service.project_root),
+                    "generation": service.generation,
+                    "nodes": len(service.graph.nodes),
+                    "options": self.server.options,
+                    "parse_failures": [f.to_json() for f in service.failures],
+                },
+            )
+        elif url.path == "/impact":
+            if params.get("options", self.server.options) != self.server.options:
+                self._send(409, {"error": "the daemon was started with other scan or parse options"})
+                return
+            try:
+                result = service.impact(
+                    params["function"],
+                    upstream=params.get("upstream", "1") == "1",
+                    downstream=params.get("downstream", "1") == "1",
+                    max_depth=_optional_int(params.get("max_depth")),
+                    max_nodes=_optional_int(params.get("max_nodes")),
+                    subgraph=params.get("subgraph", "1") == "1",
+                )
+            except KeyError:
+                self._send(400, {"error": "missing 'function' parameter"})
+            except ValueError as exc:
+                self._send(404, {"error": str(exc)})
+            else:
+                self._send(200, result.to_json())
+        else:
+            self._send(404, {"error": f"unknown endpoint {url.path}"})
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            return
+
+        if self.path == "/shutdown":
+            self._send(200, {"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+
+class DaemonServer(ThreadingHTTPServer):
+    """
+    Local HTTP front-end for a GraphService.
+
+    Any local user can connect to a loopback port, so every request must
+    carry `token`, which only the daemon.json readable by the owner holds.
+
+    Queries may send the options_key() they expect; one that does not
+    match the service's scan and parse options is refused with 409.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service: GraphService, port: int = 0, token: Optional[str] = None) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.service = service
+        self.token = token if token is not None else secrets.token_hex(16)
+        self.options = options_key(service.scan or ScanOptions(), service.parse or ParseOptions())
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+def serve(
+    project_root: Path,
+    port: int = 0,
+    interval: float = 1.0,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    scan: Optional[ScanOptions] = None,
+    parse: Optional[ParseOptions] = None,
+    on_ready: Optional[Callable[[DaemonServer], None]] = None,
+) -> None:
+    """
+    Build the graph, then serve queries until shut down.
+
+    The daemon advertises itself, with the token requests must send, in
+    <project_root>/.pyimpact/daemon.json (readable by the owner only) so
+    that CLI commands run in that project can find it.
+    """
+    project_root = project_root.resolve()
+
+    service = GraphService(project_root, cache=cache, jobs=jobs, scan=scan, parse=parse)
+
+    # Snapshot before the initial build so edits made during it are seen
+    watcher = PollingWatcher(
+        project_root, on_change=service.refresh, interval=interval, scan=scan
+    )
+    service.refresh()
+
+    server = DaemonServer(service, port=port)
+
+    state_file = project_root / DAEMON_STATE_FILE
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    state = {
+        "pid": os.getpid(),
+        "port": server.port,
+        "root": os.fspath(project_root),
+        "token": server.token,
+    }
+    # Created afresh so the owner-only mode applies to the token
+    state_file.unlink(missing_ok=True)
+    fd = os.open(state_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    watcher.start()
+    if on_ready is not None:
+        on_ready(server)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        server.server_close()
+        state_file.unlink(missing_ok=True)
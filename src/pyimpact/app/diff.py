@@ -0,0 +1,339 @@
+import json
+from pathlib import Path
+from typing import Iterable, Optional
+
+from pyimpact.analyzer.cache import cache_header, write_atomic
+from pyimpact.analyzer.graph_builder import GraphBuilder
+from pyimpact.analyzer.modules import ModuleNamer
+from pyimpact.analyzer.parser import ParseFailure, ParseOptions, parse_python_bytes
+from pyimpact.analyzer.resolver import Resolver
+from pyimpact.analyzer.scanner import IGNORED_DIRS
+from pyimpact.app.build import build_module_graph
+from pyimpact.app.git import FileDiff, GitRepo, parse_revision_range
+from pyimpact.app.result import DiffImpactResult
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import DependencyGraph
+from pyimpact.query.engine import ImpactAnalyzer
+from pyimpact.query.locations import LocationIndex
+
+DEFAULT_DIFF_CACHE_DIR = Path(".pyimpact") / "diff"
+
+# Base graphs kept on disk; the least recently written are dropped first
+MAX_CACHED_BASES = 8
+
+
+class BaseGraphCache:
+    """
+    Resolved graphs of base commits, one JSON file per commit hash (see
+    DependencyGraph.to_json), so a file planted in the checkout can never
+    run code when loaded.
+
+    Commits never change, so an entry only has to match the cache
+    header, the project root and the parse options it was built with.
+    The files a tolerant build skipped are stored with the graph, so a
+    cache hit reports them again.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    @classmethod
+    def for_project(cls, project_root: Path) -> "BaseGraphCache":
+        return cls(project_root / DEFAULT_DIFF_CACHE_DIR)
+
+    def path_for(self, commit: str) -> Path:
+        return self.directory / f"{commit}.json"
+
+    def load(
+        self,
+        commit: str,
+        project_root: Path,
+        parse: Optional[ParseOptions] = None,
+        failures: Optional[list[ParseFailure]] = None,
+    ) -> Optional[DependencyGraph]:
+        try:
+            with self.path_for(commit).open("rb") as f:
+                header, root, options, data, skipped = json.load(f)
+            if (header, root, options) != (
+                list(cache_header()),
+                str(project_root),
+                repr(parse or ParseOptions()),
+            ):
+                return None
+            graph = DependencyGraph.from_json(data)
+            skipped = [ParseFailure.from_json(item) for item in skipped]
+        except (OSError, ValueError, LookupError, TypeError):
+            # Missing, truncated or not written by save()
+            return None
+
+        if failures is not None:
+            failures.extend(skipped)
+        return graph
+
+    def save(
+        self,
+        commit: str,
+        project_root: Path,
+        graph: DependencyGraph,
+        parse: Optional[ParseOptions] = None,
+        failures: Iterable[ParseFailure] = (),
+    ) -> None:
+        payload = (
+            cache_header(),
+            str(project_root),
+            repr(parse or ParseOptions()),
+            graph.to_json(),
+            [failure.to_json() for failure in failures],
+        )
+        write_atomic(self.path_for(commit), json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+        entries = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime_ns)
+        for stale in entries[:-MAX_CACHED_BASES]:
+            stale.unlink(missing_ok=True)
+
+
+def project_files(
+    repo: GitRepo,
+    project_root: Path,
+    paths: Iterable[str],
+) -> dict[str, Path]:
+    """
+    Map repo-relative paths to absolute paths, keeping only the files
+    a scan of `project_root` would pick up.
+    """
+    files: dict[str, Path] = {}
+
+    for rel in paths:
+        path = repo.root / rel
+        if not path.is_relative_to(project_root):
+            continue
+        if any(part in IGNORED_DIRS for part in path.relative_to(project_root).parts):
+            continue
+        files[rel] = path
+
+    return files
+
+
+def commit_namer(repo: GitRepo, commit: str, project_root: Path) -> ModuleNamer:
+    """
+    Module namer for the package layout of `commit`.
+    """
+    files = project_files(repo, project_root, repo.python_files(commit))
+    return ModuleNamer.from_files(project_root, files.values())
+
+
+def build_fragment(
+    path: Path,
+    data: bytes,
+    builder: GraphBuilder,
+    namer: ModuleNamer,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> DependencyGraph:
+    """
+    Parse one file's contents into its module graph.
+
+    In a tolerant run a file that cannot be parsed yields an empty
+    module; its ParseFailure is appended to `failures`.
+    """
+    parse = parse or ParseOptions()
+    try:
+        result = parse_python_bytes(data, filename=str(path), options=parse)
+    except Exception as exc:
+        if not parse.tolerant:
+            raise
+        if failures is not None:
+            failures.append(ParseFailure.from_exception(path, exc))
+        result = ([], [], [])
+    return build_module_graph(path, namer.module_name(path), result, builder)
+
+
+def build_commit_graph(
+    repo: GitRepo,
+    commit: str,
+    project_root: Path,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> DependencyGraph:
+    """
+    Build the resolved project graph as of `commit`, reading the
+    sources from git instead of the working tree.
+
+    `parse` and `failures` work as in build_project_graph.
+    """
+    files = project_files(repo, project_root, repo.python_files(commit))
+    paths = sorted(files, key=files.__getitem__)
+
+    builder = GraphBuilder()
+    namer = ModuleNamer.from_files(project_root, files.values())
+    graph = DependencyGraph()
+
+    for rel, data in zip(paths, repo.read_files(commit, paths)):
+        graph.merge(build_fragment(files[rel], data, builder, namer, parse, failures))
+
+    Resolver().resolve(graph)
+    return graph
+
+
+def load_base_graph(
+    repo: GitRepo,
+    commit: str,
+    project_root: Path,
+    cache: Optional[BaseGraphCache] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> DependencyGraph:
+    """
+    Resolved graph of `commit`, from the cache when possible.
+    The caller owns the returned graph and may modify it.
+
+    Files a tolerant build skipped are appended to `failures`, also when
+    the graph comes from the cache.
+    """
+    graph = cache.load(commit, project_root, parse, failures) if cache is not None else None
+    if graph is None:
+        skipped: list[ParseFailure] = []
+        graph = build_commit_graph(repo, commit, project_root, parse, skipped)
+        if cache is not None:
+            cache.save(commit, project_root, graph, parse, skipped)
+        if failures is not None:
+            failures.extend(skipped)
+    return graph
+
+
+def read_head_files(
+    repo: GitRepo,
+    head_commit: Optional[str],
+    files: dict[str, Path],
+) -> dict[Path, bytes]:
+    """
+    Contents of `files` at `head_commit`, or in the work tree when None.
+    """
+    paths = list(files)
+    if head_commit is not None:
+        contents = repo.read_files(head_commit, paths)
+    else:
+        contents = [files[rel].read_bytes() for rel in paths]
+    return {files[rel]: data for rel, data in zip(paths, contents)}
+
+
+def _functions_in(
+    graph: DependencyGraph,
+    paths: Iterable[Path],
+    namer: ModuleNamer,
+) -> LocationIndex:
+    modules = {namer.module_name(path) for path in paths}
+    return LocationIndex(
+        graph.nodes[symbol_id]
+        for module in modules
+        for symbol_id in graph.module_symbols.get(module, ())
+    )
+
+
+def touched_functions(
+    index: LocationIndex,
+    files: dict[str, Path],
+    diffs: list[FileDiff],
+    old_side: bool,
+) -> set[SymbolId]:
+    """
+    Functions overlapping the diff's line ranges on one side of it.
+    """
+    touched: set[SymbolId] = set()
+
+    for diff in diffs:
+        rel = diff.old_path if old_side else diff.new_path
+        if rel not in files:
+            continue
+        for start, end in diff.old_ranges if old_side else diff.new_ranges:
+            touched.update(fn.id for fn in index.overlapping(files[rel], start, end))
+
+    return touched
+
+
+def run_diff_analysis(
+    project_root: Path,
+    revisions: str,
+    cache: Optional[BaseGraphCache] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> DiffImpactResult:
+    """
+    Find the functions a git diff touches and everything upstream of them.
+
+    The base graph is built once per base commit (and cached); the head
+    graph is derived from it by re-parsing only the files in the diff.
+    Changed line ranges are mapped to functions through their source
+    spans, then a single upstream traversal covers all of them.
+
+    Args:
+        project_root: Directory inside a git work tree
+        revisions: "base..head", or "base" to compare with the work tree
+        cache: Optional store of resolved base graphs
+        parse: Error handling and per-file budgets (default: strict)
+        failures: Receives the files a tolerant run skipped, on either
+            side of the diff
+
+    Raises:
+        ValueError: for unknown revisions or when git fails
+    """
+    project_root = project_root.resolve()
+    base, head = parse_revision_range(revisions)
+
+    repo = GitRepo.discover(project_root)
+    base_commit = repo.rev_parse(base)
+    head_commit = repo.rev_parse(head) if head is not None else None
+
+    graph = load_base_graph(repo, base_commit, project_root, cache, parse, failures)
+
+    # Modules keep the names of the base layout on both sides of the diff
+    namer = commit_namer(repo, base_commit, project_root)
+
+    diffs = repo.diff(base_commit, head_commit)
+    old_files = project_files(repo, project_root, (d.old_path for d in diffs if d.old_path))
+    new_files = project_files(repo, project_root, (d.new_path for d in diffs if d.new_path))
+
+    # Step 1: functions under removed/modified lines, on the base graph
+    base_index = _functions_in(graph, old_files.values(), namer)
+    base_hits = touched_functions(base_index, old_files, diffs, old_side=True)
+    base_callers = {sid: set(graph.reverse_edges.get(sid, ())) for sid in base_hits}
+
+    # Step 2: turn the base graph into the head graph, one module at a time
+    builder = GraphBuilder()
+    fragments = {path: DependencyGraph() for path in old_files.values()}
+    for path, data in read_head_files(repo, head_commit, new_files).items():
+        fragments[path] = build_fragment(path, data, builder, namer, parse, failures)
+
+    resolver = Resolver()
+    for path in sorted(fragments):
+        resolver.replace_module(graph, namer.module_name(path), fragments[path])
+
+    # Step 3: functions under added/modified lines, on the head graph
+    head_index = _functions_in(graph, new_files.values(), namer)
+    changed = touched_functions(head_index, new_files, diffs, old_side=False)
+    changed |= {sid for sid in base_hits if sid in graph.nodes}
+    deleted = {sid for sid in base_hits if sid not in graph.nodes}
+
+    # Step 4: one upstream traversal from everything that changed.
+    # Callers of deleted functions stand in for them.
+    origins: dict[SymbolId, set[SymbolId]] = {sid: {sid} for sid in changed}
+    for sid in deleted:
+        for caller in base_callers[sid]:
+            if caller in graph.nodes:
+                origins.setdefault(caller, set()).add(sid)
+
+    affected: dict[SymbolId, set[SymbolId]] = {}
+    for sid, seeds in ImpactAnalyzer(graph).upstream_many(origins).items():
+        affected[sid] = set().union(*(origins[seed] for seed in seeds))
+
+    for caller, removed in origins.items():
+        if caller not in changed:
+            affected.setdefault(caller, set()).update(removed)
+
+    return DiffImpactResult(
+        base=base_commit,
+        head=head_commit,
+        changed=changed,
+        deleted=deleted,
+        affected=affected,
+    )
@@ -0,0 +1,181 @@
+import re
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+# (first, last) line numbers, both inclusive
+LineRange = tuple[int, int]
+
+_HUNK_RE = re.compile(rb"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass
+class FileDiff:
+    """
+    Changed line ranges of one file, on both sides of a diff.
+
+    Paths are relative to the repository root; `old_path` is None for
+    added files and `new_path` is None for deleted ones.
+    """
+    old_path: Optional[str]
+    new_path: Optional[str]
+    old_ranges: list[LineRange] = field(default_factory=list)
+    new_ranges: list[LineRange] = field(default_factory=list)
+
+
+def _diff_path(line: bytes) -> Optional[str]:
+    # "--- a/pkg/mod.py", "+++ b/pkg/mod.py" or "--- /dev/null"
+    path = line[4:].rstrip(b"\n").decode("utf-8", "surrogateescape")
+    if path == "/dev/null":
+        return None
+    return path[2:]
+
+
+def parse_unified_diff(data: bytes) -> list[FileDiff]:
+    """
+    Extract per-file changed line ranges from `git diff --unified=0`.
+
+    A hunk that only removes lines has no new-side range (and vice
+    versa); the removed lines are still visible on the old side.
+    """
+    diffs: list[FileDiff] = []
+    current: Optional[FileDiff] = None
+    old_path: Optional[str] = None
+
+    for line in data.splitlines(keepends=True):
+        if line.startswith(b"diff --git "):
+            current = None
+        elif line.startswith(b"--- "):
+            old_path = _diff_path(line)
+        elif line.startswith(b"+++ "):
+            current = FileDiff(old_path=old_path, new_path=_diff_path(line))
+            diffs.append(current)
+        elif current is not None and line.startswith(b"@@"):
+            match = _HUNK_RE.match(line)
+            if match is None:
+                continue
+            old_start, old_count, new_start, new_count = (
+                int(group) if group is not None else 1 for group in match.groups()
+            )
+            if old_count:
+                current.old_ranges.append((old_start, old_start + old_count - 1))
+            if new_count:
+                current.new_ranges.append((new_start, new_start + new_count - 1))
+
+    return diffs
+
+
+def parse_revision_range(spec: str) -> tuple[str, Optional[str]]:
+    """
+    Split "base..head" into (base, head).
+
+    "base" or "base.." compares against the working tree (head=None).
+
+    Raises:
+        ValueError: if the base revision is missing
+    """
+    base, sep, head = spec.partition("..")
+    if head.startswith("."):
+        raise ValueError(f"Symmetric ranges are not supported: '{spec}'")
+    if not base:
+        raise ValueError(f"Missing base revision in '{spec}'")
+    return base, (head or None) if sep else None
+
+
+class GitRepo:
+    """
+    Thin wrapper around the git command line for one repository.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    @classmethod
+    def discover(cls, path: Path) -> "GitRepo":
+        """
+        Find the repository containing `path`.
+
+        Raises:
+            ValueError: if `path` is not inside a git work tree
+        """
+        out = cls(path)._git("rev-parse", "--show-toplevel")
+        return cls(Path(out.decode().strip()).resolve())
+
+    def _git(self, *args: str, stdin: Optional[bytes] = None) -> bytes:
+        try:
+            completed = subprocess.run(
+                ["git", "-C", str(self.root), *args],
+                input=stdin,
+                capture_output=True,
+                check=True,
+            )
+        except FileNotFoundError:
+            raise ValueError("git executable not found") from None
+        except subprocess.CalledProcessError as e:
+            message = e.stderr.decode(errors="replace").strip()
+            raise ValueError(f"git {args[0]} failed: {message}") from None
+        return completed.stdout
+
+    def rev_parse(self, revision: str) -> str:
+        """
+        Full commit hash of `revision`.
+        """
+        try:
+            out = self._git("rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}")
+        except ValueError:
+            raise ValueError(f"Unknown revision '{revision}'") from None
+        return out.decode().strip()
+
+    def python_files(self, commit: str) -> list[str]:
+        """
+        Repo-relative paths of all .py files in a commit.
+        """
+        out = self._git("ls-tree", "-r", "-z", "--name-only", "--full-tree", commit)
+        paths = out.decode("utf-8", "surrogateescape").split("\0")
+        return [path for path in paths if path.endswith(".py")]
+
+    def read_files(self, commit: str, paths: list[str]) -> list[bytes]:
+        """
+        Contents of `paths` at `commit`, in one `git cat-file` call.
+        """
+        if not paths:
+            return []
+
+        request = "".join(f"{commit}:{path}\n" for path in paths)
+        out = self._git("cat-file", "--batch", stdin=request.encode("utf-8", "surrogateescape"))
+
+        contents: list[bytes] = []
+        pos = 0
+        for path in paths:
+            header_end = out.index(b"\n", pos)
+            header = out[pos:header_end].split()
+            if header[-1] == b"missing":
+                raise ValueError(f"{path} does not exist at {commit}")
+            size = int(header[2])
+            start = header_end + 1
+            contents.append(out[start : start + size])
+            pos = start + size + 1
+
+        return contents
+
+    def diff(self, base: str, head: Optional[str] = None) -> list[FileDiff]:
+        """
+        Changed .py files between two commits, or between `base` and the
+        working tree when `head` is None. Renames show up as a delete
+        plus an add.
+        """
+        revisions = [base] if head is None else [base, head]
+        out = self._git(
+            "diff",
+            "--no-color",
+            "--no-ext-diff",
+            "--no-renames",
+            "--unified=0",
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            *revisions,
+            "--",
+            "*.py",
+        )
+        return parse_unified_diff(out)
@@ -1,17 +1,99 @@
 from pathlib import Path
+from typing import Optional
 
-from pyimpact.analyzer.scanner import scan_python_files
-from pyimpact.analyzer.parser import parse_python_file
-from pyimpact.analyzer.graph_builder import GraphBuilder
-from pyimpact.analyzer.resolver import Resolver
+from pyimpact.analyzer.cache import ParseCache
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.result import BatchImpactResult, ImpactResult
+from pyimpact.core import metrics
 from pyimpact.query.engine import ImpactAnalyzer
+from pyimpact.query.lookup import SymbolLookup
+from pyimpact.query.subgraph import extract_subgraph
+from pyimpact.core.compact import CompactGraph
 from pyimpact.core.ids import SymbolId
 from pyimpact.core.model import DependencyGraph
 
 
+# Candidates listed in an "ambiguous" error
+MAX_LISTED_MATCHES = 5
+
+
+def find_target(
+    graph: DependencyGraph | CompactGraph,
+    function_name: str,
+    lookup: Optional[SymbolLookup] = None,
+) -> SymbolId:
+    """
+    Find the unique symbol named `function_name`: a qualname
+    ("Class.method"), a module-qualified name ("pkg.mod.func") or any
+    dotted tail of one ("method", "mod.Class.method").
+
+    Pass `lookup` to reuse one name index across many queries.
+
+    Raises:
+        ValueError: if no symbol or more than one symbol matches
+    """
+    with metrics.span("find_target"):
+        lookup = lookup or SymbolLookup.for_graph(graph)
+        matches = lookup.find(function_name)
+
+    if not matches:
+        message = f"Function '{function_name}' not found"
+        suggestions = lookup.suggest(function_name)
+        if suggestions:
+            message += f"; did you mean {', '.join(suggestions)}?"
+        raise ValueError(message)
+
+    if len(matches) > 1:
+        names = sorted(sid.full_name for sid in matches)
+        listed = ", ".join(names[:MAX_LISTED_MATCHES])
+        if len(names) > MAX_LISTED_MATCHES:
+            listed += ", ..."
+        raise ValueError(
+            f"Function name '{function_name}' is ambiguous ({listed}). "
+            f"Please use a qualified name."
+        )
+
+    return matches[0]
+
+
+def analyze_impact(
+    graph: DependencyGraph | CompactGraph,
+    target: SymbolId,
+    upstream: bool = True,
+    downstream: bool = True,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    subgraph: bool = True,
+) -> ImpactResult:
+    """
+    Distance-annotated impact of `target` plus the subgraph to draw.
+
+    `max_depth` and `max_nodes` bound each direction separately, so an
+    interactive query only walks as much of the graph as it will show.
+    Without `subgraph`, nodes and edges are left empty for callers that
+    only list the symbols.
+    """
+    analyzer = ImpactAnalyzer(graph)
+    with metrics.span("bfs"):
+        up = analyzer.upstream_distances(target, max_depth, max_nodes) if upstream else {}
+        down = analyzer.downstream_distances(target, max_depth, max_nodes) if downstream else {}
+    metrics.count("impact.upstream", len(up))
+    metrics.count("impact.downstream", len(down))
+
+    if not subgraph:
+        return ImpactResult(target=target, upstream=up, downstream=down, nodes=set(), edges=set())
+
+    with metrics.span("subgraph"):
+        nodes, edges = extract_subgraph(graph=graph, target=target, upstream=up, downstream=down)
+
+    return ImpactResult(target=target, upstream=up, downstream=down, nodes=nodes, edges=edges)
+
+
 def run_impact_analysis(
     function_name: str,
     project_root: Path,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
 ) -> tuple[
     DependencyGraph,
     SymbolId,
@@ -27,55 +109,50 @@ def run_impact_analysis(
         downstream_symbols,
         upstream_symbols
     """
-    builder = GraphBuilder()
-    full_graph = DependencyGraph()
-
-    # Step 1–3: Scan → Parse → Build
-    for file_path in scan_python_files(project_root):
-        module_name = file_path.stem
-        functions, calls, imports = parse_python_file(file_path)
-
-        graph = builder.build(
-            file_path=file_path,
-            module_name=module_name,
-            functions=functions,
-            calls=calls,
-            imports=imports,
-        )
-
-        full_graph.nodes.update(graph.nodes)
-
-        for k, v in graph.edges.items():
-            full_graph.edges.setdefault(k, set()).update(v)
-
-        for k, v in graph.reverse_edges.items():
-            full_graph.reverse_edges.setdefault(k, set()).update(v)
-
-        full_graph.unresolved_calls.extend(graph.unresolved_calls)
+    # Step 1–4: Scan → Parse → Build → Resolve
+    full_graph = build_project_graph(project_root, cache=cache, jobs=jobs)
 
     if not full_graph.nodes:
         raise ValueError("No Python functions found in project")
 
-    # Step 4: Resolve
-    Resolver().resolve(full_graph)
-
     # Step 5: Find target
-    matches = [sid for sid in full_graph.nodes if sid.qualname == function_name]
-
-    if not matches:
-        raise ValueError(f"Function '{function_name}' not found")
-
-    if len(matches) > 1:
-        raise ValueError(
-            f"Function name '{function_name}' is ambiguous. "
-            f"Please use a qualified name."
-        )
-
-    target_id = matches[0]
+    target_id = find_target(full_graph, function_name)
 
     # Step 6: Impact analysis
     analyzer = ImpactAnalyzer(full_graph)
-    downstream = analyzer.downstream(target_id)
-    upstream = analyzer.upstream(target_id)
+    with metrics.span("bfs"):
+        downstream = analyzer.downstream(target_id)
+        upstream = analyzer.upstream(target_id)
 
     return full_graph, target_id, downstream, upstream
+
+
+def batch_impact(
+    graph: DependencyGraph | CompactGraph,
+    function_names: list[str],
+    upstream: bool = True,
+    downstream: bool = True,
+) -> BatchImpactResult:
+    """
+    Impact of many functions over one graph, one traversal per direction.
+    """
+    targets: dict[str, SymbolId] = {}
+    errors: dict[str, str] = {}
+    lookup = SymbolLookup.for_graph(graph)
+
+    for name in function_names:
+        try:
+            targets[name] = find_target(graph, name, lookup)
+        except ValueError as e:
+            errors[name] = str(e)
+
+    analyzer = ImpactAnalyzer(graph)
+    symbols = targets.values()
+
+    with metrics.span("bfs"):
+        return BatchImpactResult(
+            targets=targets,
+            upstream=analyzer.upstream_many(symbols) if upstream else {},
+            downstream=analyzer.downstream_many(symbols) if downstream else {},
+            errors=errors,
+        )
@@ -0,0 +1,81 @@
+from pathlib import Path
+from typing import Optional
+
+from pyimpact.analyzer.cache import ParseCache, content_digest, tree_fingerprint
+from pyimpact.analyzer.parser import ParseFailure, ParseOptions
+from pyimpact.analyzer.scanner import ScanOptions, scan_python_files
+from pyimpact.app.build import build_project_graph
+from pyimpact.core import metrics
+from pyimpact.core.model import DependencyGraph
+from pyimpact.core.snapshot import MappedGraph, load_snapshot, write_snapshot
+
+DEFAULT_INDEX_PATH = Path(".pyimpact") / "index.bin"
+
+
+def index_path(project_root: Path) -> Path:
+    return project_root / DEFAULT_INDEX_PATH
+
+
+def sources_key(
+    project_root: Path,
+    scan: Optional[ScanOptions] = None,
+    parse: Optional[ParseOptions] = None,
+) -> str:
+    """
+    Identity of what a build of `project_root` reads: the path, mtime and
+    size of every file the scan picks up, and the options that decide
+    which files those are and how they are parsed and named.
+    """
+    files = sorted(scan_python_files(project_root.resolve(), scan))
+    options = repr((scan or ScanOptions(), parse or ParseOptions()))
+    return f"{tree_fingerprint(files)}:{content_digest(options.encode('utf-8'))}"
+
+
+def build_index(
+    project_root: Path,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    scan: Optional[ScanOptions] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> tuple[Path, DependencyGraph]:
+    """
+    Build the project graph and save it as a binary snapshot, stamped
+    with the sources key it was built from.
+
+    Returns:
+        snapshot path, the graph that was written
+    """
+    # Taken first: a file edited during the build makes the index stale
+    key = sources_key(project_root, scan, parse)
+    graph = build_project_graph(
+        project_root, cache=cache, jobs=jobs, scan=scan, parse=parse, failures=failures
+    )
+
+    path = index_path(project_root)
+    with metrics.span("index.write"):
+        write_snapshot(graph, path, source_key=key)
+
+    return path, graph
+
+
+def load_index(
+    project_root: Path,
+    scan: Optional[ScanOptions] = None,
+    parse: Optional[ParseOptions] = None,
+) -> Optional[MappedGraph]:
+    """
+    Memory-map the project's snapshot, if one has been built from the
+    current sources with the same options; None otherwise.
+
+    Raises:
+        ValueError: if the snapshot exists but cannot be read
+    """
+    path = index_path(project_root)
+    if not path.is_file():
+        return None
+    with metrics.span("index.load"):
+        graph = load_snapshot(path)
+    with metrics.span("index.check"):
+        current = sources_key(project_root, scan, parse)
+    return graph if graph.source_key == current else None
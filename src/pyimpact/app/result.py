@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from typing import Any
+
+from pyimpact.core.ids import SymbolId
+
+
+def symbol_to_json(symbol: SymbolId) -> list[str]:
+    return [symbol.language, symbol.module, symbol.qualname]
+
+
+def symbol_from_json(data: list[str]) -> SymbolId:
+    language, module, qualname = data
+    return SymbolId(language=language, module=module, qualname=qualname)
+
+
+@dataclass
+class ImpactResult:
+    """
+    Answer to an impact query: the reached symbols, each with its hop
+    count from the target, plus the subgraph to visualize. Serializable
+    so the daemon can ship it to the CLI.
+    """
+    target: SymbolId
+    upstream: dict[SymbolId, int]
+    downstream: dict[SymbolId, int]
+    nodes: set[SymbolId]
+    edges: set[tuple[SymbolId, SymbolId]]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "target": symbol_to_json(self.target),
+            "upstream": [[symbol_to_json(s), hops] for s, hops in self.upstream.items()],
+            "downstream": [[symbol_to_json(s), hops] for s, hops in self.downstream.items()],
+            "nodes": [symbol_to_json(s) for s in self.nodes],
+            "edges": [[symbol_to_json(a), symbol_to_json(b)] for a, b in self.edges],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ImpactResult":
+        return cls(
+            target=symbol_from_json(data["target"]),
+            upstream={symbol_from_json(s): hops for s, hops in data["upstream"]},
+            downstream={symbol_from_json(s): hops for s, hops in data["downstream"]},
+            nodes={symbol_from_json(s) for s in data["nodes"]},
+            edges={(symbol_from_json(a), symbol_from_json(b)) for a, b in data["edges"]},
+        )
+
+
+def _attribution_to_json(
+    attribution: dict[SymbolId, set[SymbolId]],
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "symbol": symbol_to_json(sid),
+            "targets": sorted(symbol_to_json(t) for t in attribution[sid]),
+        }
+        for sid in sorted(attribution, key=symbol_to_json)
+    ]
+
+
+@dataclass
+class BatchImpactResult:
+    """
+    Answer to an impact query over many targets at once.
+
+    `upstream` and `downstream` map each affected symbol to the targets
+    it was reached from. Names that could not be resolved to a single
+    symbol are reported in `errors` instead of failing the whole batch.
+    """
+    targets: dict[str, SymbolId]
+    upstream: dict[SymbolId, set[SymbolId]]
+    downstream: dict[SymbolId, set[SymbolId]]
+    errors: dict[str, str]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "targets": {name: symbol_to_json(s) for name, s in self.targets.items()},
+            "upstream": _attribution_to_json(self.upstream),
+            "downstream": _attribution_to_json(self.downstream),
+            "errors": dict(self.errors),
+        }
+
+
+@dataclass
+class DiffImpactResult:
+    """
+    Functions touched by a git diff and everything upstream of them.
+
+    `changed` are functions whose lines the diff touches and that still
+    exist at head, `deleted` are functions removed by it. `affected`
+    maps each caller that may break to the changed or deleted functions
+    it reaches.
+    """
+    base: str
+    head: str | None
+    changed: set[SymbolId]
+    deleted: set[SymbolId]
+    affected: dict[SymbolId, set[SymbolId]]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "base": self.base,
+            "head": self.head,
+            "changed": sorted(symbol_to_json(s) for s in self.changed),
+            "deleted": sorted(symbol_to_json(s) for s in self.deleted),
+            "affected": _attribution_to_json(self.affected),
+        }
@@ -0,0 +1,200 @@
+import json
+from pathlib import Path
+from typing import Iterable, Optional
+
+from pyimpact.analyzer.cache import ParseCache, cache_header, content_digest
+from pyimpact.analyzer.graph_builder import GraphBuilder
+from pyimpact.analyzer.parser import ParseFailure, ParseOptions
+from pyimpact.analyzer.scanner import ScanOptions
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.diff import (
+    BaseGraphCache,
+    build_fragment,
+    commit_namer,
+    load_base_graph,
+    project_files,
+    read_head_files,
+    touched_functions,
+)
+from pyimpact.app.git import GitRepo, parse_revision_range
+from pyimpact.app.index import sources_key
+from pyimpact.app.tests_index import (
+    TestIndex,
+    is_test_function,
+    load_test_index,
+    pytest_node_id,
+    write_test_index,
+)
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import FunctionSymbol
+from pyimpact.query.locations import LocationIndex
+
+DEFAULT_TEST_INDEX_DIR = Path(".pyimpact") / "tests-index"
+
+
+class TestIndexCache:
+    """
+    Last TestIndex built for a project, tagged with the key of the source
+    state and options it was built from ("tree:<sources_key>" or
+    "commit:<hash>:<options digest>"). Each kind of key has its own slot,
+    so file and git queries don't evict each other. The files a tolerant build skipped are saved with it,
+    so a cache hit reports them again.
+    """
+
+    __test__ = False  # not a pytest class
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    @classmethod
+    def for_project(cls, project_root: Path) -> "TestIndexCache":
+        return cls(project_root / DEFAULT_TEST_INDEX_DIR)
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key.partition(':')[0]}.bin"
+
+    def load(
+        self,
+        key: str,
+        project_root: Path,
+        failures: Optional[list[ParseFailure]] = None,
+    ) -> Optional[TestIndex]:
+        """
+        The saved index, memory-mapped, or None when there is none for
+        this project and key.
+        """
+        try:
+            index = load_test_index(self.path_for(key))
+            header, root, stored_key, skipped = json.loads(index.stamp)
+            if (header, root, stored_key) != (list(cache_header()), str(project_root), key):
+                return None
+            skipped = [ParseFailure.from_json(item) for item in skipped]
+        except (OSError, ValueError, LookupError, TypeError):
+            return None
+
+        if failures is not None:
+            failures.extend(skipped)
+        return index
+
+    def save(
+        self,
+        key: str,
+        project_root: Path,
+        index: TestIndex,
+        failures: Iterable[ParseFailure] = (),
+    ) -> None:
+        stamp = json.dumps(
+            [
+                list(cache_header()),
+                str(project_root),
+                key,
+                [failure.to_json() for failure in failures],
+            ]
+        )
+        write_test_index(index, self.path_for(key), stamp)
+
+
+def select_tests_for_files(
+    project_root: Path,
+    changed: list[Path],
+    cache: Optional[ParseCache] = None,
+    index_cache: Optional[TestIndexCache] = None,
+    jobs: int = 1,
+    scan: Optional[ScanOptions] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> list[str]:
+    """
+    pytest node IDs of the tests reaching any function in `changed`.
+
+    The test index is rebuilt only when a file in the project was added,
+    removed or modified, or the scan and parse options changed, since it
+    was last built.
+    """
+    project_root = project_root.resolve()
+    key = "tree:" + sources_key(project_root, scan, parse)
+
+    index = index_cache.load(key, project_root, failures) if index_cache is not None else None
+    if index is None:
+        skipped: list[ParseFailure] = []
+        graph = build_project_graph(
+            project_root, cache=cache, jobs=jobs, scan=scan, parse=parse, failures=skipped
+        )
+        index = TestIndex.from_graph(graph, project_root)
+        if index_cache is not None:
+            index_cache.save(key, project_root, index, skipped)
+        if failures is not None:
+            failures.extend(skipped)
+
+    symbols = [fn.id for path in changed for fn in index.locations.in_file(path.resolve())]
+    return [index.node_ids[i] for i in index.select(symbols)]
+
+
+def select_tests_for_diff(
+    project_root: Path,
+    revisions: str,
+    cache: Optional[BaseGraphCache] = None,
+    index_cache: Optional[TestIndexCache] = None,
+    parse: Optional[ParseOptions] = None,
+    failures: Optional[list[ParseFailure]] = None,
+) -> list[str]:
+    """
+    pytest node IDs of the tests reaching any function a git diff touches.
+
+    The index is built on the base commit's graph. Head-side changes only
+    need the touched files parsed: their functions are looked up by
+    SymbolId, and new or edited tests are selected directly. Tests the
+    diff deletes are dropped.
+
+    Files a tolerant run skipped, on either side, are appended to
+    `failures`.
+    """
+    project_root = project_root.resolve()
+    base, head = parse_revision_range(revisions)
+
+    repo = GitRepo.discover(project_root)
+    base_commit = repo.rev_parse(base)
+    head_commit = repo.rev_parse(head) if head is not None else None
+
+    options = content_digest(repr(parse or ParseOptions()).encode("utf-8"))
+    key = f"commit:{base_commit}:{options}"
+    index = index_cache.load(key, project_root, failures) if index_cache is not None else None
+    if index is None:
+        skipped: list[ParseFailure] = []
+        graph = load_base_graph(repo, base_commit, project_root, cache, parse, skipped)
+        index = TestIndex.from_graph(graph, project_root)
+        if index_cache is not None:
+            index_cache.save(key, project_root, index, skipped)
+        if failures is not None:
+            failures.extend(skipped)
+
+    diffs = repo.diff(base_commit, head_commit)
+    old_files = project_files(repo, project_root, (d.old_path for d in diffs if d.old_path))
+    new_files = project_files(repo, project_root, (d.new_path for d in diffs if d.new_path))
+
+    builder = GraphBuilder()
+    namer = commit_namer(repo, base_commit, project_root)
+    head_functions: dict[SymbolId, FunctionSymbol] = {}
+    for path, data in read_head_files(repo, head_commit, new_files).items():
+        fragment = build_fragment(path, data, builder, namer, parse, failures)
+        head_functions.update(fragment.nodes)
+
+    head_hits = touched_functions(
+        LocationIndex(head_functions.values()), new_files, diffs, old_side=False
+    )
+    symbols = touched_functions(index.locations, old_files, diffs, old_side=True) | head_hits
+
+    touched_paths = set(old_files.values()) | set(new_files.values())
+    selected = {
+        index.node_ids[i]
+        for i in index.select(symbols)
+        if index.tests[i].location.file_path not in touched_paths
+        or index.tests[i].id in head_functions
+    }
+    selected.update(
+        pytest_node_id(head_functions[sid], project_root)
+        for sid in head_hits
+        if is_test_function(head_functions[sid], project_root)
+    )
+
+    return sorted(selected)
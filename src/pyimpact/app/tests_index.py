@@ -0,0 +1,360 @@
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Literal, TypeVar, overload
+
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import DependencyGraph, FunctionSymbol
+from pyimpact.core.snapshot import (
+    MappedFunctions,
+    StringInterner,
+    StringTable,
+    node_row,
+    write_sections,
+)
+from pyimpact.query.engine import propagate_sources
+from pyimpact.query.locations import LocationIndex
+
+# ------------------------------------------------------------------
+# File layout of a saved TestIndex (little-endian, every section 8-byte
+# aligned). Functions are stored like snapshot nodes, grouped by file,
+# so a query maps in the file and decodes only the changed files' rows.
+#
+#   header        MAGIC, format, then (offset, length) for each section
+#   stamp         utf-8 bytes, opaque to this module (see TestIndexCache)
+#   str_offsets   uint64[n_strings + 1]
+#   str_blob      utf-8 bytes
+#   node_table    uint32[n_functions * NODE_FIELDS], grouped by file
+#   files         uint32[n_files * 3]  (path, first row, end row), by path
+#   by_symbol     uint32[n_functions]  rows sorted by (module, qualname)
+#   tests         uint32[n_tests * 2]  (node id, row), in test order
+#   mask_offsets  uint64[n_functions + 1]
+#   mask_blob     bitmask of the reaching tests per row, little-endian
+# ------------------------------------------------------------------
+
+MAGIC = b"PYIMPTST"
+TEST_INDEX_FORMAT = 1
+
+SECTIONS = (
+    "stamp",
+    "str_offsets",
+    "str_blob",
+    "node_table",
+    "files",
+    "by_symbol",
+    "tests",
+    "mask_offsets",
+    "mask_blob",
+)
+
+_HEADER = struct.Struct("<8sI" + "QQ" * len(SECTIONS))
+
+T = TypeVar("T")
+
+# A test is a `test*` function (or method of a `Test*` class) in a file
+# below one of these directories
+TEST_DIRS = {"tests"}
+TEST_PREFIX = "test"
+TEST_CLASS_PREFIX = "Test"
+
+
+def is_test_function(fn: FunctionSymbol, project_root: Path) -> bool:
+    if not fn.name.startswith(TEST_PREFIX) or "<locals>" in fn.id.qualname:
+        return False
+    if fn.class_name is not None and not all(
+        part.startswith(TEST_CLASS_PREFIX) for part in fn.class_name.split(".")
+    ):
+        return False
+    try:
+        relative = fn.location.file_path.relative_to(project_root)
+    except ValueError:
+        return False
+    return any(part in TEST_DIRS for part in relative.parent.parts)
+
+
+def pytest_node_id(fn: FunctionSymbol, project_root: Path) -> str:
+    """
+    pytest node ID of a test function, relative to the project root.
+    """
+    parts = [fn.location.file_path.relative_to(project_root).as_posix()]
+    if fn.class_name:
+        parts.extend(fn.class_name.split("."))
+    parts.append(fn.name)
+    return "::".join(parts)
+
+
+class TestIndex:
+    """
+    Precomputed answer to "which tests reach this symbol?".
+
+    Every symbol maps to a bitmask over `tests` (bit k set when tests[k]
+    calls it directly or transitively), computed with one multi-source
+    traversal from all tests. Selecting tests for a change is then one
+    dict lookup and an OR per changed symbol.
+
+    `locations` keeps the source spans of every function so changed
+    files and line ranges can be mapped to symbols without the graph.
+    """
+
+    __test__ = False  # not a pytest class
+
+    def __init__(
+        self,
+        tests: Sequence[FunctionSymbol],
+        node_ids: Sequence[str],
+        masks: Mapping[SymbolId, int],
+        locations: LocationIndex,
+    ) -> None:
+        self.tests = tests
+        self.node_ids = node_ids
+        self.masks = masks
+        self.locations = locations
+
+    @classmethod
+    def from_graph(cls, graph: DependencyGraph, project_root: Path) -> "TestIndex":
+        found = [
+            (pytest_node_id(fn, project_root), fn)
+            for fn in graph.nodes.values()
+            if is_test_function(fn, project_root)
+        ]
+        found.sort(key=lambda item: item[0])
+        node_ids = [node_id for node_id, _ in found]
+        tests = [fn for _, fn in found]
+
+        sources = [fn.id for fn in tests]
+        masks = propagate_sources(sources, lambda sid: graph.edges.get(sid, ()))
+        for bit, sid in enumerate(sources):
+            masks[sid] = masks.get(sid, 0) | (1 << bit)
+
+        return cls(tests, node_ids, masks, LocationIndex(graph.nodes.values()))
+
+    def select(self, symbols: Iterable[SymbolId]) -> list[int]:
+        """
+        Positions in `tests` of the tests reaching any of `symbols`
+        (a test reaches itself).
+        """
+        mask = 0
+        for sid in symbols:
+            mask |= self.masks.get(sid, 0)
+
+        return [bit for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+def write_test_index(index: TestIndex, path: Path, stamp: str = "") -> None:
+    """
+    Save `index` for MappedTestIndex. `stamp` is stored as is and read
+    back as MappedTestIndex.stamp.
+    """
+    intern = StringInterner()
+    node_table = array("I")
+    files = array("I")
+    mask_blob = bytearray()
+    mask_offsets = array("Q", [0])
+    rows: dict[SymbolId, int] = {}
+
+    for file_path in sorted(index.locations.files(), key=str):
+        first = len(rows)
+        for fn in index.locations.in_file(file_path):
+            rows[fn.id] = len(rows)
+            node_table.extend(node_row(fn, intern))
+            mask = index.masks.get(fn.id, 0)
+            mask_blob += mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+            mask_offsets.append(len(mask_blob))
+        files.extend((intern(str(file_path)), first, len(rows)))
+
+    by_symbol = array("I", (rows[sid] for sid in sorted(rows, key=_symbol_key)))
+    tests = array("I")
+    for node_id, fn in zip(index.node_ids, index.tests, strict=True):
+        tests.extend((intern(node_id), rows[fn.id]))
+
+    str_offsets, str_blob = intern.encode()
+    sections = {
+        "stamp": stamp.encode("utf-8"),
+        "str_offsets": str_offsets,
+        "str_blob": str_blob,
+        "node_table": node_table.tobytes(),
+        "files": files.tobytes(),
+        "by_symbol": by_symbol.tobytes(),
+        "tests": tests.tobytes(),
+        "mask_offsets": mask_offsets.tobytes(),
+        "mask_blob": bytes(mask_blob),
+    }
+    write_sections(
+        path,
+        _HEADER,
+        (MAGIC, TEST_INDEX_FORMAT),
+        [sections[name] for name in SECTIONS],
+    )
+
+
+def _symbol_key(sid: SymbolId) -> tuple[str, str]:
+    return sid.module, sid.qualname
+
+
+class _TestColumn(Sequence[T]):
+    """
+    One column of the tests table, decoded on access.
+    """
+
+    def __init__(self, table: memoryview, column: int, decode: Callable[[int], T]) -> None:
+        self._table = table
+        self._column = column
+        self._decode = decode
+
+    @overload
+    def __getitem__(self, i: int) -> T: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[T]: ...
+
+    def __getitem__(self, i: int | slice) -> T | list[T]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._decode(self._table[2 * i + self._column])
+
+    def __len__(self) -> int:
+        return len(self._table) // 2
+
+
+class _MappedMasks(Mapping[SymbolId, int]):
+    """
+    SymbolId → test bitmask via binary search over the rows sorted by
+    (module, qualname); only the rows probed are decoded.
+    """
+
+    def __init__(
+        self,
+        functions: MappedFunctions,
+        by_symbol: memoryview,
+        offsets: memoryview,
+        blob: memoryview,
+    ) -> None:
+        self._functions = functions
+        self._by_symbol = by_symbol
+        self._offsets = offsets
+        self._blob = blob
+
+    def __getitem__(self, key: SymbolId) -> int:
+        functions, order = self._functions, self._by_symbol
+        i = bisect_left(
+            order, _symbol_key(key), key=lambda row: _symbol_key(functions.symbol_id(row))
+        )
+        if i == len(order) or functions.symbol_id(order[i]) != key:
+            raise KeyError(key)
+        row = order[i]
+        return int.from_bytes(self._blob[self._offsets[row] : self._offsets[row + 1]], "little")
+
+    def __iter__(self) -> Iterator[SymbolId]:
+        return (self._functions.symbol_id(i) for i in range(len(self._functions)))
+
+    def __len__(self) -> int:
+        return len(self._functions)
+
+
+class _MappedLocations(LocationIndex):
+    """
+    LocationIndex that reads a file's spans from the mapped rows the
+    first time the file is asked for.
+    """
+
+    def __init__(self, files: memoryview, strings: StringTable, functions: MappedFunctions) -> None:
+        super().__init__(())
+        self._files = files
+        self._strings = strings
+        self._functions = functions
+        self._absent: set[Path] = set()
+
+    def _load(self, file_path: Path) -> None:
+        if file_path in self._spans or file_path in self._absent:
+            return
+
+        files, strings = self._files, self._strings
+        name = str(file_path)
+        i = bisect_left(range(len(files) // 3), name, key=lambda i: strings[files[3 * i]])
+        if i == len(files) // 3 or strings[files[3 * i]] != name:
+            self._absent.add(file_path)
+            return
+
+        first, end = files[3 * i + 1], files[3 * i + 2]
+        self._add_file(file_path, [self._functions[row] for row in range(first, end)])
+
+    def files(self) -> list[Path]:
+        return [Path(self._strings[self._files[i]]) for i in range(0, len(self._files), 3)]
+
+    def in_file(self, file_path: Path) -> list[FunctionSymbol]:
+        self._load(file_path)
+        return super().in_file(file_path)
+
+    def overlapping(self, file_path: Path, start: int, end: int) -> list[FunctionSymbol]:
+        self._load(file_path)
+        return super().overlapping(file_path, start, end)
+
+
+class MappedTestIndex(TestIndex):
+    """
+    TestIndex backed by a memory-mapped file from write_test_index.
+
+    Opening it reads nothing but the header: tests, masks and source
+    spans are decoded for the symbols and files a query asks about.
+    """
+
+    def __init__(self, mapping: mmap.mmap, sections: dict[str, memoryview]) -> None:
+        strings = StringTable(sections["str_offsets"], sections["str_blob"])
+        functions = MappedFunctions(sections["node_table"], strings)
+        tests = sections["tests"]
+
+        super().__init__(
+            tests=_TestColumn(tests, 1, functions.__getitem__),
+            node_ids=_TestColumn(tests, 0, strings.__getitem__),
+            masks=_MappedMasks(
+                functions, sections["by_symbol"], sections["mask_offsets"], sections["mask_blob"]
+            ),
+            locations=_MappedLocations(sections["files"], strings, functions),
+        )
+        self._mapping = mapping
+        self.stamp = str(sections["stamp"], "utf-8")
+
+
+def load_test_index(path: Path) -> MappedTestIndex:
+    """
+    Memory-map a file written by write_test_index.
+
+    Raises:
+        OSError: if the file cannot be opened
+        ValueError: if it is not a test index of this format
+    """
+    with path.open("rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapping) < _HEADER.size:
+        raise ValueError(f"{path} is not a pyimpact test index")
+
+    magic, version, *layout = _HEADER.unpack_from(mapping)
+    if (magic, version) != (MAGIC, TEST_INDEX_FORMAT):
+        raise ValueError(f"{path} is not a pyimpact test index of format {TEST_INDEX_FORMAT}")
+
+    view = memoryview(mapping)
+    typecodes: dict[str, Literal["B", "I", "Q"]] = {
+        "stamp": "B",
+        "str_offsets": "Q",
+        "str_blob": "B",
+        "node_table": "I",
+        "files": "I",
+        "by_symbol": "I",
+        "tests": "I",
+        "mask_offsets": "Q",
+        "mask_blob": "B",
+    }
+
+    sections: dict[str, memoryview] = {}
+    for name, offset, length in zip(SECTIONS, layout[0::2], layout[1::2], strict=True):
+        if offset + length > len(mapping):
+            raise ValueError(f"{path} is truncated")
+        sections[name] = view[offset : offset + length].cast(typecodes[name])
+
+    return MappedTestIndex(mapping, sections)
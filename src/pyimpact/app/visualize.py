@@ -1,13 +1,15 @@
 import tempfile
 import webbrowser
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from graphviz import Digraph
+if TYPE_CHECKING:
+    from graphviz import Source
 
 
-def visualize_svg(dot: Digraph) -> None:
+def visualize_svg(dot: "Source") -> None:
     """
-    Render a Graphviz Digraph to SVG and open it.
+    Render a Graphviz drawing to SVG and open it.
     """
     with tempfile.NamedTemporaryFile(delete=False, suffix=".svg") as f:
         svg_path = Path(f.name)
@@ -1,72 +1,777 @@
+import json
+import sys
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, TextIO
+
 import typer
 
-from pyimpact.app.impact import run_impact_analysis
-from pyimpact.app.colors import impact_colors
-from pyimpact.app.visualize import visualize_svg
-from pyimpact.query.subgraph import extract_subgraph
-from pyimpact.reporting.graphviz import render_svg
+from pyimpact.reporting.formats import FORMATS, LISTING_FORMATS
+
+# Everything else is imported inside the commands that use it: hooks run
+# the CLI constantly, and `--help` or a daemon query should not pay for
+# the parser, the process pool, the analyzer stack or Graphviz.
+# tests/unit/test_cli_startup.py holds startup to a budget.
+if TYPE_CHECKING:
+    from pyimpact.analyzer.cache import ParseCache
+    from pyimpact.analyzer.parser import ParseFailure, ParseOptions
+    from pyimpact.analyzer.scanner import ScanOptions
+    from pyimpact.app.result import BatchImpactResult, ImpactResult
+    from pyimpact.core.compact import CompactGraph
+    from pyimpact.core.model import DependencyGraph
 
 app = typer.Typer(
     help="pyimpact: dependency graph + impact analysis for Python codebases"
 )
 
+index_app = typer.Typer(help="Manage the binary graph snapshot in .pyimpact/index.bin.")
+app.add_typer(index_app, name="index")
 
-@app.command()
-def impact(function: str, path: Path = Path(".")):
+# Entry points in this group are called with the Metrics of every
+# --profile run, to export them to a monitoring system
+METRICS_HOOKS_GROUP = "pyimpact.metrics_hooks"
+
+CACHE_OPTION = typer.Option(
+    True,
+    "--cache/--no-cache",
+    help="Reuse parse results from <path>/.pyimpact/cache for unchanged files.",
+)
+
+JOBS_OPTION = typer.Option(
+    1,
+    "--jobs",
+    "-j",
+    help="Number of parser processes (0 = one per CPU).",
+)
+
+DAEMON_OPTION = typer.Option(
+    True,
+    "--daemon/--no-daemon",
+    help="Ask a running `pyimpact serve` for this project instead of re-analyzing.",
+)
+
+INDEX_OPTION = typer.Option(
+    True,
+    "--index/--no-index",
+    help="Query the snapshot from `pyimpact index build` when one exists (rebuilt if stale).",
+)
+
+
+INCLUDE_OPTION = typer.Option(
+    [],
+    "--include",
+    help="Glob of files to analyze, .gitignore syntax (repeatable; default '*.py').",
+)
+
+EXCLUDE_OPTION = typer.Option(
+    [],
+    "--exclude",
+    help="Glob of files or directories to skip, .gitignore syntax (repeatable).",
+)
+
+GITIGNORE_OPTION = typer.Option(
+    True,
+    "--gitignore/--no-gitignore",
+    help="Skip files matched by .gitignore.",
+)
+
+GIT_FILES_OPTION = typer.Option(
+    False,
+    "--git-files",
+    help="Take the file list from `git ls-files` instead of walking the tree.",
+)
+
+ROOT_OPTION = typer.Option(
+    [],
+    "--root",
+    help="Import root below <path> that module names start from (repeatable; default 'src').",
+)
+
+STRICT_OPTION = typer.Option(
+    False,
+    "--strict",
+    help="Abort on the first file that cannot be read or parsed instead of skipping it.",
+)
+
+MAX_FILE_SIZE_OPTION = typer.Option(
+    10.0,
+    "--max-file-size",
+    min=0,
+    help="Skip source files larger than this many MB (0 = no limit).",
+)
+
+PARSE_TIMEOUT_OPTION = typer.Option(
+    0.0,
+    "--parse-timeout",
+    min=0,
+    help="Skip files that take longer than this many seconds to parse (0 = no limit).",
+)
+
+FORMAT_OPTION = typer.Option(
+    None,
+    "--format",
+    help=f"Output format: {'|'.join(FORMATS)} (default: svg; json for batch queries).",
+)
+
+OUTPUT_OPTION = typer.Option(
+    None,
+    "--output",
+    "-o",
+    help="Write to this file instead of stdout (svg: instead of opening a browser).",
+)
+
+MAX_DEPTH_OPTION = typer.Option(
+    None,
+    "--max-depth",
+    min=1,
+    help="Only follow calls up to this many hops from the target.",
+)
+
+MAX_NODES_OPTION = typer.Option(
+    None,
+    "--max-nodes",
+    min=1,
+    help="Keep at most this many symbols per direction, nearest first.",
+)
+
+CHANGED_OPTION = typer.Option(
+    ...,
+    "--changed",
+    help="Changed .py file (repeatable), or a single git range BASE..HEAD / BASE.",
+)
+
+FUNCTIONS_OPTION = typer.Option(
+    [],
+    "--function",
+    "-f",
+    help="Target function; repeat for a batch query.",
+)
+
+BATCH_OPTION = typer.Option(
+    None,
+    help="File with one function name per line ('-' for stdin).",
+)
+
+PROFILE_OPTION = typer.Option(
+    False,
+    "--profile",
+    help="Print the time spent in each pipeline stage, and counters, on stderr.",
+)
+
+PROFILE_OUTPUT_OPTION = typer.Option(
+    None,
+    "--profile-output",
+    help="Also write a Chrome trace (*.json) or cProfile stats (any other name).",
+)
+
+
+def _load_metrics_hooks() -> None:
+    from importlib.metadata import entry_points
+
+    from pyimpact.core import metrics
+
+    for entry in entry_points(group=METRICS_HOOKS_GROUP):
+        metrics.add_hook(entry.load())
+
+
+def _start_profile(output: Optional[Path]) -> Callable[[], None]:
     """
-    Visualize full impact (callers + callees).
+    Record spans and counters (and run cProfile when `output` is not a
+    .json trace) until the returned function is called, which stops
+    recording and reports.
     """
-    graph, target, downstream, upstream = run_impact_analysis(function, path)
+    from contextlib import ExitStack
+
+    from pyimpact.core import metrics
+
+    _load_metrics_hooks()
+    stack = ExitStack()
+    recorded = stack.enter_context(metrics.recording())
+
+    profiler = None
+    if output is not None and output.suffix != ".json":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    def finish() -> None:
+        import time
 
-    nodes, edges = extract_subgraph(
-        graph=graph,
-        target=target,
-        upstream=upstream,
-        downstream=downstream,
+        from pyimpact.reporting.profile import chrome_trace, iter_breakdown
+
+        if profiler is not None:
+            profiler.disable()
+        wall = time.perf_counter() - recorded.started
+        stack.close()
+
+        for line in iter_breakdown(recorded, wall):
+            typer.echo(line, err=True)
+
+        if output is None:
+            return
+        if profiler is not None:
+            profiler.dump_stats(output)
+        else:
+            with output.open("w", encoding="utf-8") as f:
+                json.dump(chrome_trace(recorded), f)
+        typer.echo(f"Wrote profile to {output}", err=True)
+
+    return finish
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = PROFILE_OPTION,
+    profile_output: Optional[Path] = PROFILE_OUTPUT_OPTION,
+):
+    if profile or profile_output is not None:
+        ctx.call_on_close(_start_profile(profile_output))
+
+
+def _open_cache(path: Path, enabled: bool) -> Optional["ParseCache"]:
+    from pyimpact.analyzer.cache import ParseCache
+
+    return ParseCache.for_project(path) if enabled else None
+
+
+def _scan_options(
+    include: list[str],
+    exclude: list[str],
+    gitignore: bool,
+    git_files: bool,
+    roots: list[str],
+) -> "ScanOptions":
+    from pyimpact.analyzer.scanner import ScanOptions
+
+    return ScanOptions(
+        include=tuple(include) or ScanOptions.include,
+        exclude=tuple(exclude),
+        gitignore=gitignore,
+        git_files=git_files,
+        roots=tuple(roots),
     )
 
-    roles = impact_colors(target, upstream, downstream)
-    dot = render_svg(nodes, edges, roles)
-    visualize_svg(dot)
+
+def _parse_options(strict: bool, max_file_size: float, parse_timeout: float) -> "ParseOptions":
+    from pyimpact.analyzer.parser import ParseOptions
+
+    return ParseOptions(
+        tolerant=not strict,
+        max_bytes=int(max_file_size * 1_000_000) or None,
+        timeout=parse_timeout or None,
+    )
+
+
+def _warn_failures(failures: list["ParseFailure"]) -> None:
+    """
+    Report the files a tolerant run skipped, on stderr.
+    """
+    for failure in failures:
+        typer.echo(
+            f"warning: skipped {failure.path} ({failure.reason}): {failure.message}", err=True
+        )
+    if failures:
+        typer.echo(f"warning: {len(failures)} file(s) left out of the graph", err=True)
+
+
+def _analyze(
+    function: str,
+    path: Path,
+    daemon: bool,
+    load_graph: Callable[[], "DependencyGraph | CompactGraph"],
+    upstream: bool = True,
+    downstream: bool = True,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    subgraph: bool = True,
+    scan: Optional["ScanOptions"] = None,
+    parse: Optional["ParseOptions"] = None,
+) -> "ImpactResult":
+    """
+    Answer an impact query, in order of preference from:
+    a running daemon, the binary snapshot, a fresh analysis. A daemon
+    that fails or times out mid-query, or serves a graph built with
+    other `scan` and `parse` options, falls through to the local answer.
+
+    `load_graph` is only called when no daemon answers, so a daemon
+    query never imports the analyzer.
+    """
+    bounds: dict[str, Any] = {
+        "upstream": upstream,
+        "downstream": downstream,
+        "max_depth": max_depth,
+        "max_nodes": max_nodes,
+        "subgraph": subgraph,
+    }
+
+    if daemon:
+        from pyimpact.app.client import find_daemon, options_key
+
+        client = find_daemon(path)
+        if client is not None:
+            options = options_key(scan, parse) if scan is not None and parse is not None else None
+            try:
+                return client.impact(function, options=options, **bounds)
+            except OSError as exc:
+                typer.echo(f"note: not using the daemon ({exc}), analyzing locally", err=True)
+
+    from pyimpact.app.impact import analyze_impact, find_target
+
+    graph = load_graph()
+    return analyze_impact(graph, find_target(graph, function), **bounds)
+
+
+def _load_graph(
+    path: Path,
+    cache: bool,
+    jobs: int,
+    index: bool,
+    scan: Optional["ScanOptions"] = None,
+    parse: Optional["ParseOptions"] = None,
+) -> "DependencyGraph | CompactGraph":
+    """
+    The binary snapshot when there is one, otherwise a fresh build.
+
+    A snapshot built from other sources or options is rebuilt, so that
+    edits made after `pyimpact index build` are never ignored.
+    """
+    from pyimpact.app.build import build_project_graph
+    from pyimpact.app.index import build_index, index_path, load_index
+
+    snapshot = load_index(path, scan, parse) if index else None
+    if snapshot is not None:
+        return snapshot
+
+    failures: list[ParseFailure] = []
+    if index and index_path(path).is_file():
+        typer.echo(f"note: {index_path(path)} is out of date, rebuilding it", err=True)
+        _, graph = build_index(
+            path,
+            cache=_open_cache(path, cache),
+            jobs=jobs,
+            scan=scan,
+            parse=parse,
+            failures=failures,
+        )
+    else:
+        graph = build_project_graph(
+            path,
+            cache=_open_cache(path, cache),
+            jobs=jobs,
+            scan=scan,
+            parse=parse,
+            failures=failures,
+        )
+    _warn_failures(failures)
+    return graph
+
+
+def _read_names(batch: Path) -> list[str]:
+    """
+    Function names from a batch file ('-' for stdin), one per line.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    text = sys.stdin.read() if str(batch) == "-" else batch.read_text(encoding="utf-8")
+    names = (line.strip() for line in text.splitlines())
+    return [name for name in names if name and not name.startswith("#")]
+
+
+def _analyze_batch(
+    names: list[str],
+    path: Path,
+    cache: bool,
+    jobs: int,
+    index: bool,
+    scan: Optional["ScanOptions"] = None,
+    parse: Optional["ParseOptions"] = None,
+) -> "BatchImpactResult":
+    """
+    Build (or load) the graph once and answer every name against it.
+    """
+    from pyimpact.app.impact import batch_impact
+
+    return batch_impact(_load_graph(path, cache, jobs, index, scan, parse), names)
+
+
+def _check_format(format: Optional[str], default: str, allowed=FORMATS) -> str:
+    format = format or default
+    if format not in allowed:
+        raise typer.BadParameter(f"--format must be one of {', '.join(allowed)}, not {format!r}.")
+    return format
+
+
+@contextmanager
+def _open_output(output: Optional[Path]) -> Iterator[TextIO]:
+    if output is None:
+        yield sys.stdout
+    else:
+        with output.open("w", encoding="utf-8") as f:
+            yield f
+
+
+def _emit(
+    result: "ImpactResult",
+    format: str,
+    output: Optional[Path],
+    upstream: bool = True,
+    downstream: bool = True,
+) -> None:
+    """
+    Write a single-target result. Listing formats are streamed from the
+    distance maps; only svg loads graphviz.
+    """
+    from pyimpact.app.colors import impact_colors
+    from pyimpact.reporting.formats import impact_json, iter_ndjson, iter_text
+    from pyimpact.reporting.graphviz import RenderOptions, render_dot, render_svg
+
+    if format == "svg":
+        from pyimpact.app.visualize import visualize_svg
+        from pyimpact.core import metrics
+
+        roles = impact_colors(result.target, result.upstream, result.downstream)
+        options = RenderOptions.for_size(len(result.nodes))
+        dot = render_svg(result.nodes, result.edges, roles, options)
+        with metrics.span("graphviz"):
+            if output is None:
+                visualize_svg(dot)
+            else:
+                output.write_bytes(dot.pipe())
+        return
+
+    up = result.upstream if upstream else None
+    down = result.downstream if downstream else None
+
+    with _open_output(output) as out:
+        if format == "dot":
+            roles = impact_colors(result.target, result.upstream, result.downstream)
+            options = RenderOptions.for_size(len(result.nodes))
+            out.write(render_dot(result.nodes, result.edges, roles, options).source)
+        elif format == "json":
+            json.dump(impact_json(result.target, up, down), out)
+            out.write("\n")
+        else:
+            lines = iter_text if format == "text" else iter_ndjson
+            for line in lines(result.target, up, down):
+                out.write(line + "\n")
 
 
 @app.command()
-def callers(function: str, path: Path = Path(".")):
+def impact(
+    function: Optional[str] = typer.Argument(None),
+    path: Path = Path("."),
+    functions: list[str] = FUNCTIONS_OPTION,
+    batch: Optional[Path] = BATCH_OPTION,
+    cache: bool = CACHE_OPTION,
+    jobs: int = JOBS_OPTION,
+    daemon: bool = DAEMON_OPTION,
+    index: bool = INDEX_OPTION,
+    include: list[str] = INCLUDE_OPTION,
+    exclude: list[str] = EXCLUDE_OPTION,
+    gitignore: bool = GITIGNORE_OPTION,
+    git_files: bool = GIT_FILES_OPTION,
+    roots: list[str] = ROOT_OPTION,
+    strict: bool = STRICT_OPTION,
+    max_file_size: float = MAX_FILE_SIZE_OPTION,
+    parse_timeout: float = PARSE_TIMEOUT_OPTION,
+    max_depth: Optional[int] = MAX_DEPTH_OPTION,
+    max_nodes: Optional[int] = MAX_NODES_OPTION,
+    format: Optional[str] = FORMAT_OPTION,
+    output: Optional[Path] = OUTPUT_OPTION,
+):
     """
-    Visualize callers only.
+    Show full impact (callers + callees).
+
+    With --function or --batch, analyze all targets in one pass and
+    print JSON with the affected symbols and which targets reach them.
     """
-    graph, target, _, upstream = run_impact_analysis(function, path)
+    names = list(functions) + (_read_names(batch) if batch is not None else [])
+    scan = _scan_options(include, exclude, gitignore, git_files, roots)
+    parse = _parse_options(strict, max_file_size, parse_timeout)
 
-    nodes, edges = extract_subgraph(
-        graph=graph,
-        target=target,
-        upstream=upstream,
-        downstream=set(),
+    if not names:
+        if function is None:
+            raise typer.BadParameter("Give a FUNCTION, --function or --batch.")
+        format = _check_format(format, "svg")
+        result = _analyze(
+            function,
+            path,
+            daemon,
+            lambda: _load_graph(path, cache, jobs, index, scan, parse),
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+            subgraph=format not in LISTING_FORMATS,
+            scan=scan,
+            parse=parse,
+        )
+        _emit(result, format, output)
+        return
+
+    if max_depth is not None or max_nodes is not None:
+        raise typer.BadParameter("--max-depth/--max-nodes apply to single-target queries only.")
+
+    if function is not None:
+        names.insert(0, function)
+
+    _check_format(format, "json", allowed=("json",))
+
+    batch_result = _analyze_batch(names, path, cache, jobs, index, scan, parse)
+    with _open_output(output) as out:
+        json.dump(batch_result.to_json(), out)
+        out.write("\n")
+
+
+@app.command()
+def callers(
+    function: str,
+    path: Path = Path("."),
+    cache: bool = CACHE_OPTION,
+    jobs: int = JOBS_OPTION,
+    daemon: bool = DAEMON_OPTION,
+    index: bool = INDEX_OPTION,
+    include: list[str] = INCLUDE_OPTION,
+    exclude: list[str] = EXCLUDE_OPTION,
+    gitignore: bool = GITIGNORE_OPTION,
+    git_files: bool = GIT_FILES_OPTION,
+    roots: list[str] = ROOT_OPTION,
+    strict: bool = STRICT_OPTION,
+    max_file_size: float = MAX_FILE_SIZE_OPTION,
+    parse_timeout: float = PARSE_TIMEOUT_OPTION,
+    max_depth: Optional[int] = MAX_DEPTH_OPTION,
+    max_nodes: Optional[int] = MAX_NODES_OPTION,
+    format: Optional[str] = FORMAT_OPTION,
+    output: Optional[Path] = OUTPUT_OPTION,
+):
+    """
+    Show callers only.
+    """
+    format = _check_format(format, "svg")
+    scan = _scan_options(include, exclude, gitignore, git_files, roots)
+    parse = _parse_options(strict, max_file_size, parse_timeout)
+    result = _analyze(
+        function,
+        path,
+        daemon,
+        lambda: _load_graph(path, cache, jobs, index, scan, parse),
+        downstream=False,
+        max_depth=max_depth,
+        max_nodes=max_nodes,
+        subgraph=format not in LISTING_FORMATS,
+        scan=scan,
+        parse=parse,
     )
+    _emit(result, format, output, downstream=False)
 
-    roles = impact_colors(target, upstream, set())
-    dot = render_svg(nodes, edges, roles)
-    visualize_svg(dot)
+
+@app.command()
+def callees(
+    function: str,
+    path: Path = Path("."),
+    cache: bool = CACHE_OPTION,
+    jobs: int = JOBS_OPTION,
+    daemon: bool = DAEMON_OPTION,
+    index: bool = INDEX_OPTION,
+    include: list[str] = INCLUDE_OPTION,
+    exclude: list[str] = EXCLUDE_OPTION,
+    gitignore: bool = GITIGNORE_OPTION,
+    git_files: bool = GIT_FILES_OPTION,
+    roots: list[str] = ROOT_OPTION,
+    strict: bool = STRICT_OPTION,
+    max_file_size: float = MAX_FILE_SIZE_OPTION,
+    parse_timeout: float = PARSE_TIMEOUT_OPTION,
+    max_depth: Optional[int] = MAX_DEPTH_OPTION,
+    max_nodes: Optional[int] = MAX_NODES_OPTION,
+    format: Optional[str] = FORMAT_OPTION,
+    output: Optional[Path] = OUTPUT_OPTION,
+):
+    """
+    Show callees only.
+    """
+    format = _check_format(format, "svg")
+    scan = _scan_options(include, exclude, gitignore, git_files, roots)
+    parse = _parse_options(strict, max_file_size, parse_timeout)
+    result = _analyze(
+        function,
+        path,
+        daemon,
+        lambda: _load_graph(path, cache, jobs, index, scan, parse),
+        upstream=False,
+        max_depth=max_depth,
+        max_nodes=max_nodes,
+        subgraph=format not in LISTING_FORMATS,
+        scan=scan,
+        parse=parse,
+    )
+    _emit(result, format, output, upstream=False)
 
 
 @app.command()
-def callees(function: str, path: Path = Path(".")):
+def diff(
+    revisions: str = typer.Argument(
+        ..., help="BASE..HEAD, or BASE to compare against the working tree."
+    ),
+    path: Path = Path("."),
+    cache: bool = typer.Option(
+        True,
+        "--cache/--no-cache",
+        help="Reuse the resolved graph of the base commit from <path>/.pyimpact/diff.",
+    ),
+    strict: bool = STRICT_OPTION,
+    max_file_size: float = MAX_FILE_SIZE_OPTION,
+    parse_timeout: float = PARSE_TIMEOUT_OPTION,
+):
     """
-    Visualize callees only.
+    Print the functions a git diff touches and everything upstream, as JSON.
     """
-    graph, target, downstream, _ = run_impact_analysis(function, path)
+    from pyimpact.app.diff import BaseGraphCache, run_diff_analysis
 
-    nodes, edges = extract_subgraph(
-        graph=graph,
-        target=target,
-        upstream=set(),
-        downstream=downstream,
+    failures: list[ParseFailure] = []
+    result = run_diff_analysis(
+        path,
+        revisions,
+        cache=BaseGraphCache.for_project(path) if cache else None,
+        parse=_parse_options(strict, max_file_size, parse_timeout),
+        failures=failures,
     )
+    _warn_failures(failures)
+    typer.echo(json.dumps(result.to_json()))
+
 
-    roles = impact_colors(target, set(), downstream)
-    dot = render_svg(nodes, edges, roles)
-    visualize_svg(dot)
+@app.command()
+def tests(
+    changed: list[str] = CHANGED_OPTION,
+    path: Path = Path("."),
+    cache: bool = typer.Option(
+        True,
+        "--cache/--no-cache",
+        help="Reuse parse results, base graphs and the test index from <path>/.pyimpact.",
+    ),
+    jobs: int = JOBS_OPTION,
+    include: list[str] = INCLUDE_OPTION,
+    exclude: list[str] = EXCLUDE_OPTION,
+    gitignore: bool = GITIGNORE_OPTION,
+    git_files: bool = GIT_FILES_OPTION,
+    roots: list[str] = ROOT_OPTION,
+    strict: bool = STRICT_OPTION,
+    max_file_size: float = MAX_FILE_SIZE_OPTION,
+    parse_timeout: float = PARSE_TIMEOUT_OPTION,
+):
+    """
+    Print the pytest node IDs of the tests that reach the changed code.
+
+    A git range reads every tracked file of the base commit, so the scan
+    options and --jobs only apply to a list of changed files.
+    """
+    from pyimpact.app.diff import BaseGraphCache
+    from pyimpact.app.selection import (
+        TestIndexCache,
+        select_tests_for_diff,
+        select_tests_for_files,
+    )
+
+    index_cache = TestIndexCache.for_project(path) if cache else None
+    parse = _parse_options(strict, max_file_size, parse_timeout)
+    failures: list[ParseFailure] = []
+
+    if len(changed) == 1 and not changed[0].endswith(".py"):
+        if include or exclude or roots or jobs != 1:
+            raise typer.BadParameter(
+                "--include/--exclude/--root/--jobs apply to changed files only, not git ranges."
+            )
+        node_ids = select_tests_for_diff(
+            path,
+            changed[0],
+            cache=BaseGraphCache.for_project(path) if cache else None,
+            index_cache=index_cache,
+            parse=parse,
+            failures=failures,
+        )
+    else:
+        node_ids = select_tests_for_files(
+            path,
+            [Path(name) for name in changed],
+            cache=_open_cache(path, cache),
+            index_cache=index_cache,
+            jobs=jobs,
+            scan=_scan_options(include, exclude, gitignore, git_files, roots),
+            parse=parse,
+            failures=failures,
+        )
+    _warn_failures(failures)
+
+    for node_id in node_ids:
+        typer.echo(node_id)
+
+
+@index_app.command("build")
+def index_build(
+    path: Path = Path("."),
+    cache: bool = CACHE_OPTION,
+    jobs: int = JOBS_OPTION,
+    include: list[str] = INCLUDE_OPTION,
+    exclude: list[str] = EXCLUDE_OPTION,
+    gitignore: bool = GITIGNORE_OPTION,
+    git_files: bool = GIT_FILES_OPTION,
+    roots: list[str] = ROOT_OPTION,
+    strict: bool = STRICT_OPTION,
+    max_file_size: float = MAX_FILE_SIZE_OPTION,
+    parse_timeout: float = PARSE_TIMEOUT_OPTION,
+):
+    """
+    Build the graph once and save it for fast memory-mapped queries.
+    """
+    from pyimpact.app.index import build_index
+
+    failures: list[ParseFailure] = []
+    snapshot_path, graph = build_index(
+        path,
+        cache=_open_cache(path, cache),
+        jobs=jobs,
+        scan=_scan_options(include, exclude, gitignore, git_files, roots),
+        parse=_parse_options(strict, max_file_size, parse_timeout),
+        failures=failures,
+    )
+    _warn_failures(failures)
+    edge_count = sum(len(callees) for callees in graph.edges.values())
+    typer.echo(f"Wrote {snapshot_path} ({len(graph.nodes)} nodes, {edge_count} edges)")
+
+
+@app.command()
+def serve(
+    path: Path = Path("."),
+    port: int = typer.Option(0, help="TCP port on 127.0.0.1 (0 = pick a free one)."),
+    interval: float = typer.Option(1.0, help="Seconds between file-change polls."),
+    cache: bool = CACHE_OPTION,
+    jobs: int = JOBS_OPTION,
+    include: list[str] = INCLUDE_OPTION,
+    exclude: list[str] = EXCLUDE_OPTION,
+    gitignore: bool = GITIGNORE_OPTION,
+    git_files: bool = GIT_FILES_OPTION,
+    roots: list[str] = ROOT_OPTION,
+    strict: bool = STRICT_OPTION,
+    max_file_size: float = MAX_FILE_SIZE_OPTION,
+    parse_timeout: float = PARSE_TIMEOUT_OPTION,
+):
+    """
+    Keep the graph warm in memory and answer queries from other commands.
+    """
+    from pyimpact.app.daemon import serve as run_daemon
+
+    def ready(server) -> None:
+        _warn_failures(server.service.failures)
+        typer.echo(f"pyimpact daemon for {path.resolve()} on 127.0.0.1:{server.port}")
+
+    run_daemon(
+        path,
+        port=port,
+        interval=interval,
+        cache=_open_cache(path, cache),
+        jobs=jobs,
+        scan=_scan_options(include, exclude, gitignore, git_files, roots),
+        parse=_parse_options(strict, max_file_size, parse_timeout),
+        on_ready=ready,
+    )
 
 
 # @app.command()
@@ -0,0 +1,226 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Collection, Iterator, Mapping, Sequence
+from typing import Optional
+
+from .ids import SymbolId, name_key, short_name
+from .model import DependencyGraph, FunctionSymbol
+
+
+def _csr(
+    n_nodes: int,
+    adjacency: Sequence[Collection[int]],
+) -> tuple[array, array]:
+    """
+    Pack per-node neighbour lists into CSR (offsets, targets) arrays.
+    Row i's neighbours are targets[offsets[i]:offsets[i + 1]].
+    """
+    offsets = array("Q", [0]) * (n_nodes + 1)
+    targets = array("I")
+
+    for i, neighbours in enumerate(adjacency):
+        targets.extend(sorted(neighbours))
+        offsets[i + 1] = len(targets)
+
+    return offsets, targets
+
+
+class _NodesView(Mapping[SymbolId, FunctionSymbol]):
+    """
+    DependencyGraph.nodes-compatible view over a CompactGraph.
+    """
+
+    def __init__(self, graph: "CompactGraph") -> None:
+        self._graph = graph
+
+    def __getitem__(self, key: SymbolId) -> FunctionSymbol:
+        return self._graph.functions[self._graph.index[key]]
+
+    def __iter__(self) -> Iterator[SymbolId]:
+        graph = self._graph
+        return (graph.symbol(i) for i in range(len(graph)))
+
+    def __len__(self) -> int:
+        return len(self._graph.functions)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._graph.index
+
+
+class _AdjacencyView(Mapping[SymbolId, tuple[SymbolId, ...]]):
+    """
+    DependencyGraph.edges-compatible view over one CSR direction.
+    Neighbour tuples are materialized on access.
+    """
+
+    def __init__(self, graph: "CompactGraph", offsets: Sequence[int], targets: Sequence[int]):
+        self._graph = graph
+        self._offsets = offsets
+        self._targets = targets
+
+    def __getitem__(self, key: SymbolId) -> tuple[SymbolId, ...]:
+        graph = self._graph
+        i = graph.index[key]
+        return tuple(
+            graph.symbol(t) for t in self._targets[self._offsets[i] : self._offsets[i + 1]]
+        )
+
+    def __iter__(self) -> Iterator[SymbolId]:
+        return iter(self._graph.nodes)
+
+    def __len__(self) -> int:
+        return len(self._graph.functions)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._graph.index
+
+
+class CompactGraph:
+    """
+    Read-only, integer-indexed form of a resolved DependencyGraph.
+
+    Symbols are numbered 0..n-1; forward and reverse adjacency are stored
+    as CSR offset/target arrays (4 bytes per edge and direction) instead
+    of dicts of sets of SymbolId. Traversals run on plain ints.
+
+    `nodes`, `edges` and `reverse_edges` are read-only views with the same
+    shape as DependencyGraph's, so code written against DependencyGraph
+    (e.g. extract_subgraph) works unchanged.
+    """
+
+    def __init__(
+        self,
+        functions: Sequence[FunctionSymbol],
+        fwd_offsets: Sequence[int],
+        fwd_targets: Sequence[int],
+        rev_offsets: Sequence[int],
+        rev_targets: Sequence[int],
+    ) -> None:
+        self.functions = functions
+        self.fwd_offsets = fwd_offsets
+        self.fwd_targets = fwd_targets
+        self.rev_offsets = rev_offsets
+        self.rev_targets = rev_targets
+
+        self._index: Optional[Mapping[SymbolId, int]] = None
+        self._by_name: Optional[Sequence[int]] = None
+
+        self.nodes = _NodesView(self)
+        self.edges = _AdjacencyView(self, fwd_offsets, fwd_targets)
+        self.reverse_edges = _AdjacencyView(self, rev_offsets, rev_targets)
+
+    @classmethod
+    def from_graph(cls, graph: DependencyGraph) -> "CompactGraph":
+        """
+        Intern every node to an int id and pack both edge directions.
+        Edges to symbols that are not nodes of the graph are dropped.
+        """
+        functions = list(graph.nodes.values())
+        index = {fn.id: i for i, fn in enumerate(functions)}
+
+        forward: list[list[int]] = [[] for _ in functions]
+        reverse: list[list[int]] = [[] for _ in functions]
+
+        for caller, callees in graph.edges.items():
+            src = index.get(caller)
+            if src is None:
+                continue
+            for callee in callees:
+                dst = index.get(callee)
+                if dst is not None:
+                    forward[src].append(dst)
+                    reverse[dst].append(src)
+
+        fwd_offsets, fwd_targets = _csr(len(functions), forward)
+        rev_offsets, rev_targets = _csr(len(functions), reverse)
+
+        compact = cls(functions, fwd_offsets, fwd_targets, rev_offsets, rev_targets)
+        compact._index = index
+        return compact
+
+    # -------- Symbol table --------
+
+    @property
+    def index(self) -> Mapping[SymbolId, int]:
+        """SymbolId → int id, built on first use."""
+        if self._index is None:
+            self._index = {fn.id: i for i, fn in enumerate(self.functions)}
+        return self._index
+
+    def symbol(self, i: int) -> SymbolId:
+        return self.functions[i].id
+
+    def qualname(self, i: int) -> str:
+        return self.functions[i].id.qualname
+
+    @property
+    def by_name(self) -> Sequence[int]:
+        """
+        Ids sorted by short name, then qualname, built on first use.
+        """
+        if self._by_name is None:
+            self._by_name = array(
+                "I", sorted(range(len(self)), key=lambda i: name_key(self.qualname(i)))
+            )
+        return self._by_name
+
+    def find_name(self, name: str) -> list[int]:
+        """
+        Ids of all nodes whose qualname ends with the component `name`,
+        in O(log n).
+        """
+        order = self.by_name
+        lo = bisect_left(order, (name, ""), key=lambda i: name_key(self.qualname(i)))
+
+        matches = []
+        while lo < len(order) and short_name(self.qualname(order[lo])) == name:
+            matches.append(order[lo])
+            lo += 1
+        return matches
+
+    def find_qualname(self, qualname: str) -> list[int]:
+        """
+        Ids of all nodes with this qualname.
+        """
+        return [i for i in self.find_name(short_name(qualname)) if self.qualname(i) == qualname]
+
+    def __len__(self) -> int:
+        return len(self.functions)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.fwd_targets)
+
+    # -------- Traversal --------
+
+    def successors(self, i: int) -> Sequence[int]:
+        return self.fwd_targets[self.fwd_offsets[i] : self.fwd_offsets[i + 1]]
+
+    def predecessors(self, i: int) -> Sequence[int]:
+        return self.rev_targets[self.rev_offsets[i] : self.rev_offsets[i + 1]]
+
+    def reachable(self, start: int, forward: bool = True) -> list[int]:
+        """
+        Ids reachable from `start` in one or more steps (BFS order).
+        `start` itself is only included if it lies on a cycle.
+        """
+        if forward:
+            offsets, targets = self.fwd_offsets, self.fwd_targets
+        else:
+            offsets, targets = self.rev_offsets, self.rev_targets
+
+        visited = bytearray(len(self.functions))
+        order: list[int] = []
+        frontier = [start]
+
+        while frontier:
+            next_frontier: list[int] = []
+            for current in frontier:
+                for neighbour in targets[offsets[current] : offsets[current + 1]]:
+                    if not visited[neighbour]:
+                        visited[neighbour] = 1
+                        order.append(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        return order
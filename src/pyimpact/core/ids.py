@@ -14,3 +14,22 @@ class SymbolId:
 
     def __str__(self) -> str:
         return f"{self.language}:{self.module}:{self.qualname}"
+
+    @property
+    def full_name(self) -> str:
+        """Dotted module + qualname: "pkg.mod.Class.method"."""
+        return f"{self.module}.{self.qualname}" if self.module else self.qualname
+
+
+def short_name(qualname: str) -> str:
+    """
+    Last component of a qualname: "A.run" → "run".
+    """
+    return qualname.rpartition(".")[2]
+
+
+def name_key(qualname: str) -> tuple[str, str]:
+    """
+    Sort key that groups symbols by short name.
+    """
+    return short_name(qualname), qualname
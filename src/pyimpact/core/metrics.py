@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Span:
+    """
+    One timed stage: `start` is a time.perf_counter() reading, which is
+    comparable across processes on the same machine.
+    """
+    name: str
+    start: float
+    duration: float
+    pid: int
+    tid: int
+
+
+class Metrics:
+    """
+    Timing spans and counters of one run of the pipeline.
+
+    Instrumented code never holds a Metrics: it calls the module-level
+    `span` and `count`, which record into the Metrics made active by
+    `recording` and cost a context-variable lookup when nothing is.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+        self.counters: Counter[str] = Counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append(
+                Span(
+                    name,
+                    start,
+                    time.perf_counter() - start,
+                    os.getpid(),
+                    threading.get_native_id(),
+                )
+            )
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def absorb(self, other: "Metrics") -> None:
+        """
+        Add the spans and counters recorded elsewhere (e.g. in a worker
+        process) to this run.
+        """
+        self.spans.extend(other.spans)
+        self.counters.update(other.counters)
+
+    def totals(self) -> dict[str, tuple[float, int]]:
+        """
+        Total seconds and number of spans per stage, in order of first
+        appearance. Stages that ran in several processes at once add up
+        to more than the wall time.
+        """
+        totals: dict[str, tuple[float, int]] = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            seconds, calls = totals.get(span.name, (0.0, 0))
+            totals[span.name] = (seconds + span.duration, calls + 1)
+        return totals
+
+
+_current: ContextVar[Optional[Metrics]] = ContextVar("pyimpact_metrics", default=None)
+_hooks: list[Callable[[Metrics], None]] = []
+
+_NOTHING = nullcontext()
+
+
+def active() -> Optional[Metrics]:
+    """
+    The Metrics being recorded into, if any.
+    """
+    return _current.get()
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """
+    Time the enclosed block as stage `name` of the active recording.
+    """
+    metrics = _current.get()
+    return _NOTHING if metrics is None else metrics.span(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.counters[name] += n
+
+
+def timed(name: str, items: Iterable[T]) -> Iterator[T]:
+    """
+    Yield from `items`, timing each step of the iteration as stage
+    `name` (for generators that do their work lazily, like the scanner).
+    """
+    if _current.get() is None:
+        yield from items
+        return
+
+    iterator = iter(items)
+    while True:
+        with span(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def add_hook(hook: Callable[[Metrics], None]) -> None:
+    """
+    Call `hook` with the Metrics of every recording that finishes in
+    this process, e.g. to forward them to a monitoring system.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[Metrics], None]) -> None:
+    _hooks.remove(hook)
+
+
+@contextmanager
+def recording(metrics: Optional[Metrics] = None, publish: bool = True) -> Iterator[Metrics]:
+    """
+    Record the spans and counters of everything run inside the block
+    (in this thread) into `metrics`, a new Metrics by default. Hooks
+    are called when the block completes, unless `publish` is false.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+    if publish:
+        # A copy, so a hook can remove itself without skipping the next
+        for hook in list(_hooks):  # noqa: PERF101
+            hook(metrics)
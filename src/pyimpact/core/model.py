@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 
 from .ids import SymbolId
 
@@ -9,10 +9,12 @@ from .ids import SymbolId
 class CodeLocation:
     """
     Represents a precise location in a source file.
+    `end_line` is the last line of the construct, when known.
     """
     file_path: Path
     line: int
     column: int
+    end_line: Optional[int] = None
 
 
 @dataclass(frozen=True)
@@ -37,25 +39,250 @@ class CallSite:
     callee_name: str
     callee_id: Optional[SymbolId]
     location: CodeLocation
+    callee_qualifier: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ModuleImport:
+    """
+    An import binding in a module, with relative imports made absolute.
+
+    Examples (inside module "pkg.sub"):
+      import a.b as c         -> module="a.b", name=None, alias="c"
+      from . import x         -> module="pkg", name="x", alias=None
+      from .impl import y     -> module="pkg.impl", name="y", alias=None
+    """
+    module: str
+    name: Optional[str]
+    alias: Optional[str]
 
 
 @dataclass
 class DependencyGraph:
     """
     Directed graph representing symbol dependencies.
+
+    Besides the graph itself, it keeps per-module bookkeeping so that one
+    module's contribution can be swapped out without a full rebuild:
+    - module_symbols: module → symbols defined in it
+    - call_sites: module → its cross-module calls (resolved or not)
+    - call_targets: resolved call site → the symbol it resolved to, so
+      that a later re-resolution can retract the edge it added
     """
     nodes: Dict[SymbolId, FunctionSymbol] = field(default_factory=dict)
     edges: Dict[SymbolId, Set[SymbolId]] = field(default_factory=dict)
     reverse_edges: Dict[SymbolId, Set[SymbolId]] = field(default_factory=dict)
     unresolved_calls: list[CallSite] = field(default_factory=list)
+    imports: Dict[str, list[ModuleImport]] = field(default_factory=dict)
+    module_symbols: Dict[str, Set[SymbolId]] = field(default_factory=dict)
+    call_sites: Dict[str, list[CallSite]] = field(default_factory=dict)
+    call_targets: Dict[CallSite, SymbolId] = field(default_factory=dict)
 
     def add_node(self, symbol: FunctionSymbol) -> None:
         """Add a symbol to the graph."""
         self.nodes[symbol.id] = symbol
         self.edges.setdefault(symbol.id, set())
         self.reverse_edges.setdefault(symbol.id, set())
+        self.module_symbols.setdefault(symbol.module, set()).add(symbol.id)
 
     def add_edge(self, caller: SymbolId, callee: SymbolId) -> None:
         """Add a directed edge caller → callee."""
         self.edges.setdefault(caller, set()).add(callee)
         self.reverse_edges.setdefault(callee, set()).add(caller)
+
+    def remove_edge(self, caller: SymbolId, callee: SymbolId) -> None:
+        """Remove the edge caller → callee, if present."""
+        self.edges.get(caller, set()).discard(callee)
+        self.reverse_edges.get(callee, set()).discard(caller)
+
+    def merge(self, other: "DependencyGraph") -> None:
+        """Merge another graph (e.g. a single module) into this one."""
+        self.nodes.update(other.nodes)
+
+        for k, v in other.edges.items():
+            self.edges.setdefault(k, set()).update(v)
+
+        for k, v in other.reverse_edges.items():
+            self.reverse_edges.setdefault(k, set()).update(v)
+
+        self.unresolved_calls.extend(other.unresolved_calls)
+
+        for module, module_imports in other.imports.items():
+            self.imports.setdefault(module, []).extend(module_imports)
+
+        for module, symbols in other.module_symbols.items():
+            self.module_symbols.setdefault(module, set()).update(symbols)
+
+        for module, calls in other.call_sites.items():
+            self.call_sites.setdefault(module, []).extend(calls)
+
+        self.call_targets.update(other.call_targets)
+
+    def remove_module(self, module: str) -> Set[str]:
+        """
+        Remove everything a module contributed: its nodes, every edge into
+        or out of them, its call sites (with their targets) and its import
+        table.
+
+        Returns:
+            The other modules that had calls resolved into this one; their
+            call sites need to be re-resolved.
+        """
+        affected: Set[str] = set()
+
+        for symbol_id in self.module_symbols.pop(module, set()):
+            for callee in self.edges.pop(symbol_id, set()):
+                self.reverse_edges.get(callee, set()).discard(symbol_id)
+
+            for caller in self.reverse_edges.pop(symbol_id, set()):
+                self.edges.get(caller, set()).discard(symbol_id)
+                if caller.module != module:
+                    affected.add(caller.module)
+
+            self.nodes.pop(symbol_id, None)
+
+        calls = self.call_sites.pop(module, None)
+        if calls:
+            for call in calls:
+                self.call_targets.pop(call, None)
+            self.unresolved_calls[:] = [
+                call for call in self.unresolved_calls if call.caller_id.module != module
+            ]
+
+        self.imports.pop(module, None)
+
+        return affected
+
+    def replace_module(self, module: str, fragment: "DependencyGraph") -> Set[str]:
+        """
+        Swap a module's contribution for a freshly built single-module graph
+        (see GraphBuilder.build). An empty fragment removes the module.
+
+        Only the graph structure is updated; calls into and out of the
+        module still need resolving (see Resolver.replace_module).
+
+        Returns:
+            The other modules whose resolved calls pointed into the old
+            version of the module.
+        """
+        affected = self.remove_module(module)
+        self.merge(fragment)
+        return affected
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        The whole graph as plain lists, numbers and strings, for caches
+        that must not be able to run code when loaded. Symbols are
+        written once, in "nodes", and referred to by position elsewhere;
+        reverse edges and module_symbols are derived on load.
+        """
+        ids = {sid: i for i, sid in enumerate(self.nodes)}
+
+        def ref(sid: Optional[SymbolId]) -> Optional[int]:
+            return None if sid is None else ids[sid]
+
+        nodes = [
+            [
+                sid.language,
+                sid.module,
+                sid.qualname,
+                fn.name,
+                str(fn.location.file_path),
+                fn.location.line,
+                fn.location.column,
+                fn.location.end_line,
+                fn.is_async,
+                fn.class_name,
+            ]
+            for sid, fn in self.nodes.items()
+        ]
+
+        call_sites: Dict[str, List[list]] = {}
+        positions: Dict[int, List[Any]] = {}
+        for module, calls in self.call_sites.items():
+            rows = call_sites[module] = []
+            for i, call in enumerate(calls):
+                positions[id(call)] = [module, i]
+                rows.append(
+                    [
+                        ids[call.caller_id],
+                        call.callee_name,
+                        ref(call.callee_id),
+                        str(call.location.file_path),
+                        call.location.line,
+                        call.location.column,
+                        call.callee_qualifier,
+                        ref(self.call_targets.get(call)),
+                    ]
+                )
+
+        return {
+            "nodes": nodes,
+            "edges": [[ids[a], [ids[b] for b in callees]] for a, callees in self.edges.items()],
+            "imports": {
+                module: [[imp.module, imp.name, imp.alias] for imp in module_imports]
+                for module, module_imports in self.imports.items()
+            },
+            "call_sites": call_sites,
+            # Pending calls are the same objects as their call_sites entries
+            "unresolved": [positions[id(call)] for call in self.unresolved_calls],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "DependencyGraph":
+        """
+        Rebuild a graph written by to_json.
+
+        Raises:
+            LookupError, TypeError, ValueError: if `data` was not written
+                by to_json
+        """
+        graph = cls()
+        paths: Dict[str, Path] = {}
+
+        def path_of(value: str) -> Path:
+            path = paths.get(value)
+            if path is None:
+                path = paths[value] = Path(value)
+            return path
+
+        symbols: List[SymbolId] = []
+        for row in data["nodes"]:
+            language, module, qualname, name, file_path, line, column, end_line = row[:8]
+            is_async, class_name = row[8:]
+            sid = SymbolId(language=language, module=module, qualname=qualname)
+            symbols.append(sid)
+            graph.add_node(
+                FunctionSymbol(
+                    id=sid,
+                    name=name,
+                    module=module,
+                    location=CodeLocation(path_of(file_path), line, column, end_line),
+                    is_async=is_async,
+                    class_name=class_name,
+                )
+            )
+
+        for caller, callees in data["edges"]:
+            for callee in callees:
+                graph.add_edge(symbols[caller], symbols[callee])
+
+        for module, module_imports in data["imports"].items():
+            graph.imports[module] = [ModuleImport(*imp) for imp in module_imports]
+
+        for module, rows in data["call_sites"].items():
+            calls = graph.call_sites[module] = []
+            for caller, name, callee, file_path, line, column, qualifier, target in rows:
+                call = CallSite(
+                    caller_id=symbols[caller],
+                    callee_name=name,
+                    callee_id=None if callee is None else symbols[callee],
+                    location=CodeLocation(path_of(file_path), line, column),
+                    callee_qualifier=qualifier,
+                )
+                calls.append(call)
+                if target is not None:
+                    graph.call_targets[call] = symbols[target]
+
+        graph.unresolved_calls = [graph.call_sites[module][i] for module, i in data["unresolved"]]
+        return graph
@@ -0,0 +1,300 @@
+from array import array
+from collections.abc import Sequence
+
+from .compact import CompactGraph, _csr
+from .model import DependencyGraph
+
+# Number of interval labels per component; each is one more DFS at build
+# time and rules out more unreachable pairs without a search
+LABELS = 2
+
+
+def strongly_connected_components(
+    offsets: Sequence[int],
+    targets: Sequence[int],
+) -> tuple[array, int]:
+    """
+    Tarjan's algorithm over a CSR graph, with an explicit work stack so
+    deep call chains cannot hit the recursion limit.
+
+    Returns (component of each node, number of components). Components
+    are numbered in the order Tarjan completes them, which is a reverse
+    topological order of the condensed graph: every edge between two
+    components goes from a higher number to a lower one.
+    """
+    n = len(offsets) - 1
+    unvisited = -1
+
+    index = [unvisited] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    stack: list[int] = []
+    component = array("I", [0]) * n
+
+    counter = 0
+    n_components = 0
+
+    for root in range(n):
+        if index[root] != unvisited:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+
+        # (node, position of the next edge to follow)
+        work = [[root, offsets[root]]]
+
+        while work:
+            frame = work[-1]
+            v, pos = frame
+
+            if pos < offsets[v + 1]:
+                frame[1] = pos + 1
+                w = targets[pos]
+
+                if index[w] == unvisited:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append([w, offsets[w]])
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = n_components
+                    if w == v:
+                        break
+                n_components += 1
+
+    return component, n_components
+
+
+def interval_labels(
+    offsets: Sequence[int],
+    targets: Sequence[int],
+    n_labels: int = LABELS,
+) -> array:
+    """
+    Interval labels of a DAG whose edges all go from a higher node number
+    to a lower one, like the components of strongly_connected_components.
+
+    Each label comes from one DFS, visiting successors in a different
+    order each time: node v gets (low, post), its post-order rank and the
+    smallest rank below it. If u reaches v, v's interval lies inside u's
+    in every label, so pairs whose intervals are not nested are
+    unreachable without a search.
+
+    Returns uint32[n * 2 * n_labels]: (low, post) for each label, by node.
+    """
+    n = len(offsets) - 1
+    labels = array("I", [0]) * (n * 2 * n_labels)
+
+    for label in range(n_labels):
+        backwards = label % 2 == 1
+        visited = bytearray(n)
+        rank = 0
+
+        # Predecessors have higher numbers, so the highest unvisited node
+        # is always a root of what is left
+        for root in range(n - 1, -1, -1):
+            if visited[root]:
+                continue
+            visited[root] = 1
+
+            # (node, number of successors followed)
+            work = [[root, 0]]
+
+            while work:
+                frame = work[-1]
+                v, followed = frame
+                first, end = offsets[v], offsets[v + 1]
+
+                if first + followed < end:
+                    frame[1] = followed + 1
+                    w = targets[end - 1 - followed] if backwards else targets[first + followed]
+                    if not visited[w]:
+                        visited[w] = 1
+                        work.append([w, 0])
+                    continue
+
+                work.pop()
+                low = rank
+                for w in targets[first:end]:
+                    low = min(low, labels[(w * n_labels + label) * 2])
+                row = (v * n_labels + label) * 2
+                labels[row] = low
+                labels[row + 1] = rank
+                rank += 1
+
+    return labels
+
+
+class ReachabilityIndex:
+    """
+    Reachability over the condensation of a call graph.
+
+    Strongly connected components (recursion, mutual recursion) are
+    collapsed into the nodes of a DAG, so queries cross each recursive
+    cluster once instead of edge by edge. Every component also carries
+    LABELS interval labels (see interval_labels):
+
+    - reaches(a, b): the labels rule out most unreachable pairs in O(1);
+      other pairs search the DAG, skipping every component whose labels
+      show it cannot reach b
+    - descendants / ancestors: one walk over the condensed DAG
+
+    Memory is linear in the graph: a component per node, the DAG in CSR
+    form both ways and 2 * LABELS ints per component, all in flat arrays
+    that write_snapshot stores next to the graph.
+    """
+
+    def __init__(
+        self,
+        graph: CompactGraph,
+        component: Sequence[int],
+        member_offsets: Sequence[int],
+        members: Sequence[int],
+        down_offsets: Sequence[int],
+        down_targets: Sequence[int],
+        up_offsets: Sequence[int],
+        up_targets: Sequence[int],
+        cyclic: Sequence[int],
+        labels: Sequence[int],
+    ) -> None:
+        self.graph = graph
+        self.component = component
+        self.member_offsets = member_offsets
+        self.members = members
+        self.down_offsets = down_offsets
+        self.down_targets = down_targets
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.cyclic = cyclic
+        self.labels = labels
+        self._width = 2 * LABELS
+
+    @classmethod
+    def from_graph(cls, graph: DependencyGraph | CompactGraph) -> "ReachabilityIndex":
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_graph(graph)
+
+        component, n_components = strongly_connected_components(
+            graph.fwd_offsets, graph.fwd_targets
+        )
+
+        members: list[list[int]] = [[] for _ in range(n_components)]
+        for node in range(len(graph)):
+            members[component[node]].append(node)
+
+        # A component is cyclic if it has an internal edge: either more
+        # than one member or a function that calls itself
+        cyclic = bytearray(n_components)
+        down: list[set[int]] = [set() for _ in range(n_components)]
+        up: list[set[int]] = [set() for _ in range(n_components)]
+
+        for node in range(len(graph)):
+            c = component[node]
+            for neighbour in graph.successors(node):
+                d = component[neighbour]
+                if c == d:
+                    cyclic[c] = 1
+                else:
+                    down[c].add(d)
+                    up[d].add(c)
+
+        member_offsets, member_nodes = _csr(n_components, members)
+        down_offsets, down_targets = _csr(n_components, down)
+        up_offsets, up_targets = _csr(n_components, up)
+
+        return cls(
+            graph,
+            component,
+            member_offsets,
+            member_nodes,
+            down_offsets,
+            down_targets,
+            up_offsets,
+            up_targets,
+            cyclic,
+            interval_labels(down_offsets, down_targets),
+        )
+
+    def __len__(self) -> int:
+        """Number of strongly connected components."""
+        return len(self.cyclic)
+
+    def _may_reach(self, c: int, d: int) -> bool:
+        labels, width = self.labels, self._width
+        outer, inner = c * width, d * width
+        for i in range(0, width, 2):
+            if (
+                labels[inner + i] < labels[outer + i]
+                or labels[inner + i + 1] > labels[outer + i + 1]
+            ):
+                return False
+        return True
+
+    def reaches(self, source: int, target: int) -> bool:
+        """
+        True if `target` is reachable from `source` in one or more steps.
+        """
+        c, d = self.component[source], self.component[target]
+        if c == d:
+            return bool(self.cyclic[c])
+        if c < d or not self._may_reach(c, d):
+            return False
+
+        offsets, targets = self.down_offsets, self.down_targets
+        seen = {c}
+        stack = [c]
+        while stack:
+            x = stack.pop()
+            for y in targets[offsets[x] : offsets[x + 1]]:
+                if y == d:
+                    return True
+                # Components numbered below d come after it in
+                # topological order and cannot reach it
+                if y > d and y not in seen and self._may_reach(y, d):
+                    seen.add(y)
+                    stack.append(y)
+        return False
+
+    def _walk(self, node: int, offsets: Sequence[int], targets: Sequence[int]) -> list[int]:
+        c = self.component[node]
+        reached = [c] if self.cyclic[c] else []
+        seen = {c}
+        stack = [c]
+        while stack:
+            x = stack.pop()
+            for y in targets[offsets[x] : offsets[x + 1]]:
+                if y not in seen:
+                    seen.add(y)
+                    reached.append(y)
+                    stack.append(y)
+
+        member_offsets, members = self.member_offsets, self.members
+        return [m for x in reached for m in members[member_offsets[x] : member_offsets[x + 1]]]
+
+    def descendants(self, node: int) -> list[int]:
+        """
+        Nodes reachable from `node` (itself only if it lies on a cycle).
+        """
+        return self._walk(node, self.down_offsets, self.down_targets)
+
+    def ancestors(self, node: int) -> list[int]:
+        """
+        Nodes that reach `node` (itself only if it lies on a cycle).
+        """
+        return self._walk(node, self.up_offsets, self.up_targets)
@@ -0,0 +1,454 @@
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import BinaryIO, Literal, Optional, overload
+
+from .compact import CompactGraph
+from .ids import SymbolId
+from .model import CodeLocation, DependencyGraph, FunctionSymbol
+from .reachability import ReachabilityIndex
+
+# ------------------------------------------------------------------
+# File layout (little-endian, every section 8-byte aligned):
+#
+#   header        MAGIC, format, n_strings, n_nodes, n_edges,
+#                 then (offset, length) for each section below
+#   str_offsets   uint64[n_strings + 1]
+#   str_blob      utf-8 bytes
+#   node_table    uint32[n_nodes * NODE_FIELDS], one row per node
+#   fwd_offsets   uint64[n_nodes + 1]
+#   fwd_targets   uint32[n_edges]
+#   rev_offsets   uint64[n_nodes + 1]
+#   rev_targets   uint32[n_edges]
+#   by_name       uint32[n_nodes]  node ids sorted by (short name, qualname)
+#   source_key    utf-8 bytes      identity of the sources the graph was
+#                                  built from, opaque to this module
+#
+# then the ReachabilityIndex arrays, over its n_components components:
+#
+#   component       uint32[n_nodes]
+#   member_offsets  uint64[n_components + 1]
+#   members         uint32[n_nodes]
+#   down_offsets    uint64[n_components + 1]
+#   down_targets    uint32[n_condensed_edges]
+#   up_offsets      uint64[n_components + 1]
+#   up_targets      uint32[n_condensed_edges]
+#   cyclic          uint8[n_components]
+#   labels          uint32[n_components * 2 * LABELS]
+# ------------------------------------------------------------------
+
+MAGIC = b"PYIMPIDX"
+SNAPSHOT_FORMAT = 5
+
+SECTIONS = (
+    "str_offsets",
+    "str_blob",
+    "node_table",
+    "fwd_offsets",
+    "fwd_targets",
+    "rev_offsets",
+    "rev_targets",
+    "by_name",
+    "source_key",
+    "component",
+    "member_offsets",
+    "members",
+    "down_offsets",
+    "down_targets",
+    "up_offsets",
+    "up_targets",
+    "cyclic",
+    "labels",
+)
+
+_HEADER = struct.Struct("<8sIIQQ" + "QQ" * len(SECTIONS))
+
+# node_table columns
+NODE_FIELDS = 10
+(
+    _LANGUAGE,
+    _MODULE,
+    _QUALNAME,
+    _NAME,
+    _FILE,
+    _LINE,
+    _COLUMN,
+    _END_LINE,
+    _FLAGS,
+    _CLASS_NAME,
+) = range(NODE_FIELDS)
+
+# Stands for None in string and end_line columns
+_NO_STRING = _NO_VALUE = 0xFFFFFFFF
+_FLAG_ASYNC = 1
+
+
+class StringInterner:
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def __call__(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NO_STRING
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def encode(self) -> tuple[bytes, bytes]:
+        """
+        The str_offsets and str_blob sections for the interned strings.
+        """
+        blob = bytearray()
+        offsets = array("Q", [0])
+        for value in self.strings:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+        return offsets.tobytes(), bytes(blob)
+
+
+def node_row(fn: FunctionSymbol, intern: StringInterner) -> tuple[int, ...]:
+    """
+    One node_table row, read back by MappedFunctions.
+    """
+    location = fn.location
+    return (
+        intern(fn.id.language),
+        intern(fn.id.module),
+        intern(fn.id.qualname),
+        intern(fn.name),
+        intern(str(location.file_path)),
+        location.line,
+        location.column,
+        _NO_VALUE if location.end_line is None else location.end_line,
+        _FLAG_ASYNC if fn.is_async else 0,
+        intern(fn.class_name),
+    )
+
+
+def write_section(f: BinaryIO, data: bytes) -> tuple[int, int]:
+    padding = -f.tell() % 8
+    f.write(b"\0" * padding)
+    offset = f.tell()
+    f.write(data)
+    return offset, len(data)
+
+
+def write_sections(
+    path: Path,
+    header: struct.Struct,
+    fields: tuple,
+    sections: list[bytes],
+) -> None:
+    """
+    Write `header` (its `fields`, then the offset and length of every
+    section) and the 8-byte aligned sections, via a temporary file of
+    its own so readers never map a partial write, even with several
+    writers at once.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\0" * header.size)
+
+            layout: list[int] = []
+            for data in sections:
+                layout.extend(write_section(f, data))
+
+            f.seek(0)
+            f.write(header.pack(*fields, *layout))
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_snapshot(
+    graph: DependencyGraph | CompactGraph,
+    path: Path,
+    source_key: str = "",
+) -> None:
+    """
+    Write a resolved graph and its ReachabilityIndex as a versioned binary
+    snapshot.
+
+    `source_key` is stored as is and read back as MappedGraph.source_key,
+    so readers can tell whether the snapshot still matches the sources.
+    """
+    compact = graph if isinstance(graph, CompactGraph) else CompactGraph.from_graph(graph)
+    functions = compact.functions
+    reachability = ReachabilityIndex.from_graph(compact)
+
+    intern = StringInterner()
+    node_table = array("I")
+    for fn in functions:
+        node_table.extend(node_row(fn, intern))
+    str_offsets, blob = intern.encode()
+
+    sections = {
+        "str_offsets": str_offsets,
+        "str_blob": blob,
+        "node_table": node_table.tobytes(),
+        "fwd_offsets": array("Q", compact.fwd_offsets).tobytes(),
+        "fwd_targets": array("I", compact.fwd_targets).tobytes(),
+        "rev_offsets": array("Q", compact.rev_offsets).tobytes(),
+        "rev_targets": array("I", compact.rev_targets).tobytes(),
+        "by_name": array("I", compact.by_name).tobytes(),
+        "source_key": source_key.encode("utf-8"),
+        "component": array("I", reachability.component).tobytes(),
+        "member_offsets": array("Q", reachability.member_offsets).tobytes(),
+        "members": array("I", reachability.members).tobytes(),
+        "down_offsets": array("Q", reachability.down_offsets).tobytes(),
+        "down_targets": array("I", reachability.down_targets).tobytes(),
+        "up_offsets": array("Q", reachability.up_offsets).tobytes(),
+        "up_targets": array("I", reachability.up_targets).tobytes(),
+        "cyclic": bytes(reachability.cyclic),
+        "labels": array("I", reachability.labels).tobytes(),
+    }
+
+    write_sections(
+        path,
+        _HEADER,
+        (MAGIC, SNAPSHOT_FORMAT, len(intern.strings), len(functions), compact.edge_count),
+        [sections[name] for name in SECTIONS],
+    )
+
+
+class StringTable(Sequence[str]):
+    """
+    Strings decoded from the mapped blob on first access.
+    """
+
+    def __init__(self, offsets: memoryview, blob: memoryview) -> None:
+        self._offsets = offsets
+        self._blob = blob
+        self._decoded: dict[int, str] = {}
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+
+    def __getitem__(self, i: int | slice) -> str | list[str]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        value = self._decoded.get(i)
+        if value is None:
+            value = str(self._blob[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+            self._decoded[i] = value
+        return value
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+class MappedFunctions(Sequence[FunctionSymbol]):
+    """
+    FunctionSymbols materialized from the node table on first access.
+    """
+
+    def __init__(self, table: memoryview, strings: StringTable) -> None:
+        self._table = table
+        self._strings = strings
+        self._cache: dict[int, FunctionSymbol] = {}
+        self._ids: dict[int, SymbolId] = {}
+        # Reverse of _ids: every SymbolId handed out maps back to its row
+        # without a search
+        self.positions: dict[SymbolId, int] = {}
+
+    def symbol_id(self, i: int) -> SymbolId:
+        sid = self._ids.get(i)
+        if sid is not None:
+            return sid
+
+        row = i * NODE_FIELDS
+        table, strings = self._table, self._strings
+        sid = SymbolId(
+            language=strings[table[row + _LANGUAGE]],
+            module=strings[table[row + _MODULE]],
+            qualname=strings[table[row + _QUALNAME]],
+        )
+        self._ids[i] = sid
+        self.positions[sid] = i
+        return sid
+
+    def qualname(self, i: int) -> str:
+        return self._strings[self._table[i * NODE_FIELDS + _QUALNAME]]
+
+    @overload
+    def __getitem__(self, i: int) -> FunctionSymbol: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[FunctionSymbol]: ...
+
+    def __getitem__(self, i: int | slice) -> FunctionSymbol | list[FunctionSymbol]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        fn = self._cache.get(i)
+        if fn is not None:
+            return fn
+
+        row = i * NODE_FIELDS
+        table, strings = self._table, self._strings
+        class_name = table[row + _CLASS_NAME]
+        end_line = table[row + _END_LINE]
+
+        fn = FunctionSymbol(
+            id=self.symbol_id(i),
+            name=strings[table[row + _NAME]],
+            module=strings[table[row + _MODULE]],
+            location=CodeLocation(
+                file_path=Path(strings[table[row + _FILE]]),
+                line=table[row + _LINE],
+                column=table[row + _COLUMN],
+                end_line=None if end_line == _NO_VALUE else end_line,
+            ),
+            is_async=bool(table[row + _FLAGS] & _FLAG_ASYNC),
+            class_name=None if class_name == _NO_STRING else strings[class_name],
+        )
+        self._cache[i] = fn
+        return fn
+
+    def __len__(self) -> int:
+        return len(self._table) // NODE_FIELDS
+
+
+class _QualnameIndex(Mapping[SymbolId, int]):
+    """
+    SymbolId → int id via binary search over the name-sorted
+    permutation, so no dict over all symbols is ever built.
+
+    Symbols the graph has already produced (the results of a traversal,
+    looked up again by extract_subgraph) are found directly: a search
+    visits every node sharing the short name, and names like `__init__`
+    or `run` can have thousands.
+    """
+
+    def __init__(self, graph: "MappedGraph") -> None:
+        self._graph = graph
+
+    def __getitem__(self, key: SymbolId) -> int:
+        functions = self._graph.functions
+        i = functions.positions.get(key)
+        if i is not None:
+            return i
+        for i in self._graph.find_qualname(key.qualname):
+            if functions.symbol_id(i) == key:
+                return i
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[SymbolId]:
+        functions = self._graph.functions
+        return (functions.symbol_id(i) for i in range(len(functions)))
+
+    def __len__(self) -> int:
+        return len(self._graph.functions)
+
+
+class MappedGraph(CompactGraph):
+    """
+    CompactGraph backed by a memory-mapped snapshot file.
+
+    Adjacency arrays and the ReachabilityIndex are zero-copy views into
+    the mapping; strings and FunctionSymbols are only decoded for the
+    nodes a query touches.
+    """
+
+    functions: MappedFunctions
+
+    def __init__(self, mapping: mmap.mmap, sections: dict[str, memoryview]) -> None:
+        strings = StringTable(sections["str_offsets"], sections["str_blob"])
+
+        super().__init__(
+            functions=MappedFunctions(sections["node_table"], strings),
+            fwd_offsets=sections["fwd_offsets"],
+            fwd_targets=sections["fwd_targets"],
+            rev_offsets=sections["rev_offsets"],
+            rev_targets=sections["rev_targets"],
+        )
+
+        self._mapping = mapping
+        self._by_name = sections["by_name"]
+        self._index = _QualnameIndex(self)
+        self.source_key = str(sections["source_key"], "utf-8")
+        self.reachability = ReachabilityIndex(
+            self,
+            sections["component"],
+            sections["member_offsets"],
+            sections["members"],
+            sections["down_offsets"],
+            sections["down_targets"],
+            sections["up_offsets"],
+            sections["up_targets"],
+            sections["cyclic"],
+            sections["labels"],
+        )
+
+    def symbol(self, i: int) -> SymbolId:
+        return self.functions.symbol_id(i)
+
+    def qualname(self, i: int) -> str:
+        return self.functions.qualname(i)
+
+
+def load_snapshot(path: Path) -> MappedGraph:
+    """
+    Memory-map a snapshot written by write_snapshot.
+
+    Raises:
+        ValueError: if the file is not a snapshot or has another format
+    """
+    with path.open("rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapping) < _HEADER.size:
+        raise ValueError(f"{path} is not a pyimpact snapshot")
+
+    magic, version, _n_strings, _n_nodes, _n_edges, *layout = _HEADER.unpack_from(mapping)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a pyimpact snapshot")
+    if version != SNAPSHOT_FORMAT:
+        raise ValueError(
+            f"{path} has snapshot format {version}, expected {SNAPSHOT_FORMAT}; "
+            f"rebuild it with `pyimpact index build`"
+        )
+
+    view = memoryview(mapping)
+    typecodes: dict[str, Literal["B", "I", "Q"]] = {
+        "str_offsets": "Q",
+        "str_blob": "B",
+        "node_table": "I",
+        "fwd_offsets": "Q",
+        "fwd_targets": "I",
+        "rev_offsets": "Q",
+        "rev_targets": "I",
+        "by_name": "I",
+        "source_key": "B",
+        "component": "I",
+        "member_offsets": "Q",
+        "members": "I",
+        "down_offsets": "Q",
+        "down_targets": "I",
+        "up_offsets": "Q",
+        "up_targets": "I",
+        "cyclic": "B",
+        "labels": "I",
+    }
+
+    sections: dict[str, memoryview] = {}
+    for name, offset, length in zip(SECTIONS, layout[0::2], layout[1::2]):
+        sections[name] = view[offset : offset + length].cast(typecodes[name])
+
+    return MappedGraph(mapping, sections)
@@ -1,23 +1,249 @@
 from collections import deque
-from typing import Set
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, Dict, Optional, Set, TypeVar
 
+from pyimpact.core.compact import CompactGraph
 from pyimpact.core.ids import SymbolId
 from pyimpact.core.model import DependencyGraph
+from pyimpact.core.reachability import ReachabilityIndex
+from pyimpact.core.snapshot import MappedGraph
+
+N = TypeVar("N", bound=Hashable)
+
+
+def bounded_distances(
+    start: N,
+    neighbours: Callable[[N], Iterable[N]],
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    stop: Optional[Callable[[N], bool]] = None,
+    order: Optional[Callable[[N], Any]] = None,
+) -> Dict[N, int]:
+    """
+    Level-by-level BFS from `start`, returning node → hop count.
+
+    The walk ends as soon as any bound is hit, so the cost follows the
+    size of the answer rather than of the whole reachable set:
+    - max_depth: do not expand beyond this many hops
+    - max_nodes: keep only the nearest `max_nodes` nodes; ties on the
+      last level are broken by `order` so the result is deterministic
+      (without one, the nodes found last are dropped)
+    - stop: finish the current level, then stop, once a node matching
+      this predicate has been reached
+
+    Like a full traversal, `start` itself is only included if it lies
+    on a cycle.
+    """
+    distances: Dict[N, int] = {}
+    frontier = [start]
+    depth = 0
+
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        level: list[N] = []
+
+        for current in frontier:
+            for neighbour in neighbours(current):
+                if neighbour not in distances:
+                    distances[neighbour] = depth
+                    level.append(neighbour)
+
+        if max_nodes is not None and len(distances) >= max_nodes:
+            overflow = len(distances) - max_nodes
+            if overflow:
+                if order is not None:
+                    level.sort(key=order)
+                for node in level[len(level) - overflow :]:
+                    del distances[node]
+            break
+
+        if stop is not None and any(stop(node) for node in level):
+            break
+
+        frontier = level
+
+    return distances
+
+
+def _symbol_order(sid: SymbolId) -> tuple[str, str, str]:
+    return sid.language, sid.module, sid.qualname
+
+
+def propagate_sources(
+    sources: list[N],
+    neighbours: Callable[[N], Iterable[N]],
+) -> Dict[N, int]:
+    """
+    Multi-source BFS that tracks which sources reach each node.
+
+    Returns node → bitmask, where bit k is set if sources[k] reaches the
+    node in one or more steps. A node is re-expanded only with the bits
+    it has not forwarded yet, so overlapping impact cones are walked once
+    instead of once per source.
+    """
+    reached: Dict[N, int] = {}
+    pending: Dict[N, int] = {}
+    queue: deque[N] = deque()
+
+    for bit, source in enumerate(sources):
+        if source not in pending:
+            queue.append(source)
+        pending[source] = pending.get(source, 0) | (1 << bit)
+
+    while queue:
+        current = queue.popleft()
+        mask = pending.pop(current)
+
+        for neighbour in neighbours(current):
+            seen = reached.get(neighbour, 0)
+            new = mask & ~seen
+            if not new:
+                continue
+            reached[neighbour] = seen | new
+            if neighbour in pending:
+                pending[neighbour] |= new
+            else:
+                pending[neighbour] = new
+                queue.append(neighbour)
+
+    return reached
 
 
 class ImpactAnalyzer:
     """
     Provides impact analysis queries over a dependency graph.
+
+    Works on a DependencyGraph or, for large repos, on a CompactGraph,
+    where traversal runs over int ids and CSR arrays.
+
+    With a ReachabilityIndex built from the same graph (a mapped
+    snapshot brings its own), `affects` and unbounded upstream/downstream
+    sets walk the condensed DAG instead of every edge.
     """
 
-    def __init__(self, graph: DependencyGraph) -> None:
+    def __init__(
+        self,
+        graph: DependencyGraph | CompactGraph,
+        reachability: Optional[ReachabilityIndex] = None,
+    ) -> None:
+        if reachability is None and isinstance(graph, MappedGraph):
+            reachability = graph.reachability
         self.graph = graph
+        self.reachability = reachability
+
+    @staticmethod
+    def _indexed(index: ReachabilityIndex, symbol_id: SymbolId, forward: bool) -> Set[SymbolId]:
+        node = index.graph.index.get(symbol_id)
+        if node is None:
+            return set()
+        found = index.descendants(node) if forward else index.ancestors(node)
+        return {index.graph.symbol(i) for i in found}
 
-    def downstream(self, symbol_id: SymbolId) -> Set[SymbolId]:
+    def affects(self, source: SymbolId, target: SymbolId) -> bool:
+        """
+        True if `target` is downstream of `source`, i.e. breaking
+        `source` can affect `target`.
+        """
+        if self.reachability is not None:
+            index = self.reachability.graph.index
+            if source not in index or target not in index:
+                return False
+            return self.reachability.reaches(index[source], index[target])
+
+        reached = self.downstream_distances(source, stop=lambda sid: sid == target)
+        return target in reached
+
+    @staticmethod
+    def _compact_reachable(graph: CompactGraph, symbol_id: SymbolId, forward: bool) -> Set[SymbolId]:
+        start = graph.index.get(symbol_id)
+        if start is None:
+            return set()
+        return {graph.symbol(i) for i in graph.reachable(start, forward=forward)}
+
+    def _distances(
+        self,
+        symbol_id: SymbolId,
+        forward: bool,
+        max_depth: Optional[int],
+        max_nodes: Optional[int],
+        stop: Optional[Callable[[SymbolId], bool]],
+    ) -> Dict[SymbolId, int]:
+        graph = self.graph
+
+        if isinstance(graph, CompactGraph):
+            start = graph.index.get(symbol_id)
+            if start is None:
+                return {}
+            offsets, targets = (
+                (graph.fwd_offsets, graph.fwd_targets)
+                if forward
+                else (graph.rev_offsets, graph.rev_targets)
+            )
+            found = bounded_distances(
+                start,
+                lambda i: targets[offsets[i] : offsets[i + 1]],
+                max_depth=max_depth,
+                max_nodes=max_nodes,
+                stop=(lambda i: stop(graph.symbol(i))) if stop is not None else None,
+                order=lambda i: _symbol_order(graph.symbol(i)),
+            )
+            return {graph.symbol(i): hops for i, hops in found.items()}
+
+        adjacency = graph.edges if forward else graph.reverse_edges
+        return bounded_distances(
+            symbol_id,
+            lambda sid: adjacency.get(sid, ()),
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+            stop=stop,
+            order=_symbol_order,
+        )
+
+    def downstream_distances(
+        self,
+        symbol_id: SymbolId,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        stop: Optional[Callable[[SymbolId], bool]] = None,
+    ) -> Dict[SymbolId, int]:
+        """
+        Downstream symbols with their distance (in calls) from `symbol_id`,
+        optionally bounded; see bounded_distances.
+        """
+        return self._distances(symbol_id, True, max_depth, max_nodes, stop)
+
+    def upstream_distances(
+        self,
+        symbol_id: SymbolId,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        stop: Optional[Callable[[SymbolId], bool]] = None,
+    ) -> Dict[SymbolId, int]:
+        """
+        Upstream symbols with their distance (in calls) to `symbol_id`,
+        optionally bounded; see bounded_distances.
+        """
+        return self._distances(symbol_id, False, max_depth, max_nodes, stop)
+
+    def downstream(
+        self,
+        symbol_id: SymbolId,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Set[SymbolId]:
         """
         Find all symbols that are affected if `symbol_id` breaks.
         (Traverse caller → callee)
         """
+        if max_depth is not None or max_nodes is not None:
+            return set(self.downstream_distances(symbol_id, max_depth, max_nodes))
+
+        if self.reachability is not None:
+            return self._indexed(self.reachability, symbol_id, forward=True)
+
+        if isinstance(self.graph, CompactGraph):
+            return self._compact_reachable(self.graph, symbol_id, forward=True)
+
         visited: Set[SymbolId] = set()
         queue = deque([symbol_id])
 
@@ -31,11 +257,25 @@ class ImpactAnalyzer:
 
         return visited
 
-    def upstream(self, symbol_id: SymbolId) -> Set[SymbolId]:
+    def upstream(
+        self,
+        symbol_id: SymbolId,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Set[SymbolId]:
         """
         Find all symbols that can affect `symbol_id`.
         (Traverse callee → caller)
         """
+        if max_depth is not None or max_nodes is not None:
+            return set(self.upstream_distances(symbol_id, max_depth, max_nodes))
+
+        if self.reachability is not None:
+            return self._indexed(self.reachability, symbol_id, forward=False)
+
+        if isinstance(self.graph, CompactGraph):
+            return self._compact_reachable(self.graph, symbol_id, forward=False)
+
         visited: Set[SymbolId] = set()
         queue = deque([symbol_id])
 
@@ -48,3 +288,54 @@ class ImpactAnalyzer:
                     queue.append(neighbor)
 
         return visited
+
+    def _attribute(
+        self,
+        targets: Iterable[SymbolId],
+        forward: bool,
+    ) -> Dict[SymbolId, Set[SymbolId]]:
+        sources = list(dict.fromkeys(targets))
+        graph = self.graph
+
+        if isinstance(graph, CompactGraph):
+            known = [sid for sid in sources if sid in graph.index]
+            offsets, edges = (
+                (graph.fwd_offsets, graph.fwd_targets)
+                if forward
+                else (graph.rev_offsets, graph.rev_targets)
+            )
+            masks = propagate_sources(
+                [graph.index[sid] for sid in known],
+                lambda i: edges[offsets[i] : offsets[i + 1]],
+            )
+            reached: Iterable[tuple[SymbolId, int]] = (
+                (graph.symbol(i), mask) for i, mask in masks.items()
+            )
+        else:
+            known = sources
+            adjacency = graph.edges if forward else graph.reverse_edges
+            reached = propagate_sources(known, lambda sid: adjacency.get(sid, ())).items()
+
+        attribution: Dict[SymbolId, Set[SymbolId]] = {}
+        for sid, mask in reached:
+            attribution[sid] = {known[bit] for bit in range(mask.bit_length()) if mask >> bit & 1}
+
+        return attribution
+
+    def downstream_many(self, targets: Iterable[SymbolId]) -> Dict[SymbolId, Set[SymbolId]]:
+        """
+        Downstream impact of several targets in one traversal.
+
+        Returns affected symbol → the targets it is reached from. The keys
+        are the union of `downstream(t)` over all targets.
+        """
+        return self._attribute(targets, forward=True)
+
+    def upstream_many(self, targets: Iterable[SymbolId]) -> Dict[SymbolId, Set[SymbolId]]:
+        """
+        Upstream impact of several targets in one traversal.
+
+        Returns affecting symbol → the targets it reaches. The keys are the
+        union of `upstream(t)` over all targets.
+        """
+        return self._attribute(targets, forward=False)
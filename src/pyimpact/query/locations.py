@@ -0,0 +1,83 @@
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable
+
+from pyimpact.core.model import FunctionSymbol
+
+
+class LocationIndex:
+    """
+    Maps source line ranges back to the functions that contain them.
+
+    Spans (location.line → location.end_line) are kept per file, sorted
+    by start line, together with a running maximum of end lines. A query
+    bisects on the start lines and walks backwards only while an earlier
+    span can still reach the range, so nested and overlapping functions
+    are handled without scanning the whole file.
+    """
+
+    def __init__(self, functions: Iterable[FunctionSymbol]) -> None:
+        by_file: dict[Path, list[FunctionSymbol]] = {}
+        for fn in functions:
+            by_file.setdefault(fn.location.file_path, []).append(fn)
+
+        self._spans: dict[Path, list[tuple[int, int, FunctionSymbol]]] = {}
+        self._starts: dict[Path, list[int]] = {}
+        self._max_ends: dict[Path, list[int]] = {}
+
+        for file_path, file_functions in by_file.items():
+            self._add_file(file_path, file_functions)
+
+    def _add_file(self, file_path: Path, functions: list[FunctionSymbol]) -> None:
+        file_spans: list[tuple[int, int, FunctionSymbol]] = []
+        for fn in functions:
+            location = fn.location
+            end = location.end_line if location.end_line is not None else location.line
+            file_spans.append((location.line, end, fn))
+        file_spans.sort(key=lambda span: (span[0], span[1]))
+
+        max_ends: list[int] = []
+        reach = 0
+        for _, end, _ in file_spans:
+            reach = max(reach, end)
+            max_ends.append(reach)
+
+        self._spans[file_path] = file_spans
+        self._starts[file_path] = [start for start, _, _ in file_spans]
+        self._max_ends[file_path] = max_ends
+
+    def files(self) -> list[Path]:
+        """
+        Every file with at least one function.
+        """
+        return list(self._spans)
+
+    def in_file(self, file_path: Path) -> list[FunctionSymbol]:
+        """
+        All functions defined in `file_path`, ordered by start line.
+        """
+        return [fn for _, _, fn in self._spans.get(file_path, ())]
+
+    def overlapping(self, file_path: Path, start: int, end: int) -> list[FunctionSymbol]:
+        """
+        Functions in `file_path` whose span shares a line with start..end
+        (inclusive), ordered by start line.
+        """
+        spans = self._spans.get(file_path)
+        if not spans:
+            return []
+
+        max_ends = self._max_ends[file_path]
+        i = bisect_right(self._starts[file_path], end)
+
+        found: list[FunctionSymbol] = []
+        while i > 0:
+            i -= 1
+            if max_ends[i] < start:
+                break
+            _, span_end, fn = spans[i]
+            if span_end >= start:
+                found.append(fn)
+
+        found.reverse()
+        return found
@@ -0,0 +1,90 @@
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+from difflib import get_close_matches
+from typing import Any, Generic, TypeVar
+
+from pyimpact.core.compact import CompactGraph
+from pyimpact.core.ids import SymbolId, name_key, short_name
+from pyimpact.core.model import DependencyGraph
+
+T = TypeVar("T")
+
+# Sorted neighbours considered on each side of a fuzzy query
+FUZZY_WINDOW = 32
+
+
+class SymbolLookup(Generic[T]):
+    """
+    Finds symbols by the names users type.
+
+    Tiers, the first one with a hit wins:
+      exact   "pkg.mod.Class.method" (module + qualname) or "Class.method"
+      suffix  any dotted tail of module + qualname: "method", "mod.Class.method"
+
+    Every query starts from the symbols that share its last component,
+    found by binary search over the symbols sorted by short name (the
+    graph's own `by_name` order for compact and mapped graphs), so a
+    lookup never scans all nodes. `suggest` proposes close spellings from
+    the neighbourhood of the query in that same order.
+    """
+
+    def __init__(
+        self,
+        order: Sequence[T],
+        qualname: Callable[[T], str],
+        symbol: Callable[[T], SymbolId],
+    ) -> None:
+        self._order = order
+        self._qualname = qualname
+        self._symbol = symbol
+
+    @staticmethod
+    def for_graph(graph: DependencyGraph | CompactGraph) -> "SymbolLookup[Any]":
+        if isinstance(graph, CompactGraph):
+            return SymbolLookup[int](graph.by_name, graph.qualname, graph.symbol)
+
+        order = sorted(graph.nodes, key=lambda sid: name_key(sid.qualname))
+        return SymbolLookup[SymbolId](order, lambda sid: sid.qualname, lambda sid: sid)
+
+    def _key(self, item: T) -> tuple[str, str]:
+        return name_key(self._qualname(item))
+
+    def _named(self, name: str) -> list[SymbolId]:
+        order = self._order
+        lo = bisect_left(order, (name, ""), key=self._key)
+
+        found = []
+        while lo < len(order) and short_name(self._qualname(order[lo])) == name:
+            found.append(self._symbol(order[lo]))
+            lo += 1
+        return found
+
+    def find(self, name: str) -> list[SymbolId]:
+        """
+        Symbols matching `name` in the first tier that has any.
+        """
+        candidates = self._named(short_name(name))
+
+        exact = [sid for sid in candidates if sid.full_name == name or sid.qualname == name]
+        if exact:
+            return exact
+
+        tail = "." + name
+        return [sid for sid in candidates if sid.full_name.endswith(tail)]
+
+    def suggest(self, name: str, limit: int = 5) -> list[str]:
+        """
+        Full names of symbols whose short name is spelled like `name`'s.
+        """
+        order = self._order
+        wanted = short_name(name)
+
+        nearby: set[str] = set()
+        for probe in (wanted, wanted[:2]):
+            at = bisect_left(order, (probe, ""), key=self._key)
+            for item in order[max(0, at - FUZZY_WINDOW) : at + FUZZY_WINDOW]:
+                nearby.add(short_name(self._qualname(item)))
+
+        close = get_close_matches(wanted, sorted(nearby), n=limit)
+        names = [sid.full_name for match in close for sid in self._named(match)]
+        return names[:limit]
@@ -1,27 +1,44 @@
+from collections.abc import Collection
 from typing import Set
 
+from pyimpact.core.compact import CompactGraph
 from pyimpact.core.ids import SymbolId
 from pyimpact.core.model import DependencyGraph
 
 
 def extract_subgraph(
-    graph: DependencyGraph,
+    graph: DependencyGraph | CompactGraph,
     target: SymbolId,
-    upstream: Set[SymbolId],
-    downstream: Set[SymbolId],
+    upstream: Collection[SymbolId],
+    downstream: Collection[SymbolId],
 ) -> tuple[
     Set[SymbolId],
     Set[tuple[SymbolId, SymbolId]],
 ]:
     """
     Extract a focused subgraph for visualization.
+
+    Only the outgoing edges of the selected nodes are visited, so the
+    cost follows the size of the subgraph, not of the whole graph.
     """
-    nodes = upstream | downstream | {target}
+    nodes = {target, *upstream, *downstream}
     edges: Set[tuple[SymbolId, SymbolId]] = set()
 
-    for caller, callees in graph.edges.items():
-        for callee in callees:
-            if caller in nodes and callee in nodes:
+    if isinstance(graph, CompactGraph):
+        index = graph.index
+        selected = {index[sid]: sid for sid in nodes if sid in index}
+
+        for i, caller in selected.items():
+            for j in graph.successors(i):
+                callee = selected.get(j)
+                if callee is not None:
+                    edges.add((caller, callee))
+
+        return nodes, edges
+
+    for caller in nodes:
+        for callee in graph.edges.get(caller, ()):
+            if callee in nodes:
                 edges.add((caller, callee))
 
     return nodes, edges
@@ -0,0 +1,82 @@
+import json
+from typing import Any, Iterator, Optional
+
+from pyimpact.core.ids import SymbolId
+
+# Output formats of the impact commands
+FORMATS = ("text", "json", "ndjson", "dot", "svg")
+# Formats that list symbols and need neither the subgraph nor Graphviz
+LISTING_FORMATS = ("text", "json", "ndjson")
+
+Distances = dict[SymbolId, int]
+
+
+def _ordered(distances: Distances) -> list[tuple[SymbolId, int]]:
+    # Nearest first, then by name, so output is stable across runs
+    return sorted(distances.items(), key=lambda item: (item[1], item[0].full_name))
+
+
+def symbol_record(symbol: SymbolId, role: str, hops: int) -> dict[str, Any]:
+    return {
+        "role": role,
+        "symbol": symbol.full_name,
+        "module": symbol.module,
+        "qualname": symbol.qualname,
+        "hops": hops,
+    }
+
+
+def iter_text(
+    target: SymbolId,
+    upstream: Optional[Distances],
+    downstream: Optional[Distances],
+) -> Iterator[str]:
+    """
+    Human-readable report, one line at a time. A direction that was not
+    queried (None) is left out.
+    """
+    yield f"Impact analysis for function: {target.full_name}"
+
+    sections = [
+        ("Affected (downstream):", downstream),
+        ("Affected by (upstream):", upstream),
+    ]
+    for title, distances in sections:
+        if distances is None:
+            continue
+        yield ""
+        yield title
+        if not distances:
+            yield "  (none)"
+        for symbol, hops in _ordered(distances):
+            yield f"  - {symbol.full_name} ({hops} hop{'s' if hops != 1 else ''})"
+
+
+def iter_ndjson(
+    target: SymbolId,
+    upstream: Optional[Distances],
+    downstream: Optional[Distances],
+) -> Iterator[str]:
+    """
+    One JSON object per line: the target, then every affected symbol
+    with its role and hop count.
+    """
+    yield json.dumps(symbol_record(target, "target", 0))
+    for role, distances in (("upstream", upstream), ("downstream", downstream)):
+        for symbol, hops in _ordered(distances or {}):
+            yield json.dumps(symbol_record(symbol, role, hops))
+
+
+def impact_json(
+    target: SymbolId,
+    upstream: Optional[Distances],
+    downstream: Optional[Distances],
+) -> dict[str, Any]:
+    """
+    The ndjson records as one document.
+    """
+    data: dict[str, Any] = {"target": symbol_record(target, "target", 0)}
+    for role, distances in (("upstream", upstream), ("downstream", downstream)):
+        if distances is not None:
+            data[role] = [symbol_record(s, role, hops) for s, hops in _ordered(distances)]
+    return data
@@ -1,6 +1,51 @@
-from graphviz import Digraph
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from pyimpact.core import metrics
 from pyimpact.core.ids import SymbolId
 
+if TYPE_CHECKING:
+    from graphviz import Source
+
+# Impact sets above this many symbols are drawn clustered and collapsed
+LARGE_GRAPH = 200
+# Modules with more symbols than this collapse into a summary node
+COLLAPSE_ABOVE = 20
+# Drawings with more nodes than this are laid out with sfdp instead of dot
+SFDP_ABOVE = 500
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """
+    How an impact graph is drawn.
+
+    dot's layered layout reads best but grows superlinearly with the
+    graph; sfdp (force-directed, multilevel) handles tens of thousands of
+    nodes. Clustering and collapsing cut what either has to lay out.
+    """
+    # One Graphviz cluster per module, grouped by top-level package
+    cluster: bool = False
+    # Modules with more symbols than this are drawn as one summary node
+    # with counts (None: never). The target always stays visible.
+    collapse_above: Optional[int] = None
+    # Layout engine; None picks dot, or sfdp above `sfdp_above` nodes
+    engine: Optional[str] = None
+    sfdp_above: int = SFDP_ABOVE
+
+    @classmethod
+    def for_size(cls, n_nodes: int) -> "RenderOptions":
+        """
+        Plain drawing for small impact sets, clustered and collapsed for
+        large ones.
+        """
+        if n_nodes <= LARGE_GRAPH:
+            return cls()
+        return cls(cluster=True, collapse_above=COLLAPSE_ABOVE)
+
 
 def _node_id(symbol: SymbolId) -> str:
     """
@@ -9,40 +54,189 @@ def _node_id(symbol: SymbolId) -> str:
     return f"{symbol.language}_{symbol.module}_{symbol.qualname}".replace(".", "_")
 
 
-def render_svg(
+def _summary_id(module: str) -> str:
+    return f"summary_{module}".replace(".", "_")
+
+
+def _cluster_id(kind: str, name: str) -> str:
+    # Graphviz only draws subgraphs whose name starts with "cluster" as boxes
+    return f"cluster_{kind}_{name}".replace(".", "_")
+
+
+def _role_style(role: Optional[str]) -> tuple[str, str]:
+    if role == "target":
+        return "red", "filled"
+    if role == "upstream":
+        return "lightblue", "filled"
+    if role == "downstream":
+        return "lightgreen", "filled"
+    return "gray", "solid"
+
+
+def _summary_label(module: str, members: list[SymbolId], roles: dict[SymbolId, str]) -> str:
+    counts = Counter(roles.get(s, "other") for s in members)
+    detail = ", ".join(f"{n} {role}" for role, n in sorted(counts.items()))
+    return f"{module}\n{len(members)} functions ({detail})"
+
+
+_DOT_ID = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|-?(?:\.[0-9]+|[0-9]+(?:\.[0-9]*)?)")
+_DOT_KEYWORDS = {"node", "edge", "graph", "digraph", "subgraph", "strict"}
+
+
+def _quote(value: str) -> str:
+    """
+    A DOT identifier or number as is, anything else as a quoted string.
+    """
+    if _DOT_ID.fullmatch(value) and value.lower() not in _DOT_KEYWORDS:
+        return value
+    escaped = value.replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def _attrs(**attrs: str) -> str:
+    return " [" + " ".join(f"{k}={_quote(v)}" for k, v in attrs.items()) + "]"
+
+
+@dataclass(frozen=True)
+class DotGraph:
+    """
+    DOT source of a drawing and the layout engine it is meant for.
+    """
+    source: str
+    engine: str
+
+
+def render_dot(
     nodes: set[SymbolId],
     edges: set[tuple[SymbolId, SymbolId]],
     roles: dict[SymbolId, str],
-) -> Digraph:
-    dot = Digraph("PyImpact", format="svg")
-    dot.attr(rankdir="LR")
-
-    # Add nodes
-    for node in nodes:
-        role = roles.get(node)
-
-        if role == "target":
-            color = "red"
-            style = "filled"
-        elif role == "upstream":
-            color = "lightblue"
-            style = "filled"
-        elif role == "downstream":
-            color = "lightgreen"
-            style = "filled"
-        else:
-            color = "gray"
-            style = "solid"
+    options: Optional[RenderOptions] = None,
+) -> DotGraph:
+    """
+    DOT drawing of an impact subgraph, nodes colored by role.
+
+    The source is written directly, without the graphviz package, and
+    is sorted so the same graph always renders the same text.
+    """
+    with metrics.span("render_dot"):
+        return _render_dot(nodes, edges, roles, options or RenderOptions())
 
-        dot.node(
-            name=_node_id(node),
-            label=f"{node.module}.{node.qualname}",
-            color=color,
-            style=style,
-        )
 
-    # Add edges
+def _render_dot(
+    nodes: set[SymbolId],
+    edges: set[tuple[SymbolId, SymbolId]],
+    roles: dict[SymbolId, str],
+    options: RenderOptions,
+) -> DotGraph:
+
+    by_module: dict[str, list[SymbolId]] = defaultdict(list)
+    for node in sorted(nodes, key=lambda s: (s.module, s.qualname)):
+        by_module[node.module].append(node)
+
+    # Graphviz node each symbol is drawn as: its own, or its module's summary
+    drawn: dict[SymbolId, str] = {}
+    shown: dict[str, list[SymbolId]] = {}
+    hidden: dict[str, list[SymbolId]] = {}
+
+    for module, members in by_module.items():
+        rest = [s for s in members if roles.get(s) != "target"]
+        if options.collapse_above is not None and len(members) > options.collapse_above and rest:
+            shown[module] = [s for s in members if roles.get(s) == "target"]
+            hidden[module] = rest
+        else:
+            shown[module] = members
+        for symbol in shown[module]:
+            drawn[symbol] = _node_id(symbol)
+        for symbol in hidden.get(module, ()):
+            drawn[symbol] = _summary_id(module)
+
+    # Parallel edges (between collapsed modules) merge into one weighted
+    # edge; edges inside a collapsed module disappear
+    weights: Counter[tuple[str, str]] = Counter()
     for src, dst in edges:
-        dot.edge(_node_id(src), _node_id(dst))
+        a = drawn.get(src) or _node_id(src)
+        b = drawn.get(dst) or _node_id(dst)
+        if a != b or src == dst:
+            weights[a, b] += 1
+
+    n_drawn = sum(len(s) for s in shown.values()) + len(hidden)
+    engine = options.engine or ("sfdp" if n_drawn > options.sfdp_above else "dot")
+
+    lines = ["digraph PyImpact {", "\tgraph [rankdir=LR]"]
+    if engine == "sfdp":
+        # Straight edges and prism overlap removal keep sfdp fast
+        lines.append("\tgraph" + _attrs(splines="false", overlap="prism", outputorder="edgesfirst"))
+
+    def add_module(module: str, indent: str) -> None:
+        for symbol in shown[module]:
+            color, style = _role_style(roles.get(symbol))
+            label = symbol.qualname if options.cluster else f"{symbol.module}.{symbol.qualname}"
+            lines.append(
+                indent + _quote(_node_id(symbol)) + _attrs(label=label, color=color, style=style)
+            )
+
+        if module in hidden:
+            members = hidden[module]
+            member_roles = {roles.get(s) for s in members}
+            color = _role_style(member_roles.pop())[0] if len(member_roles) == 1 else "lightgray"
+            label = _summary_label(module, members, roles)
+            lines.append(
+                indent
+                + _quote(_summary_id(module))
+                + _attrs(label=label, shape="folder", color=color, style="filled")
+            )
+
+    def open_cluster(kind: str, name: str, indent: str) -> None:
+        lines.append(f"{indent}subgraph {_quote(_cluster_id(kind, name))} {{")
+        lines.append(f"{indent}\tlabel={_quote(name)}")
+
+    if not options.cluster:
+        for module in by_module:
+            add_module(module, "\t")
+    else:
+        packages: dict[str, list[str]] = defaultdict(list)
+        for module in by_module:
+            packages[module.partition(".")[0]].append(module)
+
+        for package, modules in packages.items():
+            if len(modules) == 1:
+                open_cluster("module", modules[0], "\t")
+                add_module(modules[0], "\t\t")
+                lines.append("\t}")
+                continue
+
+            open_cluster("package", package, "\t")
+            for module in modules:
+                open_cluster("module", module, "\t\t")
+                add_module(module, "\t\t\t")
+                lines.append("\t\t}")
+            lines.append("\t}")
+
+    for (a, b), weight in sorted(weights.items()):
+        edge = f"\t{_quote(a)} -> {_quote(b)}"
+        if weight > 1:
+            edge += _attrs(
+                label=str(weight),
+                weight=str(weight),
+                penwidth=f"{1 + math.log2(weight):.1f}",
+            )
+        lines.append(edge)
+
+    lines.append("}")
+    return DotGraph("\n".join(lines) + "\n", engine)
+
+
+def render_svg(
+    nodes: set[SymbolId],
+    edges: set[tuple[SymbolId, SymbolId]],
+    roles: dict[SymbolId, str],
+    options: Optional[RenderOptions] = None,
+) -> "Source":
+    """
+    render_dot wrapped for rendering to SVG with the graphviz package
+    (imported here, so the other output formats never load it).
+    """
+    from graphviz import Source
 
-    return dot
+    dot = render_dot(nodes, edges, roles, options)
+    return Source(dot.source, engine=dot.engine, format="svg")
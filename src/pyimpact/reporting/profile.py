@@ -0,0 +1,63 @@
+from collections.abc import Iterator
+from typing import Any
+
+from pyimpact.core.metrics import Metrics
+
+
+def iter_breakdown(metrics: Metrics, wall: float) -> Iterator[str]:
+    """
+    Per-stage timing table and the counters, one line at a time. Shares
+    are of `wall` seconds; stages nest (scan+parse contains read,
+    ast.parse, ...) and worker processes run side by side, so they do
+    not add up to 100%.
+    """
+    totals = metrics.totals()
+    width = max([len(name) for name in totals] + [len("stage")])
+
+    yield f"{'stage':<{width}} {'total ms':>10} {'calls':>8} {'share':>7}"
+    for name, (seconds, calls) in totals.items():
+        share = seconds / wall if wall > 0 else 0.0
+        yield f"{name:<{width}} {seconds * 1e3:>10.1f} {calls:>8} {share:>7.1%}"
+    yield f"{'wall':<{width}} {wall * 1e3:>10.1f}"
+
+    if metrics.counters:
+        yield ""
+        width = max(len(name) for name in metrics.counters)
+        for name, value in sorted(metrics.counters.items()):
+            yield f"{name:<{width}} {value:>12,}"
+
+
+def chrome_trace(metrics: Metrics) -> dict[str, Any]:
+    """
+    The spans as Chrome trace events (chrome://tracing, Perfetto), one
+    track per process and thread, with the counters as the arguments of
+    a final counter event.
+    """
+    origin = metrics.started
+    events: list[dict[str, Any]] = [
+        {
+            "name": span.name,
+            "cat": "pyimpact",
+            "ph": "X",
+            "ts": (span.start - origin) * 1e6,
+            "dur": span.duration * 1e6,
+            "pid": span.pid,
+            "tid": span.tid,
+        }
+        for span in sorted(metrics.spans, key=lambda s: s.start)
+    ]
+
+    if metrics.counters and events:
+        end = max(span.start + span.duration for span in metrics.spans)
+        events.append(
+            {
+                "name": "counters",
+                "ph": "C",
+                "ts": (end - origin) * 1e6,
+                # On the track of the process that started the run
+                "pid": events[0]["pid"],
+                "args": dict(metrics.counters),
+            }
+        )
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
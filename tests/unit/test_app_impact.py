@@ -1,4 +1,13 @@
-from pyimpact.app.impact import run_impact_analysis
+import pytest
+
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.impact import (
+    analyze_impact,
+    batch_impact,
+    find_target,
+    run_impact_analysis,
+)
+from pyimpact.core.compact import CompactGraph
 
 
 def test_run_impact_analysis_simple_project(tmp_path):
@@ -26,3 +35,57 @@ def b():
 
     assert downstream_names == {"b"}
     assert upstream_names == set()
+
+
+def test_batch_impact_reports_attribution_and_errors(tmp_path):
+    (tmp_path / "a.py").write_text(
+        """
+def a():
+    c()
+
+def b():
+    c()
+
+def c():
+    pass
+"""
+    )
+
+    graph = build_project_graph(tmp_path)
+    result = batch_impact(graph, ["a", "b", "missing"])
+
+    assert set(result.targets) == {"a", "b"}
+    assert {s.qualname: {t.qualname for t in ts} for s, ts in result.downstream.items()} == {
+        "c": {"a", "b"}
+    }
+    assert result.upstream == {}
+    assert result.errors == {"missing": "Function 'missing' not found"}
+
+    data = result.to_json()
+    assert data["downstream"][0]["targets"] == [["python", "a", "a"], ["python", "a", "b"]]
+
+
+def test_find_target_accepts_module_qualified_names(tmp_path):
+    for package in ("a", "b"):
+        (tmp_path / package).mkdir()
+        (tmp_path / package / "utils.py").write_text("def helper():\n    pass\n")
+
+    graph = build_project_graph(tmp_path)
+
+    with pytest.raises(ValueError, match="ambiguous"):
+        find_target(graph, "helper")
+
+    for g in (graph, CompactGraph.from_graph(graph)):
+        assert find_target(g, "b.utils.helper").module == "b.utils"
+
+
+def test_analyze_impact_can_skip_the_subgraph(tmp_path):
+    (tmp_path / "a.py").write_text("def a():\n    b()\n\ndef b():\n    pass\n")
+    graph = build_project_graph(tmp_path)
+    target = find_target(graph, "b")
+
+    full = analyze_impact(graph, target)
+    listing = analyze_impact(graph, target, subgraph=False)
+
+    assert (listing.upstream, listing.downstream) == (full.upstream, full.downstream)
+    assert full.edges and not listing.edges and not listing.nodes
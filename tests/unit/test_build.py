@@ -0,0 +1,168 @@
+from pathlib import Path
+
+import pytest
+
+from pyimpact.analyzer.cache import ParseCache
+from pyimpact.analyzer.modules import ModuleNamer
+from pyimpact.analyzer.parser import ParseOptions, pack_result, parse_python_file, unpack_result
+from pyimpact.analyzer.resolver import Resolver
+from pyimpact.app.build import build_project_graph, update_project_graph
+
+
+def _write_project(root):
+    for i in range(6):
+        (root / f"m{i}.py").write_text(
+            f"def f{i}():\n    f{(i + 1) % 6}()\n    shared()\n\ndef shared():\n    pass\n"
+        )
+
+
+def _snapshot(graph):
+    return (
+        list(graph.nodes),
+        {k: sorted(map(str, v)) for k, v in graph.edges.items()},
+        [(str(c.caller_id), c.callee_name) for c in graph.unresolved_calls],
+    )
+
+
+def test_pack_roundtrip():
+    result = parse_python_file(Path("tests/fixtures/parser_sample.py"))
+
+    assert unpack_result(pack_result(result)) == result
+
+
+def test_parallel_build_is_deterministic(tmp_path):
+    _write_project(tmp_path)
+
+    serial = build_project_graph(tmp_path, jobs=1)
+    parallel = build_project_graph(tmp_path, jobs=3)
+
+    assert _snapshot(serial) == _snapshot(parallel)
+    assert len(serial.nodes) == 12
+
+
+def _edge_names(graph):
+    return {
+        (f"{a.module}.{a.qualname}", f"{b.module}.{b.qualname}")
+        for a, callees in graph.edges.items()
+        for b in callees
+    }
+
+
+def _reverse_edge_names(graph):
+    return {
+        (f"{a.module}.{a.qualname}", f"{b.module}.{b.qualname}")
+        for b, callers in graph.reverse_edges.items()
+        for a in callers
+    }
+
+
+INCREMENTAL_CASES = {
+    # Rename old() → new(), drop a module, add a new caller
+    "rename-remove-add": (
+        {
+            "util.py": "def helper():\n    pass\n\ndef old():\n    pass\n",
+            "api.py": "from util import helper\n\ndef run():\n    helper()\n",
+            "cli.py": "import util\n\ndef main():\n    util.old()\n    new()\n",
+            "gone.py": "def g():\n    run()\n",
+        },
+        {
+            "util.py": "def helper():\n    new()\n\ndef new():\n    pass\n",
+            "gone.py": None,
+            "extra.py": "from api import run\n\ndef x():\n    run()\n",
+        },
+    ),
+    # A second foo() makes the project-wide fallback ambiguous
+    "fallback-becomes-ambiguous": (
+        {
+            "a.py": "def other():\n    pass\n",
+            "b.py": "def run():\n    foo()\n",
+            "c.py": "def foo():\n    pass\n",
+        },
+        {"a.py": "def other():\n    pass\n\ndef foo():\n    pass\n"},
+    ),
+    # The star import now explains the call; the fallback edge must go
+    "star-import-takes-over": (
+        {
+            "a.py": "def other():\n    pass\n",
+            "b.py": "from a import *\n\ndef run():\n    foo()\n",
+            "c.py": "def foo():\n    pass\n",
+        },
+        {"a.py": "def other():\n    pass\n\ndef foo():\n    pass\n"},
+    ),
+}
+
+
+@pytest.mark.parametrize("case", sorted(INCREMENTAL_CASES))
+def test_incremental_update_matches_full_rebuild(tmp_path, case):
+    before, edits = INCREMENTAL_CASES[case]
+    for name, source in before.items():
+        (tmp_path / name).write_text(source)
+
+    graph = build_project_graph(tmp_path)
+    resolver = Resolver()
+
+    for name, source in edits.items():
+        if source is None:
+            (tmp_path / name).unlink()
+        else:
+            (tmp_path / name).write_text(source)
+
+    changed = {tmp_path / name for name in edits}
+    update_project_graph(graph, changed, resolver, ModuleNamer(tmp_path))
+
+    fresh = build_project_graph(tmp_path)
+
+    assert set(graph.nodes) == set(fresh.nodes)
+    assert _edge_names(graph) == _edge_names(fresh)
+    assert _reverse_edge_names(graph) == _edge_names(fresh)
+    assert sorted(c.callee_name for c in graph.unresolved_calls) == sorted(
+        c.callee_name for c in fresh.unresolved_calls
+    )
+    assert graph.call_targets == fresh.call_targets
+
+
+def _write_broken_project(root):
+    (root / "good.py").write_text("def good():\n    helper()\n\ndef helper():\n    pass\n")
+    (root / "legacy.py").write_text("def old():\n    print 'python 2'\n")
+    (root / "latin.py").write_bytes("def caf\xe9():\n    pass\n".encode("latin-1"))
+    (root / "big.py").write_text("def big():\n    pass\n" + "# padding\n" * 200)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_tolerant_build_skips_and_reports_bad_files(tmp_path, jobs):
+    _write_broken_project(tmp_path)
+    failures = []
+
+    graph = build_project_graph(
+        tmp_path,
+        jobs=jobs,
+        parse=ParseOptions(tolerant=True, max_bytes=1000),
+        failures=failures,
+    )
+
+    assert sorted(sid.qualname for sid in graph.nodes) == ["good", "helper"]
+    assert [(f.path.name, f.reason) for f in failures] == [
+        ("big.py", "too-large"),
+        ("latin.py", "encoding"),
+        ("legacy.py", "syntax"),
+    ]
+
+
+def test_strict_build_raises_on_the_first_bad_file(tmp_path):
+    _write_broken_project(tmp_path)
+
+    with pytest.raises(UnicodeError):
+        build_project_graph(tmp_path)
+
+
+def test_tolerant_build_does_not_cache_failures(tmp_path):
+    _write_broken_project(tmp_path)
+    options = ParseOptions(tolerant=True)
+
+    build_project_graph(tmp_path, cache=ParseCache.for_project(tmp_path), parse=options)
+    failures = []
+    build_project_graph(
+        tmp_path, cache=ParseCache.for_project(tmp_path), parse=options, failures=failures
+    )
+
+    assert [f.path.name for f in failures] == ["latin.py", "legacy.py"]
@@ -0,0 +1,126 @@
+import json
+import os
+import pickle
+
+import pyimpact.analyzer.cache as cache_module
+import pyimpact.app.build as build_module
+from pyimpact.analyzer.cache import ParseCache, read_with_fingerprint
+from pyimpact.analyzer.parser import parse_python_file
+from pyimpact.app.build import build_project_graph
+
+
+def _store(cache: ParseCache, path):
+    _, fingerprint = read_with_fingerprint(path)
+    cache.put(path, fingerprint, parse_python_file(path))
+
+
+def test_cache_roundtrip_hits_unchanged_file(tmp_path):
+    src = tmp_path / "a.py"
+    src.write_text("def a():\n    b()\n")
+
+    cache = ParseCache(tmp_path / "cache")
+    _store(cache, src)
+    cache.save()
+
+    reloaded = ParseCache(tmp_path / "cache")
+    reloaded.load()
+    functions, calls, _ = reloaded.get(src)
+
+    assert [f.name for f in functions] == ["a"]
+    assert [(c.caller, c.callee) for c in calls] == [("a", "b")]
+    assert reloaded.hits == 1
+
+
+def test_cache_misses_on_content_change(tmp_path):
+    src = tmp_path / "a.py"
+    src.write_text("def a():\n    pass\n")
+
+    cache = ParseCache(tmp_path / "cache")
+    _store(cache, src)
+
+    src.write_text("def a():\n    b()\n    c()\n")
+
+    assert cache.get(src) is None
+    assert cache.misses == 1
+
+
+def test_cache_falls_back_to_content_hash_on_touch(tmp_path):
+    src = tmp_path / "a.py"
+    src.write_text("def a():\n    pass\n")
+
+    cache = ParseCache(tmp_path / "cache")
+    _store(cache, src)
+
+    st = src.stat()
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+    assert cache.get(src) is not None
+    assert cache.hits == 1
+
+
+def test_cache_invalidated_by_tool_version(tmp_path, monkeypatch):
+    src = tmp_path / "a.py"
+    src.write_text("def a():\n    pass\n")
+
+    cache = ParseCache(tmp_path / "cache")
+    _store(cache, src)
+    cache.save()
+
+    monkeypatch.setattr(cache_module, "__version__", "999.0")
+
+    reloaded = ParseCache(tmp_path / "cache")
+    reloaded.load()
+
+    assert len(reloaded) == 0
+
+
+class _Planted:
+    def __reduce__(self):
+        return (os.mkdir, ("planted",))
+
+
+def test_cache_never_runs_code_from_a_planted_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "a.py"
+    src.write_text("def a():\n    pass\n")
+
+    cache = ParseCache(tmp_path / "cache")
+    cache.path.parent.mkdir()
+    cache.path.write_bytes(pickle.dumps(_Planted()))
+    cache.load()
+    assert len(cache) == 0
+    assert not (tmp_path / "planted").exists()
+
+    # Well-formed JSON whose entry does not fit the parser DTOs
+    _, fingerprint = read_with_fingerprint(src)
+    entry = [fingerprint.mtime_ns, fingerprint.size, fingerprint.digest, [[["a"]], [], []]]
+    header = list(cache_module.cache_header())
+    cache.path.write_text(json.dumps([header, {str(src): entry}]))
+    cache.load()
+    assert len(cache) == 1
+    assert cache.get(src) is None
+
+
+def test_build_project_graph_reparses_only_changed_files(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.py").write_text("def a():\n    b()\n")
+    (project / "b.py").write_text("def b():\n    pass\n")
+
+    build_project_graph(project, cache=ParseCache.for_project(project))
+
+    parsed = []
+    original = build_module._parse_file
+
+    def counting_parse(path, options=None):
+        parsed.append(path.name)
+        return original(path, options)
+
+    monkeypatch.setattr(build_module, "_parse_file", counting_parse)
+
+    (project / "b.py").write_text("def b():\n    a()\n")
+    graph = build_project_graph(project, cache=ParseCache.for_project(project))
+
+    assert parsed == ["b.py"]
+    edges = {(c.qualname, d.qualname) for c, ds in graph.edges.items() for d in ds}
+    assert edges == {("a", "b"), ("b", "a")}
@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+# Import time of pyimpact.cli.main on top of typer's own, in ms. About 40
+# with lazy imports; importing the analyzer stack at the top costs ~180.
+IMPORT_BUDGET_MS = 80
+RUNS = 3
+
+# Loaded only by the commands that need them, never at startup
+HEAVY_MODULES = [
+    "graphviz",
+    "webbrowser",
+    "tempfile",
+    "concurrent.futures.process",
+    "urllib.request",
+    "http.client",
+    "pyimpact.analyzer.parser",
+    "pyimpact.analyzer.cache",
+    "pyimpact.app.build",
+    "pyimpact.app.client",
+    "pyimpact.app.diff",
+    "pyimpact.app.selection",
+    "pyimpact.query.engine",
+]
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Cumulative import time in microseconds of every module loaded by a
+    fresh interpreter importing `module`, from `python -X importtime`.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_stays_within_budget():
+    own = []
+    for _ in range(RUNS):
+        times = import_times("pyimpact.cli.main")
+        own.append(times["pyimpact.cli.main"] - times.get("typer", 0))
+
+    # Best of a few runs, so a busy machine doesn't fail the test
+    assert min(own) / 1000 < IMPORT_BUDGET_MS
+
+
+def test_cli_import_skips_heavy_modules():
+    loaded = import_times("pyimpact.cli.main")
+
+    assert [name for name in HEAVY_MODULES if name in loaded] == []
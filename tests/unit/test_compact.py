@@ -0,0 +1,91 @@
+import random
+from pathlib import Path
+
+from pyimpact.core.compact import CompactGraph
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import CodeLocation, DependencyGraph, FunctionSymbol
+from pyimpact.query.engine import ImpactAnalyzer
+from pyimpact.query.subgraph import extract_subgraph
+
+
+def _random_graph(n: int, n_edges: int, seed: int = 0) -> DependencyGraph:
+    rng = random.Random(seed)
+    graph = DependencyGraph()
+    ids = [SymbolId("python", f"m{i % 7}", f"f{i}") for i in range(n)]
+
+    for sid in ids:
+        graph.add_node(
+            FunctionSymbol(id=sid, name=sid.qualname, module=sid.module,
+                           location=CodeLocation(Path("x.py"), 1, 0))
+        )
+    for _ in range(n_edges):
+        graph.add_edge(rng.choice(ids), rng.choice(ids))
+
+    return graph
+
+
+def test_compact_graph_preserves_adjacency():
+    graph = _random_graph(50, 120)
+    compact = CompactGraph.from_graph(graph)
+
+    assert len(compact) == 50
+    assert compact.edge_count == sum(len(v) for v in graph.edges.values())
+    assert set(compact.nodes) == set(graph.nodes)
+
+    for sid in graph.nodes:
+        assert set(compact.edges[sid]) == graph.edges[sid]
+        assert set(compact.reverse_edges[sid]) == graph.reverse_edges[sid]
+
+
+def test_impact_analyzer_matches_on_compact_graph():
+    graph = _random_graph(200, 300, seed=1)
+    compact = CompactGraph.from_graph(graph)
+
+    plain = ImpactAnalyzer(graph)
+    fast = ImpactAnalyzer(compact)
+
+    for sid in list(graph.nodes)[:40]:
+        assert fast.upstream(sid) == plain.upstream(sid)
+        assert fast.downstream(sid) == plain.downstream(sid)
+
+        expected = extract_subgraph(graph, sid, plain.upstream(sid), plain.downstream(sid))
+        actual = extract_subgraph(compact, sid, fast.upstream(sid), fast.downstream(sid))
+        assert actual == expected
+
+
+def test_compact_graph_unknown_symbol_has_no_impact():
+    compact = CompactGraph.from_graph(_random_graph(5, 5))
+
+    assert ImpactAnalyzer(compact).upstream(SymbolId("python", "x", "missing")) == set()
+
+
+def test_many_targets_match_single_queries():
+    graph = _random_graph(200, 300, seed=2)
+    targets = list(graph.nodes)[:15]
+
+    for analyzer in (ImpactAnalyzer(graph), ImpactAnalyzer(CompactGraph.from_graph(graph))):
+        up = analyzer.upstream_many(targets)
+        down = analyzer.downstream_many(targets)
+
+        for attribution, single in ((up, analyzer.upstream), (down, analyzer.downstream)):
+            expected: dict[SymbolId, set[SymbolId]] = {}
+            for target in targets:
+                for sid in single(target):
+                    expected.setdefault(sid, set()).add(target)
+            assert attribution == expected
+
+
+def test_bounded_distances_match_on_compact_graph():
+    graph = _random_graph(200, 400, seed=3)
+    plain = ImpactAnalyzer(graph)
+    fast = ImpactAnalyzer(CompactGraph.from_graph(graph))
+
+    for sid in list(graph.nodes)[:20]:
+        assert fast.upstream_distances(sid) == plain.upstream_distances(sid)
+        assert fast.downstream_distances(sid, max_depth=2) == plain.downstream_distances(
+            sid, max_depth=2
+        )
+        assert fast.downstream(sid, max_nodes=5) == plain.downstream(sid, max_nodes=5)
+        assert fast.upstream_distances(sid, max_nodes=3) == plain.upstream_distances(
+            sid, max_nodes=3
+        )
@@ -0,0 +1,187 @@
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from pyimpact.analyzer.parser import ParseOptions
+from pyimpact.analyzer.scanner import ScanOptions
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.client import DAEMON_STATE_FILE, DaemonClient, find_daemon, options_key
+from pyimpact.app.daemon import GraphService, PollingWatcher, serve
+from pyimpact.cli.main import _analyze
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_polling_watcher_reports_changed_added_and_removed(tmp_path):
+    (tmp_path / "a.py").write_text("def a():\n    pass\n")
+    (tmp_path / "b.py").write_text("def b():\n    pass\n")
+
+    watcher = PollingWatcher(tmp_path, on_change=lambda changed: None)
+
+    (tmp_path / "a.py").write_text("def a():\n    b()\n")
+    (tmp_path / "b.py").unlink()
+    (tmp_path / "c.py").write_text("def c():\n    pass\n")
+
+    assert {p.name for p in watcher.poll()} == {"a.py", "b.py", "c.py"}
+    assert watcher.poll() == set()
+
+
+def test_graph_service_answers_impact_queries(tmp_path):
+    (tmp_path / "a.py").write_text("def a():\n    b()\n\ndef b():\n    pass\n")
+
+    service = GraphService(tmp_path)
+    service.refresh()
+    result = service.impact("b", downstream=False)
+
+    assert {s.qualname for s in result.upstream} == {"a"}
+    assert result.downstream == {}
+    assert {(x.qualname, y.qualname) for x, y in result.edges} == {("a", "b")}
+
+    with pytest.raises(ValueError):
+        service.impact("missing")
+
+
+def test_graph_service_tracks_files_it_could_not_parse(tmp_path):
+    (tmp_path / "a.py").write_text("def a():\n    b()\n")
+    (tmp_path / "b.py").write_text("def b(:\n")
+
+    service = GraphService(tmp_path.resolve(), parse=ParseOptions(tolerant=True))
+    service.refresh()
+
+    assert [(f.path.name, f.reason) for f in service.failures] == [("b.py", "syntax")]
+
+    (tmp_path / "b.py").write_text("def b():\n    pass\n")
+    service.refresh({(tmp_path / "b.py").resolve()})
+
+    assert service.failures == []
+    assert {s.qualname for s in service.impact("b").upstream} == {"a"}
+
+
+def test_watcher_survives_an_edit_that_fails_to_parse(tmp_path):
+    (tmp_path / "a.py").write_text("def a():\n    b()\n")
+    (tmp_path / "b.py").write_text("def b():\n    pass\n")
+
+    service = GraphService(tmp_path.resolve(), parse=ParseOptions(tolerant=False))
+    watcher = PollingWatcher(tmp_path.resolve(), on_change=service.refresh, interval=0.02)
+    service.refresh()
+    watcher.start()
+    try:
+        (tmp_path / "b.py").write_text("def b(:\n")
+        assert _wait_for(lambda: service.generation == 2)
+
+        (tmp_path / "b.py").write_text("def b():\n    pass\n\ndef c():\n    b()\n")
+        assert _wait_for(lambda: service.generation == 3)
+    finally:
+        watcher.stop()
+
+    assert {s.qualname for s in service.impact("b").upstream} == {"a", "c"}
+
+
+def test_daemon_serves_queries_and_follows_edits(tmp_path):
+    (tmp_path / "a.py").write_text("def a():\n    b()\n\ndef b():\n    pass\n")
+
+    servers = []
+    thread = threading.Thread(
+        target=serve,
+        kwargs={"project_root": tmp_path, "interval": 0.05, "on_ready": servers.append},
+        daemon=True,
+    )
+    thread.start()
+
+    assert _wait_for(lambda: servers)
+    client = find_daemon(tmp_path)
+    assert client is not None
+
+    if os.name == "posix":
+        assert (tmp_path / DAEMON_STATE_FILE).stat().st_mode & 0o077 == 0
+
+    # Other local users can reach the port but do not have the token
+    for token in ("", "wrong"):
+        intruder = DaemonClient(port=client.port, token=token)
+        with pytest.raises(ValueError, match="token"):
+            intruder.shutdown()
+        with pytest.raises(ValueError, match="token"):
+            intruder.impact("b")
+
+    result = client.impact("b")
+    assert {s.qualname: hops for s, hops in result.upstream.items()} == {"a": 1}
+    assert client.impact("b", max_depth=1, max_nodes=1).downstream == {}
+
+    with pytest.raises(ValueError):
+        client.impact("missing")
+
+    (tmp_path / "c.py").write_text("def c():\n    b()\n")
+    assert _wait_for(
+        lambda: {s.qualname for s in client.impact("b").upstream} == {"a", "c"}
+    )
+
+    client.shutdown()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert not (tmp_path / DAEMON_STATE_FILE).exists()
+    assert find_daemon(tmp_path) is None
+
+
+def test_query_with_other_options_is_answered_locally(tmp_path):
+    (tmp_path / "a.py").write_text("def a():\n    b()\n\ndef b():\n    pass\n")
+    (tmp_path / "c.py").write_text("from a import b\n\ndef c():\n    b()\n")
+
+    servers = []
+    thread = threading.Thread(
+        target=serve,
+        kwargs={"project_root": tmp_path, "on_ready": servers.append},
+        daemon=True,
+    )
+    thread.start()
+    assert _wait_for(lambda: servers)
+
+    def unused():
+        raise AssertionError("the daemon should have answered")
+
+    try:
+        result = _analyze("b", tmp_path, True, unused, scan=ScanOptions(), parse=ParseOptions())
+        assert {s.qualname for s in result.upstream} == {"a", "c"}
+
+        scan = ScanOptions(exclude=("c.py",))
+        client = find_daemon(tmp_path)
+        with pytest.raises(OSError, match="options"):
+            client.impact("b", options=options_key(scan, ParseOptions()))
+
+        result = _analyze(
+            "b",
+            tmp_path,
+            True,
+            lambda: build_project_graph(tmp_path, scan=scan),
+            scan=scan,
+            parse=ParseOptions(),
+        )
+        assert {s.qualname for s in result.upstream} == {"a"}
+    finally:
+        servers[0].shutdown()
+        thread.join(timeout=10)
+
+
+def test_query_falls_back_to_local_analysis_when_the_daemon_hangs(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("def a():\n    b()\n\ndef b():\n    pass\n")
+
+    # Accepts connections but never answers
+    listener = socket.create_server(("127.0.0.1", 0))
+    hung = DaemonClient(port=listener.getsockname()[1], token="t")
+    monkeypatch.setattr("pyimpact.app.client.find_daemon", lambda path: hung)
+    monkeypatch.setattr("pyimpact.app.client.QUERY_TIMEOUT", 0.2)
+
+    with listener:
+        result = _analyze("b", tmp_path, True, lambda: build_project_graph(tmp_path))
+
+    assert {s.qualname for s in result.upstream} == {"a"}
@@ -0,0 +1,167 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from pyimpact.analyzer.cache import cache_header
+from pyimpact.analyzer.parser import ParseOptions
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.diff import BaseGraphCache, run_diff_analysis
+from pyimpact.app.git import parse_revision_range, parse_unified_diff
+
+DIFF = b"""\
+diff --git a/m.py b/m.py
+index 1111111..2222222 100644
+--- a/m.py
++++ b/m.py
+@@ -3,0 +4,2 @@ def a():
++    x = 1
++    y = 2
+@@ -10,2 +11 @@ def b():
+-    pass
+-    pass
++    return 1
+diff --git a/old.py b/old.py
+deleted file mode 100644
+--- a/old.py
++++ /dev/null
+@@ -1,3 +0,0 @@
+-def gone():
+-    pass
+-
+"""
+
+
+def test_parse_unified_diff_collects_ranges_on_both_sides():
+    modified, deleted = parse_unified_diff(DIFF)
+
+    assert (modified.old_path, modified.new_path) == ("m.py", "m.py")
+    assert modified.old_ranges == [(10, 11)]
+    assert modified.new_ranges == [(4, 5), (11, 11)]
+
+    assert (deleted.old_path, deleted.new_path) == ("old.py", None)
+    assert deleted.old_ranges == [(1, 3)]
+    assert deleted.new_ranges == []
+
+
+def test_parse_revision_range():
+    assert parse_revision_range("main..feature") == ("main", "feature")
+    assert parse_revision_range("main..") == ("main", None)
+    assert parse_revision_range("HEAD~1") == ("HEAD~1", None)
+
+    with pytest.raises(ValueError):
+        parse_revision_range("..feature")
+    with pytest.raises(ValueError):
+        parse_revision_range("main...feature")
+
+
+def _git(root, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root, check=True, capture_output=True,
+    )
+
+
+def test_base_graph_cache_roundtrips_the_whole_graph(tmp_path):
+    (tmp_path / "m.py").write_text("import os\n\ndef a():\n    b()\n    os.getcwd()\n")
+    (tmp_path / "n.py").write_text("from m import a\n\ndef b():\n    a()\n    missing()\n")
+    graph = build_project_graph(tmp_path)
+    cache = BaseGraphCache(tmp_path / "bases")
+
+    cache.save("abc", tmp_path, graph)
+    loaded = cache.load("abc", tmp_path)
+
+    for name in [
+        "nodes",
+        "edges",
+        "reverse_edges",
+        "unresolved_calls",
+        "imports",
+        "module_symbols",
+        "call_sites",
+        "call_targets",
+    ]:
+        assert getattr(loaded, name) == getattr(graph, name), name
+    assert cache.load("abc", tmp_path / "other") is None
+
+
+def test_base_graph_cache_ignores_files_it_did_not_write(tmp_path):
+    cache = BaseGraphCache(tmp_path / "bases")
+    cache.directory.mkdir()
+
+    cache.path_for("abc").write_bytes(b"\x80\x04not json")
+    assert cache.load("abc", tmp_path) is None
+
+    header = list(cache_header())
+    cache.path_for("abc").write_text(json.dumps([header, str(tmp_path), {"nodes": [[1]]}]))
+    assert cache.load("abc", tmp_path) is None
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_diff_analysis_maps_hunks_to_functions_and_callers(tmp_path):
+    (tmp_path / "m.py").write_text(
+        "def a():\n    b()\n\ndef b():\n    c()\n\ndef c():\n    pass\n\ndef gone():\n    pass\n"
+    )
+    (tmp_path / "u.py").write_text(
+        "from m import gone\n\ndef user():\n    gone()\n\ndef top():\n    user()\n"
+    )
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "base")
+
+    (tmp_path / "m.py").write_text(
+        "def a():\n    b()\n\ndef b():\n    c()\n\ndef c():\n    return 1\n"
+    )
+    _git(tmp_path, "commit", "-qam", "head")
+
+    cache = BaseGraphCache.for_project(tmp_path)
+    result = run_diff_analysis(tmp_path, "HEAD~1..HEAD", cache=cache)
+
+    assert {s.qualname for s in result.changed} == {"c"}
+    assert {s.qualname for s in result.deleted} == {"gone"}
+    assert {s.qualname: {t.qualname for t in ts} for s, ts in result.affected.items()} == {
+        "a": {"c"},
+        "b": {"c"},
+        "user": {"gone"},
+        "top": {"gone"},
+    }
+    assert cache.path_for(result.base).is_file()
+
+    # Same answer from the cached base graph; work-tree edits are seen too
+    assert run_diff_analysis(tmp_path, "HEAD~1..HEAD", cache=cache) == result
+
+    (tmp_path / "u.py").write_text(
+        "from m import gone\n\ndef user():\n    gone()\n\ndef top():\n    return user()\n"
+    )
+    worktree = run_diff_analysis(tmp_path, "HEAD", cache=cache)
+    assert worktree.head is None
+    assert {s.qualname for s in worktree.changed} == {"top"}
+    assert worktree.affected == {}
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_diff_analysis_skips_files_that_do_not_parse(tmp_path):
+    (tmp_path / "m.py").write_text("def a():\n    b()\n\ndef b():\n    pass\n")
+    (tmp_path / "old.py").write_text("def broken(:\n    pass\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "base")
+
+    (tmp_path / "m.py").write_text("def a():\n    b()\n\ndef b():\n    return 1\n")
+    _git(tmp_path, "commit", "-qam", "head")
+
+    cache = BaseGraphCache.for_project(tmp_path)
+    tolerant = ParseOptions(tolerant=True)
+    for _ in range(2):
+        # The second run loads the base graph from the cache
+        failures = []
+        result = run_diff_analysis(
+            tmp_path, "HEAD~1..HEAD", cache=cache, parse=tolerant, failures=failures
+        )
+        assert {s.qualname for s in result.changed} == {"b"}
+        assert [(f.path.name, f.reason) for f in failures] == [("old.py", "syntax")]
+
+    # A strict run does not reuse the tolerant base graph
+    with pytest.raises(SyntaxError):
+        run_diff_analysis(tmp_path, "HEAD~1..HEAD", cache=cache)
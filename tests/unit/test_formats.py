@@ -0,0 +1,61 @@
+import json
+import subprocess
+import sys
+
+from pyimpact.core.ids import SymbolId
+from pyimpact.reporting.formats import impact_json, iter_ndjson, iter_text
+
+TARGET = SymbolId("python", "pkg.core", "run")
+UP = {SymbolId("python", "app", "main"): 2, SymbolId("python", "app", "cli"): 1}
+DOWN = {SymbolId("python", "pkg.io", "Reader.read"): 1}
+
+
+def test_text_lists_each_direction_nearest_first():
+    lines = list(iter_text(TARGET, UP, DOWN))
+
+    assert lines == [
+        "Impact analysis for function: pkg.core.run",
+        "",
+        "Affected (downstream):",
+        "  - pkg.io.Reader.read (1 hop)",
+        "",
+        "Affected by (upstream):",
+        "  - app.cli (1 hop)",
+        "  - app.main (2 hops)",
+    ]
+
+
+def test_text_leaves_out_directions_not_queried():
+    lines = list(iter_text(TARGET, {}, None))
+
+    assert lines[-2:] == ["Affected by (upstream):", "  (none)"]
+    assert "Affected (downstream):" not in lines
+
+
+def test_ndjson_and_json_carry_the_same_records():
+    records = [json.loads(line) for line in iter_ndjson(TARGET, UP, DOWN)]
+    document = impact_json(TARGET, UP, DOWN)
+
+    assert records[0] == document["target"] == {
+        "role": "target",
+        "symbol": "pkg.core.run",
+        "module": "pkg.core",
+        "qualname": "run",
+        "hops": 0,
+    }
+    assert records[1:] == document["upstream"] + document["downstream"]
+    assert [r["symbol"] for r in records[1:]] == ["app.cli", "app.main", "pkg.io.Reader.read"]
+
+
+def test_listing_and_dot_output_do_not_import_graphviz():
+    code = (
+        "import sys\n"
+        "import pyimpact.cli.main\n"
+        "from pyimpact.core.ids import SymbolId\n"
+        "from pyimpact.reporting.graphviz import render_dot\n"
+        "sid = SymbolId('python', 'm', 'f')\n"
+        "render_dot({sid}, {(sid, sid)}, {sid: 'target'})\n"
+        "assert 'graphviz' not in sys.modules, 'graphviz was imported'\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from pyimpact.analyzer.graph_builder import GraphBuilder
-from pyimpact.analyzer.parser import FunctionDefInfo, CallSiteInfo
+from pyimpact.analyzer.parser import FunctionDefInfo, CallSiteInfo, parse_python_source
 
 
 def test_graph_builder_creates_nodes_and_edges():
@@ -55,3 +55,37 @@ def test_graph_builder_ignores_unresolved_calls():
 
     a_id = next(iter(graph.nodes))
     assert graph.edges[a_id] == set()
+
+
+def test_graph_builder_resolves_local_calls_through_scopes():
+    source = (
+        "def helper():\n    pass\n\n"
+        "class Service:\n"
+        "    def run(self):\n        self.step()\n        helper()\n\n"
+        "    def step(self):\n"
+        "        def helper():\n            pass\n"
+        "        helper()\n\n"
+        "async def main():\n    Service().run()\n"
+    )
+    functions, calls, imports = parse_python_source(source)
+
+    graph = GraphBuilder().build(
+        file_path=Path("svc.py"),
+        module_name="svc",
+        functions=functions,
+        calls=calls,
+        imports=imports,
+    )
+
+    edges = {(a.qualname, b.qualname) for a, callees in graph.edges.items() for b in callees}
+    assert edges == {
+        ("Service.run", "Service.step"),
+        ("Service.run", "helper"),
+        ("Service.step", "Service.step.<locals>.helper"),
+    }
+
+    by_qualname = {sid.qualname: fn for sid, fn in graph.nodes.items()}
+    assert by_qualname["Service.run"].class_name == "Service"
+    assert by_qualname["Service.run"].name == "run"
+    assert by_qualname["main"].is_async
+    assert by_qualname["Service.step.<locals>.helper"].class_name is None
@@ -1,5 +1,5 @@
 from pyimpact.core.ids import SymbolId
-from pyimpact.reporting.graphviz import render_svg
+from pyimpact.reporting.graphviz import RenderOptions, render_svg
 
 
 def test_graphviz_node_ids_are_safe():
@@ -18,3 +18,58 @@ def test_graphviz_node_ids_are_safe():
 
     # Graphviz treats ':' as port syntax — must not appear in IDs
     assert ":" not in source
+
+
+def _impact_set(n_per_module):
+    """
+    Target app.core.run calling n functions in each of lib.a and lib.b,
+    each of which calls its counterpart in the other module.
+    """
+    target = SymbolId("python", "app.core", "run")
+    a = [SymbolId("python", "lib.a", f"f{i}") for i in range(n_per_module)]
+    b = [SymbolId("python", "lib.b", f"g{i}") for i in range(n_per_module)]
+
+    nodes = {target, *a, *b}
+    edges = {(target, s) for s in a} | set(zip(a, b))
+    roles = {s: "downstream" for s in a + b}
+    roles[target] = "target"
+    return nodes, edges, roles
+
+
+def test_default_render_draws_every_symbol_with_dot():
+    nodes, edges, roles = _impact_set(3)
+
+    dot = render_svg(nodes, edges, roles)
+
+    assert dot.engine == "dot"
+    assert dot.source.count("->") == 6
+    assert 'label="lib.a.f0"' in dot.source
+    assert "cluster" not in dot.source
+
+
+def test_large_modules_collapse_into_summaries_with_weighted_edges():
+    nodes, edges, roles = _impact_set(30)
+
+    dot = render_svg(nodes, edges, roles, RenderOptions(cluster=True, collapse_above=10))
+    source = dot.source
+
+    # Target stays, each lib module is one summary node, parallel edges merge
+    assert "python_app_core_run" in source
+    assert "lib_a_f0" not in source
+    assert source.count("->") == 2
+    assert "summary_lib_a -> summary_lib_b" in source
+    assert 'label=30' in source
+    assert "30 functions (30 downstream)" in source
+
+    # lib.a and lib.b are nested in a lib package cluster
+    assert "subgraph cluster_package_lib {" in source
+    assert "subgraph cluster_module_lib_a {" in source
+    assert "subgraph cluster_module_app_core {" in source
+
+
+def test_layout_switches_to_sfdp_for_large_drawings():
+    nodes, edges, roles = _impact_set(300)
+
+    assert render_svg(nodes, edges, roles).engine == "sfdp"
+    assert render_svg(nodes, edges, roles, RenderOptions(engine="dot")).engine == "dot"
+    assert render_svg(nodes, edges, roles, RenderOptions.for_size(len(nodes))).engine == "dot"
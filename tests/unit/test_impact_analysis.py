@@ -1,3 +1,4 @@
+from itertools import pairwise
 from pathlib import Path
 
 from pyimpact.core.ids import SymbolId
@@ -50,3 +51,81 @@ def test_upstream_impact():
 
     assert b.id in affecting
     assert a.id in affecting
+
+
+def test_many_targets_in_one_pass_with_attribution():
+    a, b, c, d = (make_symbol(n) for n in "abcd")
+
+    graph = DependencyGraph()
+    for s in (a, b, c, d):
+        graph.add_node(s)
+
+    # a -> b -> c <- d
+    graph.add_edge(a.id, b.id)
+    graph.add_edge(b.id, c.id)
+    graph.add_edge(d.id, c.id)
+
+    analyzer = ImpactAnalyzer(graph)
+
+    assert analyzer.downstream_many([a.id, d.id]) == {
+        b.id: {a.id},
+        c.id: {a.id, d.id},
+    }
+    assert analyzer.upstream_many([b.id, c.id]) == {
+        a.id: {b.id, c.id},
+        b.id: {c.id},
+        d.id: {c.id},
+    }
+
+
+def _chain_graph(n: int) -> tuple[DependencyGraph, list[FunctionSymbol]]:
+    symbols = [make_symbol(f"f{i}") for i in range(n)]
+
+    graph = DependencyGraph()
+    for s in symbols:
+        graph.add_node(s)
+    for caller, callee in pairwise(symbols):
+        graph.add_edge(caller.id, callee.id)
+
+    return graph, symbols
+
+
+def test_distances_are_hop_counts():
+    graph, (f0, f1, f2, f3) = _chain_graph(4)
+    graph.add_edge(f0.id, f2.id)
+
+    analyzer = ImpactAnalyzer(graph)
+
+    assert analyzer.downstream_distances(f0.id) == {f1.id: 1, f2.id: 1, f3.id: 2}
+    assert analyzer.upstream_distances(f3.id) == {f2.id: 1, f1.id: 2, f0.id: 2}
+
+
+def test_bounded_traversal_stops_early():
+    graph, symbols = _chain_graph(6)
+    analyzer = ImpactAnalyzer(graph)
+    start = symbols[0].id
+
+    assert analyzer.downstream(start, max_depth=2) == {symbols[1].id, symbols[2].id}
+    assert analyzer.downstream_distances(start, max_nodes=3) == {
+        symbols[1].id: 1,
+        symbols[2].id: 2,
+        symbols[3].id: 3,
+    }
+    assert set(analyzer.downstream_distances(start, stop=lambda sid: sid.qualname == "f2")) == {
+        symbols[1].id,
+        symbols[2].id,
+    }
+
+
+def test_max_nodes_truncates_last_level_deterministically():
+    root = make_symbol("root")
+    leaves = [make_symbol(name) for name in ("d", "b", "c", "a")]
+
+    graph = DependencyGraph()
+    graph.add_node(root)
+    for leaf in leaves:
+        graph.add_node(leaf)
+        graph.add_edge(root.id, leaf.id)
+
+    kept = ImpactAnalyzer(graph).downstream(root.id, max_nodes=2)
+    assert {s.qualname for s in kept} == {"a", "b"}
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import CodeLocation, FunctionSymbol
+from pyimpact.query.locations import LocationIndex
+
+
+def _fn(name: str, line: int, end_line: int | None, file: str = "m.py") -> FunctionSymbol:
+    return FunctionSymbol(
+        id=SymbolId("python", "m", name),
+        name=name,
+        module="m",
+        location=CodeLocation(Path(file), line, 0, end_line),
+    )
+
+
+def test_location_index_finds_overlapping_and_nested_functions():
+    outer, inner, later = _fn("outer", 1, 20), _fn("inner", 5, 8), _fn("later", 22, 30)
+    index = LocationIndex([later, inner, outer, _fn("other", 1, 100, file="n.py")])
+
+    def names(start, end):
+        return [fn.name for fn in index.overlapping(Path("m.py"), start, end)]
+
+    assert names(6, 6) == ["outer", "inner"]
+    assert names(10, 10) == ["outer"]
+    assert names(19, 23) == ["outer", "later"]
+    assert names(21, 21) == []
+    assert names(31, 40) == []
+    assert index.overlapping(Path("missing.py"), 1, 1) == []
+
+
+def test_location_index_without_end_line_uses_start_line():
+    index = LocationIndex([_fn("f", 3, None)])
+
+    assert [fn.name for fn in index.overlapping(Path("m.py"), 3, 3)] == ["f"]
+    assert index.overlapping(Path("m.py"), 4, 9) == []
@@ -0,0 +1,62 @@
+import pytest
+
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.impact import find_target
+from pyimpact.core.compact import CompactGraph
+from pyimpact.core.snapshot import load_snapshot, write_snapshot
+from pyimpact.query.lookup import SymbolLookup
+
+
+def _graphs(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "api.py").write_text(
+        "class Client:\n"
+        "    def get(self):\n        pass\n\n"
+        "    def run(self):\n        pass\n\n"
+        "def run():\n    pass\n"
+    )
+    (tmp_path / "worker.py").write_text(
+        "class Job:\n    def run(self):\n        pass\n\n"
+        "def process_order():\n    def get():\n        pass\n"
+    )
+
+    graph = build_project_graph(tmp_path)
+    write_snapshot(graph, tmp_path / "index.bin")
+    return [graph, CompactGraph.from_graph(graph), load_snapshot(tmp_path / "index.bin")]
+
+
+def test_lookup_tiers(tmp_path):
+    for graph in _graphs(tmp_path):
+        lookup = SymbolLookup.for_graph(graph)
+
+        def find(name, lookup=lookup):
+            return sorted(sid.full_name for sid in lookup.find(name))
+
+        # exact qualname beats the methods that merely end in "run"
+        assert find("run") == ["pkg.api.run"]
+        assert find("Client.run") == ["pkg.api.Client.run"]
+        assert find("pkg.api.Client.run") == ["pkg.api.Client.run"]
+        assert find("api.Client.run") == ["pkg.api.Client.run"]
+        assert find("get") == ["pkg.api.Client.get", "worker.process_order.<locals>.get"]
+        assert find("Job.missing") == []
+
+
+def test_lookup_suggests_close_names(tmp_path):
+    for graph in _graphs(tmp_path):
+        lookup = SymbolLookup.for_graph(graph)
+
+        assert lookup.suggest("proces_order") == ["worker.process_order"]
+        assert lookup.suggest("zzz") == []
+
+
+def test_find_target_errors_list_candidates_and_suggestions(tmp_path):
+    graph = _graphs(tmp_path)[0]
+
+    assert find_target(graph, "Job.run").full_name == "worker.Job.run"
+
+    with pytest.raises(ValueError, match=r"ambiguous \(pkg.api.Client.get, worker"):
+        find_target(graph, "get")
+
+    with pytest.raises(ValueError, match="did you mean worker.process_order"):
+        find_target(graph, "proces_order")
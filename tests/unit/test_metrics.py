@@ -0,0 +1,105 @@
+import pytest
+
+from pyimpact.analyzer.cache import ParseCache
+from pyimpact.app.build import build_project_graph
+from pyimpact.core import metrics
+
+
+def _write_project(root):
+    for i in range(4):
+        (root / f"m{i}.py").write_text(
+            f"import os\n\ndef f{i}():\n    f{(i + 1) % 4}()\n    os.getcwd()\n"
+        )
+
+
+def test_nothing_is_recorded_outside_a_recording():
+    assert metrics.active() is None
+
+    with metrics.span("stage"):
+        metrics.count("things")
+
+    assert list(metrics.timed("scan", [1, 2])) == [1, 2]
+
+
+def test_recording_collects_spans_and_counters():
+    with metrics.recording() as recorded:
+        with metrics.span("outer"):
+            with metrics.span("inner"):
+                metrics.count("things", 3)
+            with metrics.span("inner"):
+                metrics.count("things")
+        assert list(metrics.timed("scan", "ab")) == ["a", "b"]
+
+    assert metrics.active() is None
+    assert recorded.counters == {"things": 4}
+    totals = recorded.totals()
+    assert list(totals) == ["outer", "inner", "scan"]
+    assert totals["inner"][1] == 2
+    # One span per item, plus the step that finds the end
+    assert totals["scan"][1] == 3
+    assert totals["outer"][0] >= totals["inner"][0]
+
+
+def test_hooks_receive_finished_recordings():
+    received = []
+    metrics.add_hook(received.append)
+    try:
+        with metrics.recording() as recorded:
+            metrics.count("things")
+        with metrics.recording(publish=False):
+            pass
+    finally:
+        metrics.remove_hook(received.append)
+
+    assert received == [recorded]
+
+
+def test_hook_can_remove_itself_without_skipping_the_next():
+    received = []
+
+    def once(recorded):
+        received.append("once")
+        metrics.remove_hook(once)
+
+    metrics.add_hook(once)
+    metrics.add_hook(received.append)
+    try:
+        with metrics.recording() as recorded:
+            pass
+    finally:
+        metrics.remove_hook(received.append)
+
+    assert received == ["once", recorded]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_build_reports_stages_and_counters(tmp_path, jobs):
+    _write_project(tmp_path)
+
+    with metrics.recording() as recorded:
+        graph = build_project_graph(tmp_path, jobs=jobs)
+
+    counters = recorded.counters
+    assert counters["files.scanned"] == 4
+    assert counters["bytes.read"] == sum(p.stat().st_size for p in tmp_path.glob("*.py"))
+    assert counters["graph.nodes"] == len(graph.nodes) == 4
+    assert counters["graph.edges"] == 4
+    assert counters["calls.unresolved"] == len(graph.unresolved_calls) == 4
+
+    # Parse stages recorded in worker processes are sent back
+    stages = recorded.totals()
+    assert stages["scan"][1] == 5
+    for stage in ["read", "ast.parse", "extract", "GraphBuilder.build", "merge"]:
+        assert stages[stage][1] == 4
+    assert stages["Resolver.resolve"][1] == 1
+
+
+def test_build_counts_cache_hits(tmp_path):
+    _write_project(tmp_path)
+    build_project_graph(tmp_path, cache=ParseCache.for_project(tmp_path))
+
+    with metrics.recording() as recorded:
+        build_project_graph(tmp_path, cache=ParseCache.for_project(tmp_path))
+
+    assert recorded.counters["cache.hits"] == 4
+    assert "bytes.read" not in recorded.counters
@@ -17,3 +17,27 @@ def test_dependency_graph_add_edge():
 
     assert id2 in graph.edges[id1]
     assert id1 in graph.reverse_edges[id2]
+
+
+def test_dependency_graph_remove_module_drops_nodes_and_edges():
+    ids = {
+        name: SymbolId("python", module, name)
+        for module, name in [("m", "a"), ("m", "b"), ("other", "c")]
+    }
+
+    graph = DependencyGraph()
+    for sid in ids.values():
+        graph.add_node(
+            FunctionSymbol(id=sid, name=sid.qualname, module=sid.module,
+                           location=CodeLocation(Path("x.py"), 1, 0))
+        )
+    graph.add_edge(ids["a"], ids["b"])
+    graph.add_edge(ids["c"], ids["a"])
+
+    affected = graph.remove_module("m")
+
+    assert affected == {"other"}
+    assert set(graph.nodes) == {ids["c"]}
+    assert graph.edges[ids["c"]] == set()
+    assert ids["a"] not in graph.reverse_edges
+    assert "m" not in graph.module_symbols
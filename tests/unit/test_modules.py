@@ -0,0 +1,83 @@
+from pyimpact.analyzer.modules import ModuleNamer
+from pyimpact.app.build import build_project_graph
+
+
+def _touch(root, *paths):
+    for rel in paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    return [root / rel for rel in paths]
+
+
+def test_module_names_follow_package_layout(tmp_path):
+    files = _touch(
+        tmp_path,
+        "top.py",
+        "lib/pkg/__init__.py",
+        "lib/pkg/sub/__init__.py",
+        "lib/pkg/sub/mod.py",
+        "tests/unit/test_x.py",
+        "other/unit/__init__.py",
+        "other/unit/test_x.py",
+    )
+
+    namer = ModuleNamer(tmp_path)
+
+    assert [namer.module_name(path) for path in files] == [
+        "top",
+        "pkg",
+        "pkg.sub",
+        "pkg.sub.mod",
+        "tests.unit.test_x",
+        "unit",
+        "unit.test_x",
+    ]
+
+
+def test_src_layout_and_namespace_packages(tmp_path):
+    files = _touch(tmp_path, "src/ns/pkg/__init__.py", "src/ns/pkg/mod.py", "src/tool.py")
+
+    namer = ModuleNamer(tmp_path)
+
+    assert [namer.module_name(path) for path in files] == ["ns.pkg", "ns.pkg.mod", "tool"]
+
+
+def test_configured_roots(tmp_path):
+    files = _touch(tmp_path, "python/app/main.py", "python/app/util.py")
+
+    assert ModuleNamer(tmp_path).module_name(files[0]) == "python.app.main"
+    assert ModuleNamer(tmp_path, roots=["python"]).module_name(files[0]) == "app.main"
+
+
+def test_from_files_matches_disk(tmp_path):
+    files = _touch(tmp_path, "a/__init__.py", "a/b.py", "c/d.py")
+
+    on_disk = ModuleNamer(tmp_path)
+    listed = ModuleNamer.from_files(tmp_path, files)
+
+    assert [listed.module_name(p) for p in files] == [on_disk.module_name(p) for p in files]
+
+
+def test_is_stale_when_package_boundary_moves(tmp_path):
+    (module,) = _touch(tmp_path, "a/b.py")
+    namer = ModuleNamer.from_files(tmp_path, [module])
+    assert namer.module_name(module) == "a.b"
+
+    assert not namer.is_stale([module])
+    _touch(tmp_path, "a/__init__.py")
+    assert namer.is_stale([tmp_path / "a" / "__init__.py"])
+
+
+def test_same_file_name_in_two_packages_does_not_collide(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "utils.py").write_text("def helper():\n    pass\n")
+    (tmp_path / "b" / "utils.py").write_text("def helper():\n    pass\n")
+    (tmp_path / "main.py").write_text("from a.utils import helper\n\ndef run():\n    helper()\n")
+
+    graph = build_project_graph(tmp_path)
+
+    edges = {(c.module, d.module) for c, ds in graph.edges.items() for d in ds}
+    assert {sid.module for sid in graph.nodes} == {"a.utils", "b.utils", "main"}
+    assert edges == {("main", "a.utils")}
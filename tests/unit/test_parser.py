@@ -1,8 +1,23 @@
 # tests/unit/test_parser.py
 
+import ast
 from pathlib import Path
 
-from pyimpact.analyzer.parser import parse_python_file
+import pytest
+
+import pyimpact
+import pyimpact.analyzer.parser as parser_module
+from pyimpact.analyzer.parser import (
+    FunctionCallVisitor,
+    ParseBudgetExceeded,
+    ParseFailure,
+    ParseOptions,
+    extract_from_tree,
+    parse_python_bytes,
+    parse_python_file,
+    parse_python_source,
+    prefilter_source,
+)
 
 
 def test_parser_finds_functions():
@@ -41,3 +56,198 @@ def f():
 
     assert ("f", "g") in call_pairs
     assert len(call_pairs) == 1
+
+
+def test_parser_records_call_qualifiers_and_import_levels(tmp_path):
+    file = tmp_path / "qualified.py"
+    file.write_text(
+        """
+import a.b as ab
+from ..pkg import helper as h
+
+def f():
+    g()
+    ab.g()
+    self.x.g()
+    items[0].g()
+"""
+    )
+
+    _, calls, imports = parse_python_file(file)
+
+    assert [c.qualifier for c in calls] == [None, "ab", "self.x", ""]
+    assert [(i.module, i.name, i.alias, i.level) for i in imports] == [
+        ("a.b", None, "ab", 0),
+        ("pkg", "helper", "h", 2),
+    ]
+
+
+def test_parser_records_function_end_lines(tmp_path):
+    file = tmp_path / "spans.py"
+    file.write_text("def outer():\n    def inner():\n        pass\n    inner()\n\nx = 1\n")
+
+    functions, _, _ = parse_python_file(file)
+    spans = {f.name: (f.lineno, f.end_lineno) for f in functions}
+
+    assert spans == {"outer": (1, 4), "inner": (2, 3)}
+
+
+def test_parser_records_qualnames_for_methods_and_nested_functions(tmp_path):
+    file = tmp_path / "scopes.py"
+    file.write_text(
+        "class A:\n"
+        "    def m(self):\n        f()\n\n"
+        "    class B:\n        async def n(self):\n            pass\n\n"
+        "def f():\n"
+        "    def g():\n        pass\n"
+        "    class C:\n        def h(self):\n            g()\n"
+    )
+
+    functions, calls, _ = parse_python_file(file)
+
+    assert [(fn.qualname, fn.class_name, fn.is_async) for fn in functions] == [
+        ("A.m", "A", False),
+        ("A.B.n", "A.B", True),
+        ("f", None, False),
+        ("f.<locals>.g", None, False),
+        ("f.<locals>.C.h", "f.<locals>.C", False),
+    ]
+    assert [(c.caller, c.callee) for c in calls] == [("A.m", "f"), ("f.<locals>.C.h", "g")]
+
+
+TRICKY_SOURCE = '''
+import os, a.b as ab
+from . import sibling
+
+@decorate(arg())
+class K(Base(meta())):
+    attr = compute()
+
+    @property
+    def p(self, x=default()) -> ret():
+        return [f(i) for i in g() if h(i)] + {k: v() for k, v in items()}
+
+    async def q(self):
+        async with ctx() as c:
+            await c.run(lambda: inner())
+        return f"{fmt(self):{spec()}}"
+
+def outer():
+    match value():
+        case Point(x=0) if guard():
+            pass
+        case {"k": [1, *rest]} | None:
+            pass
+    try:
+        risky()()
+    except (E1, E2()) as e:
+        handle(e)
+    class Local:
+        def m(self):
+            return outer.attr[0].call()
+    return {**merge(), None: 1}, global_call
+'''
+
+
+def test_fast_extraction_matches_visitor():
+    tree = ast.parse(TRICKY_SOURCE)
+    visitor = FunctionCallVisitor()
+    visitor.visit(tree)
+
+    assert extract_from_tree(tree) == (visitor.functions, visitor.calls, visitor.imports)
+
+
+def test_fast_extraction_matches_visitor_on_package_sources():
+    package = Path(pyimpact.__file__).parent
+
+    for path in sorted(package.rglob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        visitor = FunctionCallVisitor()
+        visitor.visit(tree)
+
+        assert extract_from_tree(tree) == (visitor.functions, visitor.calls, visitor.imports)
+
+
+def test_prefilter_reads_import_shims_without_full_parse(monkeypatch):
+    source = (
+        "from .core import (\n    a,  \n    b as c,\n)\n"
+        "import x.y as z, w\n"
+        "__all__ = ['a', 'c']\n"
+    )
+    expected = extract_from_tree(ast.parse(source))
+
+    parsed = []
+    real_parse = ast.parse
+    monkeypatch.setattr(ast, "parse", lambda text, **kw: parsed.append(text) or real_parse(text))
+
+    assert parse_python_source(source) == ([], [], expected[2])
+    assert parsed == ["from .core import (\n    a,  \n    b as c,\n)\nimport x.y as z, w"]
+
+
+def test_prefilter_skips_files_without_defs_or_imports():
+    assert prefilter_source("TABLE = {1: compute(), 2: [3, 4]}\n") == ([], [], [])
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "def f():\n    g()\n",
+        "if TYPE_CHECKING: import typing\n",
+        "x = 1; import os\n",
+        '"""\nimport fake\n"""\n',
+        "# import os\nimport sys\n",
+        "from a import (b,\n    # c)\n    d)\n",
+    ],
+)
+def test_prefilter_defers_to_full_parse_when_unsure(source):
+    assert prefilter_source(source) is None
+
+
+def test_parse_python_bytes_honours_coding_cookies_and_boms():
+    latin = "# -*- coding: latin-1 -*-\ndef caf\xe9():\n    pass\n".encode("latin-1")
+    bom = b"\xef\xbb\xbfdef f():\n    pass\n"
+
+    assert [f.name for f in parse_python_bytes(latin)[0]] == ["caf\xe9"]
+    assert [f.name for f in parse_python_bytes(bom)[0]] == ["f"]
+
+
+def test_parse_python_file_honours_coding_cookies(tmp_path):
+    file = tmp_path / "legacy.py"
+    file.write_bytes("# coding: cp1252\ndef f():\n    g('\u20ac')\n".encode("cp1252"))
+
+    _, calls, _ = parse_python_file(file)
+
+    assert [(c.caller, c.callee) for c in calls] == [("f", "g")]
+
+
+def test_parse_python_bytes_enforces_budgets(monkeypatch):
+    with pytest.raises(ParseBudgetExceeded, match="over the 10 byte limit"):
+        parse_python_bytes(b"def f():\n    pass\n", options=ParseOptions(max_bytes=10))
+
+    def slow(source, filename):
+        while True:
+            pass
+
+    monkeypatch.setattr(parser_module, "parse_python_source", slow)
+    with pytest.raises(ParseBudgetExceeded) as excinfo:
+        parse_python_bytes(b"x = 1\n", options=ParseOptions(timeout=0.05))
+    assert excinfo.value.reason == "timeout"
+
+
+@pytest.mark.parametrize(
+    "data, reason",
+    [
+        (b"def f(:\n", "syntax"),
+        (b"def caf\xe9(): pass\n", "encoding"),
+        (b"# coding: no-such-codec\n", "encoding"),
+        (b"def f():\0\n", "syntax"),
+    ],
+)
+def test_parse_failures_are_classified(data, reason):
+    with pytest.raises(Exception) as excinfo:
+        parse_python_bytes(data)
+
+    failure = ParseFailure.from_exception(Path("bad.py"), excinfo.value)
+
+    assert failure.reason == reason
+    assert failure.to_json()["path"] == "bad.py"
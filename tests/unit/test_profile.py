@@ -0,0 +1,42 @@
+from pytest import approx
+
+from pyimpact.core.metrics import Metrics, Span
+from pyimpact.reporting.profile import chrome_trace, iter_breakdown
+
+
+def _metrics():
+    recorded = Metrics()
+    start = recorded.started
+    recorded.spans = [
+        Span("read", start + 0.002, 0.001, 1, 1),
+        Span("scan+parse", start + 0.001, 0.010, 1, 1),
+        Span("read", start + 0.004, 0.003, 2, 7),
+    ]
+    recorded.counters.update({"files.scanned": 2, "bytes.read": 1500})
+    return recorded
+
+
+def test_breakdown_sums_stages_in_order_of_appearance():
+    lines = list(iter_breakdown(_metrics(), wall=0.020))
+
+    assert lines[0].split() == ["stage", "total", "ms", "calls", "share"]
+    assert lines[1].split() == ["scan+parse", "10.0", "1", "50.0%"]
+    assert lines[2].split() == ["read", "4.0", "2", "20.0%"]
+    assert lines[3].split() == ["wall", "20.0"]
+    assert lines[4] == ""
+    assert [line.split() for line in lines[5:]] == [["bytes.read", "1,500"], ["files.scanned", "2"]]
+
+
+def test_chrome_trace_has_one_complete_event_per_span():
+    trace = chrome_trace(_metrics())
+    events = trace["traceEvents"]
+
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["scan+parse", "read", "read"]
+    assert (spans[0]["ts"], spans[0]["dur"]) == approx((1000, 10000))
+    assert (spans[2]["pid"], spans[2]["tid"]) == (2, 7)
+
+    counters = events[-1]
+    assert counters["ph"] == "C"
+    assert counters["ts"] == approx(11000)
+    assert counters["args"] == {"files.scanned": 2, "bytes.read": 1500}
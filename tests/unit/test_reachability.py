@@ -0,0 +1,126 @@
+import random
+from pathlib import Path
+
+from pyimpact.core.compact import CompactGraph
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.model import CodeLocation, DependencyGraph, FunctionSymbol
+from pyimpact.core.reachability import (
+    LABELS,
+    ReachabilityIndex,
+    interval_labels,
+    strongly_connected_components,
+)
+from pyimpact.core.snapshot import load_snapshot, write_snapshot
+from pyimpact.query.engine import ImpactAnalyzer
+
+
+def _graph(n: int, edges: list[tuple[int, int]]) -> DependencyGraph:
+    graph = DependencyGraph()
+    ids = [SymbolId("python", "m", f"f{i}") for i in range(n)]
+
+    for sid in ids:
+        graph.add_node(
+            FunctionSymbol(id=sid, name=sid.qualname, module=sid.module,
+                           location=CodeLocation(Path("m.py"), 1, 0))
+        )
+    for src, dst in edges:
+        graph.add_edge(ids[src], ids[dst])
+
+    return graph
+
+
+def test_components_are_numbered_in_reverse_topological_order():
+    # 0 -> 1 <-> 2 -> 3, 3 -> 3
+    compact = CompactGraph.from_graph(_graph(4, [(0, 1), (1, 2), (2, 1), (2, 3), (3, 3)]))
+    component, count = strongly_connected_components(compact.fwd_offsets, compact.fwd_targets)
+
+    node = {compact.symbol(i).qualname: i for i in range(len(compact))}
+    c = {name: component[i] for name, i in node.items()}
+
+    assert count == 3
+    assert c["f1"] == c["f2"]
+    assert c["f3"] < c["f1"] < c["f0"]
+
+
+def test_deep_chain_does_not_recurse():
+    n = 50_000
+    compact = CompactGraph.from_graph(_graph(n, [(i, i + 1) for i in range(n - 1)]))
+    index = ReachabilityIndex.from_graph(compact)
+
+    assert len(index) == n
+    first = compact.index[SymbolId("python", "m", "f0")]
+    last = compact.index[SymbolId("python", "m", f"f{n - 1}")]
+    assert index.reaches(first, last)
+    assert not index.reaches(last, first)
+
+
+def test_index_matches_traversal():
+    rng = random.Random(0)
+    n = 150
+    graph = _graph(n, [(rng.randrange(n), rng.randrange(n)) for _ in range(220)])
+
+    plain = ImpactAnalyzer(graph)
+    indexed = ImpactAnalyzer(graph, reachability=ReachabilityIndex.from_graph(graph))
+
+    symbols = list(graph.nodes)
+    for sid in symbols:
+        assert indexed.upstream(sid) == plain.upstream(sid)
+        assert indexed.downstream(sid) == plain.downstream(sid)
+
+    for _ in range(300):
+        a, b = rng.choice(symbols), rng.choice(symbols)
+        assert indexed.affects(a, b) == plain.affects(a, b) == (b in plain.downstream(a))
+
+
+def test_labels_never_rule_out_a_reachable_pair():
+    rng = random.Random(1)
+    n = 300
+    # Mostly downward edges: many small components, like real call graphs
+    edges = [(i, min(n - 1, i + rng.randrange(1, 30))) for i in range(n) for _ in range(2)]
+    edges += [(rng.randrange(n), rng.randrange(n)) for _ in range(10)]
+    graph = _graph(n, edges)
+    index = ReachabilityIndex.from_graph(graph)
+    plain = ImpactAnalyzer(graph)
+
+    assert len(index.labels) == len(index) * 2 * LABELS
+    assert interval_labels(index.down_offsets, index.down_targets) == index.labels
+
+    compact = index.graph
+    for source in range(0, n, 7):
+        reached = {compact.index[sid] for sid in plain.downstream(compact.symbol(source))}
+        for target in range(n):
+            c, d = index.component[source], index.component[target]
+            if target in reached and c != d:
+                assert index._may_reach(c, d)
+            assert index.reaches(source, target) == (target in reached)
+
+
+def test_mapped_snapshot_brings_its_index(tmp_path):
+    rng = random.Random(2)
+    n = 120
+    graph = _graph(n, [(rng.randrange(n), rng.randrange(n)) for _ in range(160)])
+    write_snapshot(graph, tmp_path / "index.bin")
+
+    plain = ImpactAnalyzer(graph)
+    mapped = ImpactAnalyzer(load_snapshot(tmp_path / "index.bin"))
+
+    assert mapped.reachability is not None
+    for sid in graph.nodes:
+        assert mapped.upstream(sid) == plain.upstream(sid)
+        assert mapped.downstream(sid) == plain.downstream(sid)
+    symbols = list(graph.nodes)
+    for _ in range(200):
+        a, b = rng.choice(symbols), rng.choice(symbols)
+        assert mapped.affects(a, b) == plain.affects(a, b)
+
+
+def test_self_recursion_makes_a_symbol_its_own_dependency():
+    graph = _graph(2, [(0, 0), (0, 1)])
+    f0, f1 = SymbolId("python", "m", "f0"), SymbolId("python", "m", "f1")
+
+    analyzer = ImpactAnalyzer(graph, reachability=ReachabilityIndex.from_graph(graph))
+
+    assert analyzer.downstream(f0) == {f0, f1}
+    assert analyzer.affects(f0, f0)
+    assert not analyzer.affects(f1, f1)
+    assert not analyzer.affects(f0, SymbolId("python", "m", "missing"))
@@ -7,6 +7,8 @@ from pyimpact.core.model import (
     DependencyGraph,
     FunctionSymbol,
 )
+from pyimpact.analyzer.graph_builder import GraphBuilder
+from pyimpact.analyzer.parser import parse_python_source
 from pyimpact.analyzer.resolver import Resolver
 
 
@@ -42,3 +44,188 @@ def test_resolver_links_cross_file_calls():
     Resolver().resolve(graph)
 
     assert parser_fn.id in graph.edges[impact_fn.id]
+
+
+def _fn(module: str, name: str) -> FunctionSymbol:
+    return FunctionSymbol(
+        id=SymbolId("python", module, name),
+        name=name,
+        module=module,
+        location=CodeLocation(Path(f"{module}.py"), 1, 0),
+    )
+
+
+def _call(caller: FunctionSymbol, callee_name: str) -> CallSite:
+    return CallSite(
+        caller_id=caller.id,
+        callee_name=callee_name,
+        callee_id=None,
+        location=CodeLocation(Path(f"{caller.module}.py"), 2, 4),
+    )
+
+
+def test_resolver_keeps_only_unresolvable_calls():
+    graph = DependencyGraph()
+    caller = _fn("impact", "run")
+    helper = _fn("util", "helper")
+    graph.add_node(caller)
+    graph.add_node(helper)
+
+    unresolved = graph.unresolved_calls
+    unresolved.extend([_call(caller, "helper"), _call(caller, "missing")])
+
+    Resolver().resolve(graph)
+
+    assert graph.edges[caller.id] == {helper.id}
+    assert graph.unresolved_calls is unresolved
+    assert [c.callee_name for c in graph.unresolved_calls] == ["missing"]
+
+
+def test_resolver_prefers_callers_own_module():
+    graph = DependencyGraph()
+    other = _fn("a", "helper")
+    caller = _fn("b", "run")
+    local = _fn("b", "helper")
+    for fn in (other, caller, local):
+        graph.add_node(fn)
+
+    graph.unresolved_calls.append(_call(caller, "helper"))
+
+    Resolver().resolve(graph)
+
+    assert graph.edges[caller.id] == {local.id}
+
+
+def _build_project(files: dict[str, str]) -> DependencyGraph:
+    """
+    files: relative path ("pkg/mod.py") → source
+    """
+    graph = DependencyGraph()
+    builder = GraphBuilder()
+
+    for rel_path, source in files.items():
+        path = Path(rel_path)
+        parts = list(path.with_suffix("").parts)
+        if parts[-1] == "__init__":
+            parts.pop()
+
+        functions, calls, imports = parse_python_source(source)
+        graph.merge(
+            builder.build(
+                file_path=path,
+                module_name=".".join(parts),
+                functions=functions,
+                calls=calls,
+                imports=imports,
+            )
+        )
+
+    Resolver().resolve(graph)
+    return graph
+
+
+def _edges(graph: DependencyGraph) -> set[tuple[str, str]]:
+    return {
+        (f"{caller.module}.{caller.qualname}", f"{callee.module}.{callee.qualname}")
+        for caller, callees in graph.edges.items()
+        for callee in callees
+    }
+
+
+def test_resolver_follows_from_import_alias():
+    graph = _build_project(
+        {
+            "a.py": "def helper():\n    pass\n",
+            "b.py": "def helper():\n    pass\n",
+            "main.py": "from b import helper as h\n\ndef run():\n    h()\n",
+        }
+    )
+
+    assert _edges(graph) == {("main.run", "b.helper")}
+
+
+def test_resolver_follows_module_alias_attribute_call():
+    graph = _build_project(
+        {
+            "pkg/__init__.py": "",
+            "pkg/util.py": "def helper():\n    pass\n",
+            "other.py": "def helper():\n    pass\n",
+            "main.py": "import pkg.util as u\n\ndef run():\n    u.helper()\n",
+        }
+    )
+
+    assert _edges(graph) == {("main.run", "pkg.util.helper")}
+
+
+def test_resolver_handles_relative_imports_and_reexports():
+    graph = _build_project(
+        {
+            "pkg/__init__.py": "from .impl import helper\n",
+            "pkg/impl.py": "def helper():\n    pass\n",
+            "pkg/sub/__init__.py": "",
+            "pkg/sub/mod.py": "from .. import helper\n\ndef run():\n    helper()\n",
+            "other.py": "def helper():\n    pass\n",
+            "main.py": "from pkg import helper\n\ndef main():\n    helper()\n",
+        }
+    )
+
+    assert _edges(graph) == {
+        ("pkg.sub.mod.run", "pkg.impl.helper"),
+        ("main.main", "pkg.impl.helper"),
+    }
+
+
+def test_resolver_does_not_guess_between_ambiguous_names():
+    graph = _build_project(
+        {
+            "a.py": "def helper():\n    pass\n",
+            "b.py": "def helper():\n    pass\n",
+            "main.py": "def run():\n    helper()\n",
+        }
+    )
+
+    assert _edges(graph) == set()
+    assert [c.callee_name for c in graph.unresolved_calls] == ["helper"]
+
+
+def test_resolver_does_not_link_external_module_calls():
+    graph = _build_project(
+        {
+            "paths.py": "def join():\n    pass\n",
+            "main.py": "import os.path\n\ndef run():\n    os.path.join()\n",
+        }
+    )
+
+    assert _edges(graph) == set()
+
+
+def test_resolver_links_class_method_calls():
+    graph = _build_project(
+        {
+            "shapes.py": (
+                "class Circle:\n"
+                "    def area(self):\n        pass\n\n"
+                "    @classmethod\n    def unit(cls):\n        pass\n\n"
+                "def build():\n    Circle.unit()\n"
+            ),
+            "main.py": "from shapes import Circle\n\ndef run():\n    Circle.unit()\n",
+            "other.py": "def run2(c):\n    c.area()\n",
+        }
+    )
+
+    assert _edges(graph) == {
+        ("shapes.build", "shapes.Circle.unit"),
+        ("main.run", "shapes.Circle.unit"),
+        ("other.run2", "shapes.Circle.area"),
+    }
+
+
+def test_resolver_does_not_fall_back_to_nested_functions():
+    graph = _build_project(
+        {
+            "a.py": "def outer():\n    def helper():\n        pass\n    helper()\n",
+            "main.py": "def run():\n    helper()\n",
+        }
+    )
+
+    assert _edges(graph) == {("a.outer", "a.outer.<locals>.helper")}
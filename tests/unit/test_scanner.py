@@ -1,10 +1,13 @@
 # tests/unit/test_scanner.py
 
+import os
+import subprocess
 from pathlib import Path
 
 import pytest
 
-from pyimpact.analyzer.scanner import scan_python_files
+from pyimpact.analyzer import scanner
+from pyimpact.analyzer.scanner import ScanOptions, iter_python_files, scan_python_files
 
 
 def test_scan_python_files_finds_expected_files():
@@ -40,3 +43,83 @@ def test_scan_python_files_not_a_directory(tmp_path):
 
     with pytest.raises(NotADirectoryError):
         scan_python_files(file_path)
+
+
+def _touch(root, *paths):
+    for rel in paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+
+def _names(root, files):
+    return [f.relative_to(root.resolve()).as_posix() for f in files]
+
+
+def test_iter_python_files_is_lazy_and_sorted(tmp_path):
+    _touch(tmp_path, "b.py", "a/z.py", "a.py", "a/b/c.py", "notes.txt")
+
+    files = iter_python_files(tmp_path)
+
+    assert next(files).name == "c.py"
+    assert _names(tmp_path, files) == ["a/z.py", "a.py", "b.py"]
+    assert scan_python_files(tmp_path) == sorted(scan_python_files(tmp_path))
+
+
+def test_scan_honours_gitignore(tmp_path):
+    _touch(tmp_path, "app.py", "gen/out.py", "pkg/keep.py", "pkg/skip_me.py", "pkg/skip_ok.py")
+    (tmp_path / ".gitignore").write_text("# generated\ngen/\nskip_*.py\n")
+    (tmp_path / "pkg" / ".gitignore").write_text("!skip_ok.py\n")
+
+    files = scan_python_files(tmp_path)
+
+    assert _names(tmp_path, files) == ["app.py", "pkg/keep.py", "pkg/skip_ok.py"]
+    assert len(scan_python_files(tmp_path, ScanOptions(gitignore=False))) == 5
+
+
+def test_scan_applies_gitignore_above_the_root(tmp_path):
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("project/vendor/\n*_pb2.py\n")
+    project = tmp_path / "project"
+    _touch(project, "main.py", "vendor/lib.py", "api_pb2.py")
+
+    assert _names(project, scan_python_files(project)) == ["main.py"]
+
+
+def test_scan_include_and_exclude_globs(tmp_path):
+    _touch(tmp_path, "src/a.py", "src/a.pyi", "src/migrations/0001.py", "docs/conf.py")
+
+    options = ScanOptions(include=("*.py", "*.pyi"), exclude=("migrations/", "/docs"))
+
+    assert _names(tmp_path, scan_python_files(tmp_path, options)) == ["src/a.py", "src/a.pyi"]
+
+
+def test_scan_prunes_ignored_directories_before_entering(tmp_path, monkeypatch):
+    _touch(tmp_path, "a.py", "node_modules/x/deep.py", ".venv/lib/site.py")
+    (tmp_path / ".gitignore").write_text("node_modules/\n")
+
+    visited = []
+    real_scandir = os.scandir
+
+    def recording_scandir(path):
+        visited.append(os.path.basename(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", recording_scandir)
+
+    assert _names(tmp_path, scan_python_files(tmp_path)) == ["a.py"]
+    assert "node_modules" not in visited
+    assert ".venv" not in visited
+
+
+def test_scan_git_files(tmp_path):
+    _touch(tmp_path, "tracked.py", "ignored.py", "new.py", "pkg/mod.py")
+    (tmp_path / ".gitignore").write_text("ignored.py\n")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    subprocess.run([*git, "add", "tracked.py", "pkg/mod.py", ".gitignore"], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "init"], check=True)
+
+    files = scan_python_files(tmp_path, ScanOptions(git_files=True, exclude=("pkg/",)))
+
+    assert _names(tmp_path, files) == ["new.py", "tracked.py"]
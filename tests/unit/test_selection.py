@@ -0,0 +1,222 @@
+import shutil
+import subprocess
+
+import pytest
+
+from pyimpact.analyzer.parser import ParseOptions
+from pyimpact.analyzer.scanner import ScanOptions
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.diff import BaseGraphCache
+from pyimpact.app.selection import (
+    TestIndex,
+    TestIndexCache,
+    select_tests_for_diff,
+    select_tests_for_files,
+)
+from pyimpact.app.tests_index import load_test_index, write_test_index
+from pyimpact.core.ids import SymbolId
+
+LIB = "def a():\n    b()\n\ndef b():\n    pass\n\ndef c():\n    pass\n"
+TESTS = (
+    "from lib import a, c\n\n"
+    "def test_a():\n    a()\n\n"
+    "def test_c():\n    c()\n\n"
+    "def helper():\n    b()\n"
+)
+
+
+def _write_project(root):
+    (root / "tests").mkdir()
+    (root / "lib.py").write_text(LIB)
+    (root / "tests" / "test_lib.py").write_text(TESTS)
+
+
+def test_index_maps_symbols_to_reaching_tests(tmp_path):
+    _write_project(tmp_path)
+    root = tmp_path.resolve()
+    graph = build_project_graph(root)
+    index = TestIndex.from_graph(graph, root)
+
+    assert index.node_ids == ["tests/test_lib.py::test_a", "tests/test_lib.py::test_c"]
+
+    by_name = {sid.qualname: sid for sid in graph.nodes}
+
+    def selected(*names):
+        return [index.node_ids[i] for i in index.select(by_name[n] for n in names)]
+
+    assert selected("b") == ["tests/test_lib.py::test_a"]
+    assert selected("b", "c") == ["tests/test_lib.py::test_a", "tests/test_lib.py::test_c"]
+    assert selected("test_c") == ["tests/test_lib.py::test_c"]
+    assert selected("helper") == []
+
+
+def test_mapped_index_answers_like_the_built_one(tmp_path):
+    _write_project(tmp_path)
+    (tmp_path / "tests" / "test_cls.py").write_text(
+        "from lib import b\n\nclass TestB:\n    def test_b(self):\n        b()\n"
+    )
+    root = tmp_path.resolve()
+    graph = build_project_graph(root)
+    index = TestIndex.from_graph(graph, root)
+
+    write_test_index(index, tmp_path / "tests.bin", stamp="v1")
+    mapped = load_test_index(tmp_path / "tests.bin")
+
+    assert mapped.stamp == "v1"
+    assert list(mapped.node_ids) == index.node_ids
+    assert list(mapped.tests) == index.tests
+    for sid in graph.nodes:
+        assert mapped.select([sid]) == index.select([sid])
+    assert mapped.select([SymbolId("python", "lib", "missing")]) == []
+
+    for path in [root / "lib.py", root / "tests" / "test_cls.py", root / "missing.py"]:
+        assert mapped.locations.in_file(path) == index.locations.in_file(path)
+        assert mapped.locations.overlapping(path, 4, 5) == index.locations.overlapping(path, 4, 5)
+    assert sorted(mapped.locations.files()) == sorted(index.locations.files())
+
+
+def test_index_cache_ignores_foreign_files(tmp_path):
+    _write_project(tmp_path)
+    index_cache = TestIndexCache.for_project(tmp_path)
+    path = index_cache.path_for("tree:x")
+    path.parent.mkdir(parents=True)
+
+    path.write_bytes(b"\x80\x04not an index")
+    assert index_cache.load("tree:x", tmp_path) is None
+
+    root = tmp_path.resolve()
+    index_cache.save("tree:x", tmp_path, TestIndex.from_graph(build_project_graph(root), root))
+    assert index_cache.load("tree:x", tmp_path) is not None
+    assert index_cache.load("tree:y", tmp_path) is None
+
+    path.write_bytes(path.read_bytes()[:-8])
+    assert index_cache.load("tree:x", tmp_path) is None
+
+
+def test_select_tests_for_files_reuses_index_until_tree_changes(tmp_path):
+    _write_project(tmp_path)
+    index_cache = TestIndexCache.for_project(tmp_path)
+    changed = [tmp_path / "lib.py"]
+
+    assert select_tests_for_files(tmp_path, changed, index_cache=index_cache) == [
+        "tests/test_lib.py::test_a",
+        "tests/test_lib.py::test_c",
+    ]
+    stored = index_cache.path_for("tree:").stat().st_mtime_ns
+
+    select_tests_for_files(tmp_path, changed, index_cache=index_cache)
+    assert index_cache.path_for("tree:").stat().st_mtime_ns == stored
+
+    (tmp_path / "tests" / "test_more.py").write_text(
+        "from lib import c\n\ndef test_more():\n    c()\n"
+    )
+    assert select_tests_for_files(tmp_path, changed, index_cache=index_cache) == [
+        "tests/test_lib.py::test_a",
+        "tests/test_lib.py::test_c",
+        "tests/test_more.py::test_more",
+    ]
+
+
+def test_select_tests_for_files_rebuilds_index_for_other_options(tmp_path):
+    _write_project(tmp_path)
+    (tmp_path / "old.py").write_text("def broken(:\n    pass\n")
+    index_cache = TestIndexCache.for_project(tmp_path)
+    changed = [tmp_path / "lib.py"]
+
+    failures = []
+    tolerant = ParseOptions(tolerant=True)
+    assert select_tests_for_files(
+        tmp_path, changed, index_cache=index_cache, parse=tolerant, failures=failures
+    ) == ["tests/test_lib.py::test_a", "tests/test_lib.py::test_c"]
+    assert [f.path.name for f in failures] == ["old.py"]
+
+    # Neither a strict run nor a narrower scan may reuse that index
+    with pytest.raises(SyntaxError):
+        select_tests_for_files(tmp_path, changed, index_cache=index_cache)
+
+    scan = ScanOptions(exclude=("tests/",))
+    assert select_tests_for_files(
+        tmp_path, changed, index_cache=index_cache, scan=scan, parse=tolerant
+    ) == []
+
+
+def _git(root, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root, check=True, capture_output=True,
+    )
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_select_tests_for_diff(tmp_path):
+    _write_project(tmp_path)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "base")
+
+    kwargs = {
+        "cache": BaseGraphCache.for_project(tmp_path),
+        "index_cache": TestIndexCache.for_project(tmp_path),
+    }
+
+    (tmp_path / "lib.py").write_text(LIB.replace("def b():\n    pass", "def b():\n    return 1"))
+    assert select_tests_for_diff(tmp_path, "HEAD", **kwargs) == ["tests/test_lib.py::test_a"]
+
+    # New tests are selected directly, deleted ones are dropped
+    (tmp_path / "tests" / "test_lib.py").write_text(
+        TESTS.replace("def test_c():\n    c()\n", "def test_new():\n    pass\n")
+    )
+    assert select_tests_for_diff(tmp_path, "HEAD", **kwargs) == [
+        "tests/test_lib.py::test_a",
+        "tests/test_lib.py::test_new",
+    ]
+
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_select_tests_for_diff_skips_files_that_do_not_parse(tmp_path):
+    _write_project(tmp_path)
+    (tmp_path / "old.py").write_text("def broken(:\n    pass\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "base")
+
+    (tmp_path / "lib.py").write_text(LIB.replace("def b():\n    pass", "def b():\n    return 1"))
+    (tmp_path / "old.py").write_text("def still_broken(:\n    pass\n")
+
+    kwargs = {
+        "cache": BaseGraphCache.for_project(tmp_path),
+        "index_cache": TestIndexCache.for_project(tmp_path),
+        "parse": ParseOptions(tolerant=True),
+    }
+    for _ in range(2):
+        # The second run reuses the cached index, which remembers the skip
+        failures = []
+        assert select_tests_for_diff(tmp_path, "HEAD", failures=failures, **kwargs) == [
+            "tests/test_lib.py::test_a"
+        ]
+        assert [(f.path.name, f.reason) for f in failures] == [
+            ("old.py", "syntax"),
+            ("old.py", "syntax"),
+        ]
+
+    with pytest.raises(SyntaxError):
+        select_tests_for_diff(tmp_path, "HEAD", index_cache=kwargs["index_cache"])
+
+
+def test_index_uses_pytest_ids_for_test_classes(tmp_path):
+    _write_project(tmp_path)
+    (tmp_path / "tests" / "test_cls.py").write_text(
+        "from lib import b\n\n"
+        "class TestB:\n    def test_b(self):\n        b()\n\n"
+        "class Helper:\n    def test_like(self):\n        b()\n"
+    )
+    root = tmp_path.resolve()
+
+    index = TestIndex.from_graph(build_project_graph(root), root)
+
+    assert index.node_ids == [
+        "tests/test_cls.py::TestB::test_b",
+        "tests/test_lib.py::test_a",
+        "tests/test_lib.py::test_c",
+    ]
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from pyimpact.analyzer.scanner import ScanOptions
+from pyimpact.app.build import build_project_graph
+from pyimpact.app.impact import find_target
+from pyimpact.app.index import build_index, load_index
+from pyimpact.core.ids import SymbolId
+from pyimpact.core.snapshot import load_snapshot, write_snapshot
+from pyimpact.query.engine import ImpactAnalyzer
+from pyimpact.query.subgraph import extract_subgraph
+
+
+def _write_project(root):
+    (root / "a.py").write_text("def a():\n    b()\n\ndef b():\n    c()\n")
+    (root / "c.py").write_text("def c():\n    pass\n\nasync def d():\n    c()\n")
+
+
+def test_snapshot_roundtrip_preserves_nodes_and_queries(tmp_path):
+    _write_project(tmp_path)
+    graph = build_project_graph(tmp_path)
+
+    path = tmp_path / "index.bin"
+    write_snapshot(graph, path)
+    mapped = load_snapshot(path)
+
+    assert set(mapped.nodes) == set(graph.nodes)
+    for sid, fn in graph.nodes.items():
+        assert mapped.nodes[sid] == fn
+
+    plain, fast = ImpactAnalyzer(graph), ImpactAnalyzer(mapped)
+    for sid in graph.nodes:
+        assert fast.upstream(sid) == plain.upstream(sid)
+        assert fast.downstream(sid) == plain.downstream(sid)
+
+    target = find_target(mapped, "b")
+    assert extract_subgraph(mapped, target, fast.upstream(target), set()) == extract_subgraph(
+        graph, target, plain.upstream(target), set()
+    )
+
+
+def test_snapshot_finds_symbols_by_qualname(tmp_path):
+    _write_project(tmp_path)
+    (tmp_path / "dup.py").write_text("def c():\n    pass\n")
+
+    path, _ = build_index(tmp_path)
+    mapped = load_index(tmp_path)
+
+    assert path.is_file()
+    assert {mapped.symbol(i).module for i in mapped.find_qualname("c")} == {"c", "dup"}
+    assert mapped.find_qualname("missing") == []
+
+    with pytest.raises(ValueError):
+        find_target(mapped, "c")
+
+
+def test_snapshot_maps_symbols_it_produced_back_without_a_search(tmp_path, monkeypatch):
+    for i in range(20):
+        (tmp_path / f"m{i}.py").write_text("def run():\n    pass\n")
+    write_snapshot(build_project_graph(tmp_path), tmp_path / "index.bin")
+    mapped = load_snapshot(tmp_path / "index.bin")
+
+    fresh = SymbolId("python", "m7", "run")
+    i = mapped.index[fresh]
+    assert mapped.symbol(i) == fresh
+
+    produced = [mapped.symbol(j) for j in range(len(mapped))]
+    monkeypatch.setattr(mapped, "find_qualname", None)
+    assert [mapped.index[sid] for sid in produced] == list(range(len(mapped)))
+
+
+def test_load_index_without_snapshot_returns_none(tmp_path):
+    assert load_index(tmp_path) is None
+
+
+def test_load_index_ignores_a_snapshot_of_other_sources(tmp_path):
+    _write_project(tmp_path)
+    build_index(tmp_path)
+    assert load_index(tmp_path) is not None
+
+    # Other options than the index was built with
+    assert load_index(tmp_path, scan=ScanOptions(exclude=("c.py",))) is None
+
+    (tmp_path / "c.py").write_text("def c():\n    pass\n")
+    assert load_index(tmp_path) is None
+
+    build_index(tmp_path)
+    assert load_index(tmp_path) is not None
+
+    (tmp_path / "new.py").write_text("def new():\n    pass\n")
+    assert load_index(tmp_path) is None
+
+
+def test_load_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "index.bin"
+    path.write_bytes(b"not a snapshot" * 20)
+
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_concurrent_writers_never_publish_a_torn_snapshot(tmp_path):
+    _write_project(tmp_path)
+    graph = build_project_graph(tmp_path)
+    path = tmp_path / "index.bin"
+
+    threads = [
+        threading.Thread(target=write_snapshot, args=(graph, path, f"writer {i}"))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(load_snapshot(path).nodes) == set(graph.nodes)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
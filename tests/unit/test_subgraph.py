@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from pyimpact.core.ids import SymbolId
-from pyimpact.core.model import DependencyGraph, FunctionSymbol, CodeLocation
+from pyimpact.core.model import CodeLocation, DependencyGraph, FunctionSymbol
 from pyimpact.query.subgraph import extract_subgraph
 
 
@@ -50,3 +50,29 @@ def test_extract_subgraph_filters_nodes_and_edges():
     assert (a.id, b.id) in edges
     assert (b.id, c.id) in edges
     assert (d.id, a.id) not in edges
+
+
+class _NoScanDict(dict):
+    def items(self):
+        raise AssertionError("extract_subgraph must not scan every edge")
+
+    def __iter__(self):
+        raise AssertionError("extract_subgraph must not scan every edge")
+
+
+def test_extract_subgraph_only_visits_selected_nodes():
+    graph = DependencyGraph()
+    symbols = [_make_symbol(name) for name in ("a", "b", "c")]
+    for s in symbols:
+        graph.add_node(s)
+
+    a, b, c = (s.id for s in symbols)
+    graph.add_edge(a, b)
+    graph.add_edge(b, a)
+    graph.add_edge(b, c)
+    graph.edges = _NoScanDict(graph.edges)
+
+    nodes, edges = extract_subgraph(graph=graph, target=a, upstream={b}, downstream={b})
+
+    assert nodes == {a, b}
+    assert edges == {(a, b), (b, a)}